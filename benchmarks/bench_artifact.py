@@ -0,0 +1,125 @@
+# python -m benchmarks.bench_artifact [--model reports/<run>/model.joblib] [--workers 4] [--rows 20000]
+
+"""
+Model artifact formats: joblib pickle (raw and compressed) vs the
+memory-mapped model_npy/ array directory of src.models.kernel.
+
+The run's model is written in each format to a temporary directory:
+
+    joblib          joblib.dump(model), as persist() writes model.joblib
+    joblib z3       joblib.dump(model, compress=3)
+    model_npy       ScoringKernel.save_dir (.npy arrays + schema.json), loaded
+                    with np.load(mmap_mode="r")
+
+Each format is then loaded by --workers fresh processes at once, each
+scoring the same --rows applicants (engineered features, read from a pickle
+before the clock starts). Reported per format: size on disk, load time (the
+load call, including whatever it imports -- sklearn for a pickle), the
+scoring time, and per-worker memory after scoring: RSS, and of that the
+private (anonymous) part -- mapped, shareable file pages are the rest. The
+predictions must match model.predict_proba.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from src.features.feature_engineering import add_application_features
+from src.models.kernel import compile_kernel
+from src.models.pipeline import load_data
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in each worker process: numpy / pandas are imported before the clock
+# starts, so load_s is the format's own cost.
+WORKER = r"""
+import json, sys, time
+import numpy as np, pandas as pd
+fmt, path, rows_path = sys.argv[1:4]
+X = pd.read_pickle(rows_path)
+t0 = time.perf_counter()
+if fmt == "model_npy":
+    from src.models.kernel import ScoringKernel
+    model = ScoringKernel.load_dir(path)
+else:
+    import joblib
+    model = joblib.load(path)
+t1 = time.perf_counter()
+p = model.predict_proba(X)[:, 1]
+t2 = time.perf_counter()
+status = dict(line.split(":", 1) for line in open("/proc/self/status") if line.startswith(("VmRSS", "RssAnon")))
+kb = {k: int(v.split()[0]) for k, v in status.items()}
+np.save(sys.argv[4], p)
+print(json.dumps({"load_s": t1 - t0, "score_s": t2 - t1, "rss_mb": kb["VmRSS"] / 1024, "anon_mb": kb["RssAnon"] / 1024}))
+"""
+
+
+def latest_model(reports_dir: Path) -> Path:
+    models = sorted(reports_dir.glob("*/model.joblib"), key=lambda p: p.stat().st_mtime)
+    if not models:
+        raise FileNotFoundError(f"no */model.joblib under {reports_dir}; run src.run_evaluation first")
+    return models[-1]
+
+
+def _size(path: Path) -> int:
+    return path.stat().st_size if path.is_file() else sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def run_workers(fmt: str, path: Path, rows_path: Path, workers: int, tmp: Path) -> tuple[list[dict], np.ndarray]:
+    """Start `workers` processes together; each loads `path` and scores the rows."""
+    procs = [
+        subprocess.Popen([sys.executable, "-c", WORKER, fmt, str(path), str(rows_path), str(tmp / f"{fmt}_{i}.npy")],
+                         cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        for i in range(workers)
+    ]
+    results = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        if proc.returncode:
+            raise RuntimeError(f"{fmt} worker failed")
+        results.append(json.loads(out))
+    return results, np.load(tmp / f"{fmt}_0.npy")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="joblib vs memory-mapped .npy model artifacts.")
+    parser.add_argument("--model", type=Path, default=None, help="model.joblib (default: newest under reports/)")
+    parser.add_argument("--workers", type=int, default=4, help="processes loading the model at the same time")
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    model_path = args.model or latest_model(ROOT / "reports")
+    model = joblib.load(model_path)
+    raw = load_data(ROOT / "data" / "raw" / "application_train.csv").head(args.rows)
+    X = add_application_features(raw.drop(columns=["TARGET"]))
+    expected = model.predict_proba(X)[:, 1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        rows_path = tmp / "rows.pkl"
+        X.to_pickle(rows_path)
+        # name -> (loader in WORKER, path)
+        formats = {"joblib": ("joblib", tmp / "model.joblib"),
+                   "joblib z3": ("joblib", tmp / "model_z3.joblib"),
+                   "model_npy": ("model_npy", tmp / "model_npy")}
+        joblib.dump(model, formats["joblib"][1])
+        joblib.dump(model, formats["joblib z3"][1], compress=3)
+        compile_kernel(model).save_dir(formats["model_npy"][1])
+
+        print(f"{model_path} | {args.workers} worker(s) x {len(X):,} rows")
+        print(f"{'format':<12}{'size KB':>9}{'load ms':>9}{'score ms':>10}{'RSS MB':>8}{'private MB':>12}{'max |diff|':>12}")
+        for fmt, (loader, path) in formats.items():
+            results, p = run_workers(loader, path, rows_path, args.workers, tmp)
+            mean = {k: float(np.mean([r[k] for r in results])) for k in results[0]}
+            print(f"{fmt:<12}{_size(path) / 1024:>9.0f}{1e3 * mean['load_s']:>9.0f}{1e3 * mean['score_s']:>10.1f}"
+                  f"{mean['rss_mb']:>8.0f}{mean['anon_mb']:>12.0f}{np.max(np.abs(p - expected)):>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# python -m benchmarks.bench_eval [--rows 10000000] [--bins 10]
+
+"""
+Test-set evaluation: the per-metric library calls vs the sort-once SortedScores.
+
+Scores are synthetic (beta-distributed PDs, defaults drawn from them), so the
+benchmark runs at backtest sizes the real test split never reaches.
+
+    per_call  what evaluate.py / metrics.py used to do: roc_curve, roc_auc_score,
+              precision_recall_curve, average_precision_score, ks_statistic,
+              calibration_curve and the two pd.qcut tables
+    sorted    one SortedScores, then the same curves, KS and tables from it
+
+Plots and CSV writes are left out of both. Every output is checked for
+exact equality before the times are printed.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from sklearn.calibration import calibration_curve
+from sklearn.metrics import average_precision_score, precision_recall_curve, roc_auc_score, roc_curve
+
+from src.evaluation.metrics import ks_statistic
+from src.evaluation.sorted_scores import SortedScores
+
+
+def per_call(y: np.ndarray, p: np.ndarray, n_bins: int) -> dict:
+    out = {
+        "roc": roc_curve(y, p),
+        "auc": roc_auc_score(y, p),
+        "pr": precision_recall_curve(y, p),
+        "ap": average_precision_score(y, p),
+        "ks": ks_statistic(y, p),
+        "calibration_curve": calibration_curve(y, p, n_bins=n_bins, strategy="quantile"),
+    }
+
+    df = pd.DataFrame({"y": y, "p": p})
+    df["bin"] = pd.qcut(df["p"], q=n_bins, duplicates="drop")
+    out["calibration_table"] = (
+        df.groupby("bin", observed=True)
+        .agg(n=("y", "size"), avg_pred=("p", "mean"), obs_rate=("y", "mean"), p_min=("p", "min"), p_max=("p", "max"))
+        .reset_index(drop=False)
+    )
+
+    df = pd.DataFrame({"y": y, "p": p}).sort_values("p", ascending=False)
+    df["bin"] = pd.qcut(df["p"], q=n_bins, duplicates="drop")
+    g = (
+        df.groupby("bin", observed=True, sort=False)
+        .agg(n=("y", "size"), bads=("y", "sum"), bad_rate=("y", "mean"), p_min=("p", "min"), p_max=("p", "max"))
+        .reset_index()
+    )
+    g["lift"] = g["bad_rate"] / df["y"].mean()
+    g["cum_bads"] = g["bads"].cumsum()
+    g["cum_bads_pct"] = g["cum_bads"] / df["y"].sum()
+    out["gains_table"] = g
+    return out
+
+
+def sorted_once(y: np.ndarray, p: np.ndarray, n_bins: int) -> dict:
+    scores = SortedScores(y, p)
+    return {
+        "roc": scores.roc_curve(),
+        "auc": scores.roc_auc(),
+        "pr": scores.pr_curve(),
+        "ap": scores.average_precision(),
+        "ks": scores.ks(),
+        "calibration_curve": scores.calibration_curve(n_bins=n_bins, strategy="quantile"),
+        "calibration_table": scores.calibration_table(n_bins),
+        "gains_table": scores.gains_table(n_bins),
+    }
+
+
+def _check_equal(a: dict, b: dict) -> None:
+    for key in a:
+        if isinstance(a[key], pd.DataFrame):
+            assert_frame_equal(a[key], b[key], check_exact=True)
+        elif isinstance(a[key], tuple) and isinstance(a[key][0], np.ndarray):
+            assert all(np.array_equal(x, z) for x, z in zip(a[key], b[key])), key
+        else:
+            assert a[key] == b[key], (key, a[key], b[key])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-metric evaluation vs sort-once SortedScores.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--bins", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    p = rng.beta(1.0, 10.0, args.rows)
+    y = (rng.random(args.rows) < p).astype(np.int64)
+
+    times, results = {}, {}
+    for name, fn in (("per_call", per_call), ("sorted", sorted_once)):
+        t0 = time.perf_counter()
+        results[name] = fn(y, p, args.bins)
+        times[name] = time.perf_counter() - t0
+
+    _check_equal(results["per_call"], results["sorted"])
+    print(f"{args.rows:,} rows, {args.bins} bins: outputs identical")
+    for name, seconds in times.items():
+        print(f"{name:<9}{seconds:>8.2f}s")
+    print(f"speed-up {times['per_call'] / times['sorted']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
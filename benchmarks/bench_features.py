@@ -0,0 +1,167 @@
+# python -m benchmarks.bench_features [--data data/raw/application_train.csv]
+
+"""
+Feature engineering: peak RSS and wall time, before vs after the copy-free engine.
+
+Each variant runs in a fresh subprocess on the full dataset (loaded through the
+columnar cache); the peak-RSS high-water mark is reset after loading, so the
+number reported is the extra peak memory of the feature step alone.
+
+    legacy      the previous add_application_features: df.copy() + 12 column inserts
+    add         add_application_features (shallow copy + engine, float64)
+    engine32    compute_application_features, all 12 columns, float32
+    model_cols  compute_application_features, only the columns a fitted model uses
+    chunked     iter_application_features over the raw CSV, 100k-row chunks
+
+Before timing, the parent process checks the outputs are identical to legacy.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import (
+    DAYS_EMPLOYED_SENTINEL,
+    add_application_features,
+    compute_application_features,
+    iter_application_features,
+    model_feature_columns,
+)
+from src.models.pipeline import load_data
+
+ROOT = Path(__file__).resolve().parent.parent
+VARIANTS = ["legacy", "add", "engine32", "model_cols", "chunked"]
+
+
+def _legacy_add_application_features(df: pd.DataFrame) -> pd.DataFrame:
+    # Verbatim behaviour of add_application_features before the engine.
+    df = df.copy()
+    if "DAYS_BIRTH" in df.columns:
+        df["YEARS_BIRTH"] = (-df["DAYS_BIRTH"].astype("float64")) / 365.25
+    if "DAYS_EMPLOYED" in df.columns:
+        days_emp = df["DAYS_EMPLOYED"].replace(DAYS_EMPLOYED_SENTINEL, np.nan)
+        df["YEARS_EMPLOYED"] = (-days_emp) / 365.25
+        df["DAYS_EMPLOYED_MISSING"] = (df["DAYS_EMPLOYED"] == DAYS_EMPLOYED_SENTINEL).astype(int)
+    if "AMT_INCOME_TOTAL" in df.columns:
+        income_safe = df["AMT_INCOME_TOTAL"].astype("float64").replace(0, np.nan)
+        if "AMT_CREDIT" in df.columns:
+            df["CREDIT_INCOME_RATIO"] = df["AMT_CREDIT"].astype("float64") / income_safe
+        if "AMT_ANNUITY" in df.columns:
+            df["ANNUITY_INCOME_RATIO"] = df["AMT_ANNUITY"].astype("float64") / income_safe
+    if "AMT_CREDIT" in df.columns:
+        credit_safe = df["AMT_CREDIT"].astype("float64").replace(0, np.nan)
+        if "AMT_GOODS_PRICE" in df.columns:
+            df["GOODS_CREDIT_RATIO"] = df["AMT_GOODS_PRICE"].astype("float64") / credit_safe
+    for col in ["EXT_SOURCE_1", "EXT_SOURCE_3"]:
+        if col in df.columns:
+            df[f"{col}_MISSING"] = df[col].isna().astype(int)
+    for col in ["AMT_INCOME_TOTAL", "AMT_ANNUITY", "AMT_CREDIT", "AMT_GOODS_PRICE"]:
+        if col in df.columns:
+            df[f"LOG_{col}"] = np.log1p(df[col].astype("float64"))
+    return df
+
+
+def reset_peak_rss() -> bool:
+    # Linux: writing 5 to clear_refs resets the VmHWM high-water mark.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _run_child(variant: str, data: Path) -> dict:
+    df = None if variant == "chunked" else load_data(data)
+    used = model_feature_columns(_FakeModel(["YEARS_BIRTH", "CREDIT_INCOME_RATIO", "EXT_SOURCE_3_MISSING"]))
+
+    reset_peak_rss()
+    base = current_rss_mb()
+    t0 = time.perf_counter()
+    if variant == "legacy":
+        out = _legacy_add_application_features(df)
+    elif variant == "add":
+        out = add_application_features(df)
+    elif variant == "engine32":
+        out = compute_application_features(df)
+    elif variant == "model_cols":
+        out = compute_application_features(df, columns=used)
+    elif variant == "chunked":
+        n = 0
+        for chunk in iter_application_features(data, chunksize=100_000):
+            n += len(chunk)
+        out = None
+    wall = time.perf_counter() - t0
+    return {"variant": variant, "seconds": wall, "peak_extra_mb": peak_rss_mb() - base}
+
+
+class _FakeModel:
+    # Stand-in for a fitted estimator: only `feature_names_in_` is consulted.
+    def __init__(self, names):
+        self.feature_names_in_ = np.asarray(names, dtype=object)
+
+
+def _check_identical(data: Path) -> None:
+    df = load_data(data)
+    ref = _legacy_add_application_features(df)
+    new = add_application_features(df)
+    pd.testing.assert_frame_equal(new, ref)
+
+    eng = [c for c in new.columns if c not in df.columns]
+    f32 = compute_application_features(df)
+    pd.testing.assert_frame_equal(f32, ref[eng].astype(np.float32))
+
+    streamed = pd.concat(iter_application_features(data, chunksize=100_000))
+    pd.testing.assert_frame_equal(streamed, ref[eng].astype(np.float32))
+    print(f"Outputs identical to legacy: add (float64), engine32, chunked ({len(df):,} rows)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Feature engineering peak RSS / wall time.")
+    parser.add_argument("--data", type=Path, default=ROOT / "data" / "raw" / "application_train.csv")
+    parser.add_argument("--child", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_run_child(args.child, args.data)))
+        return
+
+    _check_identical(args.data)
+    print(f"{'variant':<12}{'seconds':>10}{'peak +MB':>10}")
+    for variant in VARIANTS:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_features", "--child", variant, "--data", str(args.data)],
+            capture_output=True, text=True, check=True, cwd=ROOT,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{variant:<12}{r['seconds']:>10.3f}{r['peak_extra_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# python -m benchmarks.bench_import [--repeat 5] [--record benchmarks/importtime.json]
+
+"""
+Cold-start import cost of each entry point, from `python -X importtime`.
+
+Every module is imported in a fresh interpreter --repeat times (the best run
+is kept, so the OS file cache is warm and the numbers measure import work,
+not disk). Reported per module:
+
+    import_ms   the module's cumulative import time as -X importtime reports it
+    numpy ... matplotlib
+                cumulative time of each heavy package's first import
+                ("-" = never imported: the lazy-import boundaries held)
+    wall_ms     wall time of `python -c "import <module>"` minus a bare
+                `python -c pass`, i.e. what a short-lived job pays on top of
+                the interpreter itself
+
+--record appends the results to a JSON history keyed by release (git
+describe), replacing an earlier entry for the same release, so import-time
+regressions show up as a diff of that file from one release to the next.
+"""
+
+import argparse
+import datetime as dt
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "src.quick_score",
+    "src.models.kernel",
+    "src.evaluation.figures",
+    "src.backtest",
+    "src.tracking",
+    "src.score",
+    "src.serve",
+    "src.run_evaluation",
+]
+HEAVY = ["numpy", "pandas", "joblib", "scipy", "sklearn", "matplotlib"]
+
+
+def _run(code: str, importtime: bool = False) -> tuple[float, str]:
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True)
+    return time.perf_counter() - t0, proc.stderr
+
+
+def parse_importtime(stderr: str) -> dict:
+    """name -> cumulative microseconds, for every module -X importtime listed."""
+    out = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        out[name.strip()] = int(cumulative)
+    return out
+
+
+def measure(module: str, repeat: int, baseline_s: float) -> dict:
+    best = None
+    for _ in range(repeat):
+        wall, stderr = _run(f"import {module}", importtime=True)
+        times = parse_importtime(stderr)
+        if best is None or times[module] < best[1][module]:
+            best = (wall, times)
+    # wall time without the -X importtime bookkeeping
+    wall = min(_run(f"import {module}")[0] for _ in range(repeat))
+    times = best[1]
+    return {
+        "import_ms": times[module] / 1e3,
+        **{pkg: (times[pkg] / 1e3 if pkg in times else None) for pkg in HEAVY},
+        "wall_ms": 1e3 * (wall - baseline_s),
+    }
+
+
+def record(path: Path, results: dict) -> None:
+    release = subprocess.run(["git", "describe", "--tags", "--always", "--dirty"], cwd=ROOT,
+                             capture_output=True, text=True).stdout.strip() or "unknown"
+    history = json.loads(path.read_text()) if path.exists() else []
+    history = [h for h in history if h["release"] != release]
+    history.append({
+        "release": release,
+        "date": dt.date.today().isoformat(),
+        "python": platform.python_version(),
+        "modules": results,
+    })
+    path.write_text(json.dumps(history, indent=2) + "\n")
+    print(f"Recorded release {release} in {path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time benchmark of the entry points.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module (best kept)")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--record", type=Path, default=None, help="JSON history to add this release's results to")
+    args = parser.parse_args()
+
+    baseline_s = min(_run("pass")[0] for _ in range(args.repeat))
+    results = {m: measure(m, args.repeat, baseline_s) for m in args.modules}
+
+    print(f"python {platform.python_version()}, interpreter start {1e3 * baseline_s:.0f} ms")
+    print(f"{'module':<26}{'import_ms':>10}" + "".join(f"{p:>11}" for p in HEAVY) + f"{'wall_ms':>10}")
+    for module, r in results.items():
+        heavy = "".join(f"{r[p]:>11.0f}" if r[p] is not None else f"{'-':>11}" for p in HEAVY)
+        print(f"{module:<26}{r['import_ms']:>10.0f}{heavy}{r['wall_ms']:>10.0f}")
+
+    if args.record:
+        record(args.record, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# python -m benchmarks.bench_matrix_modes [--rows 0]
+
+"""
+Design-matrix modes: fit time, peak memory and AUC per RunConfig.matrix_mode.
+
+Each variant fits one uncalibrated pipeline (preprocessor + LR) on the run's
+training split and scores the held-out test split, in a fresh subprocess with
+the fold cache off. The peak-RSS mark is reset after loading, so peak +MB is
+the extra memory of the fit alone.
+
+    dense64 / lbfgs            the current default
+    dense64 / newton-cholesky  same matrix, the dense32 solver (separates solver from dtype)
+    dense32 / newton-cholesky  float32 matrix (lbfgs would upcast it back to float64)
+    sparse  / newton-cholesky  CSR, scaled but uncentered (the sparse "auto" solver)
+    sparse  / saga             CSR with the stochastic solver (slow: uncentered columns are ill-conditioned)
+    sparse  / lbfgs            CSR with the default solver
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.metrics import roc_auc_score
+
+from benchmarks.bench_features import current_rss_mb, peak_rss_mb, reset_peak_rss
+from config import RunConfig
+from src.features.preprocessing import identify_feature_types
+from src.models.pipeline import build_pipeline, make_splits
+from src.run_evaluation import load_features
+
+ROOT = Path(__file__).resolve().parent.parent
+VARIANTS = [
+    ("dense64", "lbfgs"),
+    ("dense64", "newton-cholesky"),
+    ("dense32", "newton-cholesky"),
+    ("sparse", "newton-cholesky"),
+    ("sparse", "saga"),
+    ("sparse", "lbfgs"),
+]
+
+
+def _matrix_mb(Xt) -> float:
+    if sp.issparse(Xt):
+        return (Xt.data.nbytes + Xt.indices.nbytes + Xt.indptr.nbytes) / 1e6
+    return Xt.nbytes / 1e6
+
+
+def _run_child(mode: str, solver: str, rows: int) -> dict:
+    cfg = replace(RunConfig(), matrix_mode=mode, solver=solver, preprocess_cache="")
+    df = load_features([cfg])
+    if rows:
+        df = df.iloc[:rows]
+    X_train, X_test, y_train, y_test = make_splits(df, cfg)
+    pipe = build_pipeline(*identify_feature_types(X_train), cfg)
+
+    reset_peak_rss()
+    base = current_rss_mb()
+    t0 = time.perf_counter()
+    pipe.fit(X_train, y_train)
+    fit_s = time.perf_counter() - t0
+    peak = peak_rss_mb() - base
+
+    Xt = pipe[:-1].transform(X_train)
+    return {
+        "mode": mode,
+        "solver": solver,
+        "fit_s": fit_s,
+        "n_iter": int(np.max(pipe[-1].n_iter_)),
+        "peak_extra_mb": peak,
+        "matrix_mb": _matrix_mb(Xt),
+        "dtype": str(Xt.dtype),
+        "test_auc": roc_auc_score(y_test, pipe.predict_proba(X_test)[:, 1]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit time / peak memory / AUC per design-matrix mode.")
+    parser.add_argument("--rows", type=int, default=0, help="use only the first N rows (0: all)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "SOLVER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_run_child(*args.child, args.rows)))
+        return
+
+    print(f"{'mode':<9}{'solver':<17}{'fit s':>8}{'iters':>7}{'peak +MB':>10}{'matrix MB':>11}{'test AUC':>10}")
+    for mode, solver in VARIANTS:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_matrix_modes", "--child", mode, solver, "--rows", str(args.rows)],
+            capture_output=True, text=True, check=True, cwd=ROOT,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{r['mode']:<9}{r['solver']:<17}{r['fit_s']:>8.2f}{r['n_iter']:>7}{r['peak_extra_mb']:>10.1f}"
+              f"{r['matrix_mb']:>11.1f}{r['test_auc']:>10.6f}")
+
+
+if __name__ == "__main__":
+    main()
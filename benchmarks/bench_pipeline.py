@@ -0,0 +1,227 @@
+# python -m benchmarks.bench_pipeline [--scales 1 10 100] [--out results.json] [--baseline benchmarks/baseline.json]
+
+"""
+End-to-end stage timings on synthetic data at 1x / 10x / 100x the real size.
+
+For each --scales entry a synthetic application_train.csv (src.data.synthetic)
+is written once to data/raw/synthetic/ and reused by later invocations. Then
+every stage of a run is timed on it, in pipeline order:
+
+    load_data (parse)       first read: CSV parse + columnar cache build
+    load_data               cached read of every column
+    add_application_features
+    make_splits
+    build_pipeline + train  default RunConfig (Platt-calibrated 5-fold ensemble)
+    run_cv                  5-fold CV of the bare pipeline
+    predict_proba           the test set
+    out_of_fold_predictions the calibrated folds' held-out scores (the default CV)
+    evaluate.*              every function of src.evaluation.evaluate, each on
+                            its own (no shared SortedScores), writing to a temp dir
+    ks_statistic
+    score_applicant         per call, over --single applicants (model already loaded)
+
+The fold preprocessing cache is off (each fit pays its own preprocessing)
+and the run cache is never consulted, so a stage's time is its own cost,
+not a function of what ran before it. Stages under a second are repeated
+--repeat times and the best is kept.
+
+Results (seconds per stage per scale, with the git SHA, library versions and
+CPU count) go to --out as JSON. With --baseline, each stage is compared to
+the same stage and scale in that file: slower by more than --tolerance (and
+by more than the --min-delta noise floor) is a regression, listed and
+signalled by exit status 1. A scale or stage the baseline has no entry for
+cannot be compared: it is listed too and also exits 1, so a run at a new
+scale never passes unchecked. --update-baseline writes this run as the new
+baseline instead.
+
+100x is ~31M rows: it needs a machine whose memory holds that frame several
+times over.
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from config import RunConfig
+from src.data.synthetic import scaled_rows, write_application
+from src.evaluation import evaluate
+from src.evaluation.metrics import ks_statistic
+from src.features.feature_engineering import add_application_features
+from src.features.preprocessing import identify_feature_types
+from src.models.parallel import fold_parallelism
+from src.models.pipeline import build_pipeline, load_data, make_splits, out_of_fold_predictions, persist, train
+from src.run_cache import library_versions
+from src.score import score_applicant
+from src.tracking import git_sha
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data" / "raw" / "synthetic"
+REPEAT_BELOW_S = 1.0
+
+
+def dataset(scale: float, seed: int) -> Path:
+    """The synthetic CSV for `scale`, written on first use."""
+    path = DATA_DIR / f"application_train_x{scale:g}_seed{seed}.csv"
+    if not path.exists():
+        t0 = time.perf_counter()
+        n = write_application(path, scale, seed)
+        print(f"  generated {n:,} rows -> {path} ({time.perf_counter() - t0:.0f}s)")
+    return path
+
+
+class Stages:
+    """Runs and times named stages, keeping each one's best wall time."""
+
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.seconds: dict[str, float] = {}
+
+    def __call__(self, name: str, fn, *args, repeat: bool = True, calls: int = 1, **kwargs):
+        """fn(*args, **kwargs), timed; `calls`: the time recorded is per call of that many."""
+        t0 = time.perf_counter()
+        out = fn(*args, **kwargs)
+        best = time.perf_counter() - t0
+        for _ in range(self.repeat - 1 if repeat and best < REPEAT_BELOW_S else 0):
+            t0 = time.perf_counter()
+            fn(*args, **kwargs)
+            best = min(best, time.perf_counter() - t0)
+        self.seconds[name] = best / calls
+        print(f"  {name:<38}{best / calls:>10.4f}s")
+        return out
+
+
+def run_scale(scale: float, args, cfg: RunConfig) -> dict:
+    path = dataset(scale, args.seed)
+    time_stage = Stages(args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # The parse stage must not find an entry from an earlier invocation.
+        csv = tmp / path.name
+        os.symlink(path, csv)
+        time_stage("load_data (parse)", load_data, csv, repeat=False)
+        df = time_stage("load_data", load_data, csv)
+        df = time_stage("add_application_features", add_application_features, df)
+        X_train, X_test, y_train, y_test = time_stage("make_splits", make_splits, df, cfg)
+        numeric_cols, categorical_cols = identify_feature_types(X_train)
+
+        def build_and_train():
+            return train(build_pipeline(numeric_cols, categorical_cols, cfg), X_train, y_train, cfg)
+
+        def cv():
+            with fold_parallelism(cfg):
+                return evaluate.run_cv(build_pipeline(numeric_cols, categorical_cols, cfg), X_train, y_train)
+
+        model = time_stage("build_pipeline + train", build_and_train)
+        time_stage("run_cv", cv)
+        y_pred = time_stage("predict_proba", lambda: model.predict_proba(X_test)[:, 1])
+
+        oof = time_stage("out_of_fold_predictions", out_of_fold_predictions, model, X_train, y_train)
+        base = model.calibrated_classifiers_[0].estimator if hasattr(model, "calibrated_classifiers_") else model
+        names = base.named_steps["preprocessor"].get_feature_names_out().tolist()
+        time_stage("evaluate.cv_from_oof", evaluate.cv_from_oof, oof)
+        time_stage("evaluate.plot_roc", evaluate.plot_roc, y_test, y_pred, tmp / "roc.png")
+        time_stage("evaluate.plot_pr", evaluate.plot_pr, y_test, y_pred, tmp / "pr.png")
+        time_stage("evaluate.calibration_report", evaluate.calibration_report, y_test, y_pred,
+                   n_bins=10, outpath_fig=tmp / "cal.png", outpath_table=tmp / "cal.csv")
+        time_stage("evaluate.gains_lift_table", evaluate.gains_lift_table, y_test, y_pred,
+                   n_bins=10, outpath_table=tmp / "gains.csv", outpath_fig=tmp / "gains.png")
+        time_stage("evaluate.score_distribution_plot", evaluate.score_distribution_plot,
+                   y_test, y_pred, tmp / "dist.png")
+        time_stage("evaluate.logistic_coefficients_table", evaluate.logistic_coefficients_table,
+                   base, names, tmp / "coef.csv", top_k=40)
+        time_stage("evaluate.compare_models", evaluate.compare_models, {"model": model}, X_test, y_test)
+        time_stage("ks_statistic", ks_statistic, y_test, y_pred)
+
+        model_path = tmp / "model.joblib"
+        persist(model, model_path)
+        records = df.loc[X_test.index[:args.single]].drop(columns=["TARGET"]).to_dict(orient="records")
+        score_applicant(records[0], model_path)     # load the model outside the clock
+
+        def score_each():
+            for r in records:
+                score_applicant(r, model_path)
+
+        time_stage("score_applicant", score_each, calls=len(records))
+
+    return {"rows": scaled_rows(scale), "stages": time_stage.seconds}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float) -> tuple[list[tuple], list[tuple]]:
+    """
+    (regressions, missing): (scale, stage, baseline s, current s) for every
+    stage slower than the baseline allows, and (scale, stage) for every stage
+    the baseline has no time for at that scale.
+    """
+    regressions, missing = [], []
+    for scale, current in results["scales"].items():
+        old = baseline.get("scales", {}).get(scale, {}).get("stages", {})
+        for stage, seconds in current["stages"].items():
+            if stage not in old:
+                missing.append((scale, stage))
+            elif seconds > old[stage] * (1 + tolerance) and seconds - old[stage] > min_delta:
+                regressions.append((scale, stage, old[stage], seconds))
+    return regressions, missing
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-stage timings on synthetic data at several scales.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0], help="multiples of the real 307,511 rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each sub-second stage (best kept)")
+    parser.add_argument("--single", type=int, default=200, help="applicants scored one by one")
+    parser.add_argument("--out", type=Path, default=None, help="write this run's results here (JSON)")
+    parser.add_argument("--baseline", type=Path, default=None, help="results JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run to --baseline instead")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs the baseline (0.2 = 20%%)")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="ignore slowdowns under this many seconds")
+    args = parser.parse_args()
+
+    cfg = replace(RunConfig(), preprocess_cache="", run_cache="", figures="none")
+    results = {
+        "date": dt.datetime.now().isoformat(timespec="seconds"),
+        "git_sha": git_sha(),
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+        "libraries": library_versions(),
+        "scales": {},
+    }
+    for scale in args.scales:
+        print(f"scale {scale:g}x ({scaled_rows(scale):,} rows)")
+        results["scales"][f"{scale:g}"] = run_scale(scale, args, cfg)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Results -> {args.out}")
+    if args.baseline is None:
+        return
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions, missing = compare(results, baseline, args.tolerance, args.min_delta)
+    print(f"vs baseline {args.baseline} (git {baseline.get('git_sha', '?')[:12]}, {baseline.get('date')}): "
+          f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+    for scale, stage, old, new in regressions:
+        print(f"  {scale}x {stage:<38}{old:>10.3f}s -> {new:.3f}s ({new / old - 1:+.0%})")
+    if missing:
+        baseline_scales = ", ".join(f"{s}x" for s in baseline.get("scales", {})) or "none"
+        print(f"{len(missing)} stage(s) not compared: no baseline entry (baseline scales: {baseline_scales})")
+        for scale, stage in missing:
+            print(f"  {scale}x {stage}")
+    if regressions or missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
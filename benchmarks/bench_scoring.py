@@ -0,0 +1,89 @@
+# python -m benchmarks.bench_scoring [--model reports/<run>/model.joblib] [--rows 20000]
+
+"""
+Scoring throughput: single-row vs batched paths of src.score.
+
+Three paths are timed on the same applicant rows:
+- reload:   the old behaviour, joblib.load + one-row DataFrame per applicant,
+- cached:   score_applicant with the model loaded once (one-row frames),
+- batched:  score_batch over the whole frame in chunks.
+
+Reported as rows/sec. The per-row paths are timed on a small sample (they are
+slow by construction); the batched path on --rows rows.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from src.features.feature_engineering import add_application_features
+from src.score import score_applicant, score_batch, load_scorer
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def latest_model(reports_dir: Path) -> Path:
+    """Most recently written reports/*/model.joblib."""
+    models = sorted(reports_dir.glob("*/model.joblib"), key=lambda p: p.stat().st_mtime)
+    if not models:
+        raise FileNotFoundError(f"no */model.joblib under {reports_dir}; run src.run_evaluation first")
+    return models[-1]
+
+
+def _reload_per_row(features: dict, model_path: Path, threshold: float = 0.08) -> tuple[float, str]:
+    # The pre-Scorer score_applicant: unpickle the model on every call.
+    model = joblib.load(model_path)
+    df = add_application_features(pd.DataFrame([features]))
+    pd_hat = float(model.predict_proba(df)[0, 1])
+    return (pd_hat, "reject" if pd_hat >= threshold else "approve")
+
+
+def _rate(n_rows: int, seconds: float) -> float:
+    return n_rows / seconds if seconds > 0 else float("inf")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", type=Path, default=None)
+    parser.add_argument("--data", type=Path, default=ROOT / "data" / "raw" / "application_train.csv")
+    parser.add_argument("--rows", type=int, default=20_000, help="rows for the batched path")
+    parser.add_argument("--single-rows", type=int, default=200, help="rows for the per-row paths")
+    args = parser.parse_args()
+
+    model_path = args.model or latest_model(ROOT / "reports")
+    df = pd.read_csv(args.data, nrows=args.rows)
+    records = df.head(args.single_rows).to_dict(orient="records")
+    print(f"model: {model_path}")
+
+    t0 = time.perf_counter()
+    for rec in records[: max(1, len(records) // 10)]:
+        _reload_per_row(rec, model_path)
+    reload_s = time.perf_counter() - t0
+    n_reload = max(1, len(records) // 10)
+
+    load_scorer(model_path)  # warm the cache so the timing below excludes the one-off load
+    t0 = time.perf_counter()
+    for rec in records:
+        score_applicant(rec, model_path)
+    cached_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    scored = score_batch(df, model_path)
+    batch_s = time.perf_counter() - t0
+
+    rows = [
+        ("reload per row", n_reload, reload_s),
+        ("cached per row", len(records), cached_s),
+        ("batched", len(scored), batch_s),
+    ]
+    print(f"{'path':<16}{'rows':>10}{'seconds':>10}{'rows/sec':>12}")
+    for name, n, s in rows:
+        print(f"{name:<16}{n:>10,}{s:>10.2f}{_rate(n, s):>12,.0f}")
+    print(f"batched vs reload-per-row speedup: {_rate(len(scored), batch_s) / _rate(n_reload, reload_s):,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
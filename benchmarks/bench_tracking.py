@@ -0,0 +1,113 @@
+# python -m benchmarks.bench_tracking [--runs 5000] [--template reports/<run_id>/run.json]
+
+"""
+Run comparison at sweep scale: the old glob-and-parse load_runs vs the
+SQLite run index of src.tracking.
+
+--runs synthetic run directories are written to a temporary reports/ from
+one template run.json (the newest under reports/, or a minimal record),
+each with its own run_id, git SHA, C, class_weight and test AUC. Timed:
+
+    glob + json_normalize   the previous load_runs: parse every run.json
+    initial sync            build runs.sqlite from scratch (once)
+    no-op sync              stat every run.json, nothing re-read
+    sync +10 runs           10 new run directories indexed incrementally
+    load_runs               synced full view (every column of every run)
+    top_runs k=10           best 10 by metrics.test.auc, no sync
+    by SHA / by config      query_runs(git_sha=...) / query_runs(where={"C": ...}),
+                            every column, then only the 5 a comparison table shows
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.tracking import load_runs, query_runs, sync_index, top_runs
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def template_record(path: Path = None) -> dict:
+    if path is None:
+        runs = sorted((ROOT / "reports").glob("*/run.json"), key=lambda p: p.stat().st_mtime)
+        path = runs[-1] if runs else None
+    if path is not None:
+        return json.loads(Path(path).read_text())
+    return {"run_id": "", "git_sha": "", "git_dirty": False,
+            "metrics": {"test": {"auc": 0.0}, "cv": {"roc_auc_mean": 0.0}},
+            "config": {"C": 1.0, "class_weight": "balanced"}}
+
+
+def write_runs(reports: Path, template: dict, start: int, n: int, rng: np.random.Generator) -> None:
+    shas = [hashlib.sha1(str(i).encode()).hexdigest() for i in range(20)]
+    for i in range(start, start + n):
+        r = copy.deepcopy(template)
+        r["run_id"] = f"bench_{i:06d}"
+        r["git_sha"] = shas[i % len(shas)]
+        r["metrics"]["test"]["auc"] = float(0.68 + 0.02 * rng.random())
+        r["config"]["C"] = float([0.01, 0.1, 1.0, 10.0][i % 4])
+        r["config"]["class_weight"] = ["balanced", "none"][i % 2]
+        d = reports / f"bench_{i:06d}"
+        d.mkdir()
+        (d / "run.json").write_text(json.dumps(r, indent=2))
+
+
+def _time(fn, repeat: int = 1):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="glob-and-parse vs indexed run comparison.")
+    parser.add_argument("--runs", type=int, default=5000)
+    parser.add_argument("--template", type=Path, default=None, help="run.json to replicate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    template = template_record(args.template)
+    with tempfile.TemporaryDirectory() as tmp:
+        reports = Path(tmp)
+        write_runs(reports, template, 0, args.runs, rng)
+
+        def glob_and_parse():
+            records = [json.loads(p.read_text()) for p in reports.glob("*/run.json")]
+            return pd.json_normalize(records).sort_values("metrics.test.auc", ascending=False)
+
+        rows = [("glob + json_normalize", *_time(glob_and_parse))]
+        rows.append(("initial sync", *_time(lambda: sync_index(reports))))
+        rows.append(("no-op sync", *_time(lambda: sync_index(reports), repeat=3)))
+        write_runs(reports, template, args.runs, 10, rng)
+        rows.append(("sync +10 runs", *_time(lambda: sync_index(reports))))
+        rows.append(("load_runs", *_time(lambda: load_runs(reports))))
+        rows.append(("top_runs k=10", *_time(lambda: top_runs(k=10, reports_dir=reports), repeat=5)))
+        sha = hashlib.sha1(b"3").hexdigest()[:12]
+        rows.append(("by SHA", *_time(lambda: query_runs(reports, git_sha=sha), repeat=5)))
+        rows.append(("by config", *_time(lambda: query_runs(reports, where={"C": 0.1, "class_weight": "none"}),
+                                          repeat=5)))
+        view = ["run_id", "git_sha", "metrics.test.auc", "config.C", "config.class_weight"]
+        rows.append(("by config, 5 cols", *_time(lambda: query_runs(
+            reports, where={"C": 0.1, "class_weight": "none"}, columns=view), repeat=5)))
+
+        size = (reports / "runs.sqlite").stat().st_size
+        print(f"{args.runs + 10:,} runs, index {size / 1e6:.1f} MB")
+        print(f"{'step':<24}{'ms':>10}{'result':>24}")
+        for name, seconds, out in rows:
+            result = f"{len(out):,} rows" if isinstance(out, pd.DataFrame) else \
+                f"+{out['added']} / ~{out['updated']} / -{out['removed']}"
+            print(f"{name:<24}{1e3 * seconds:>10.1f}{result:>24}")
+
+
+if __name__ == "__main__":
+    main()
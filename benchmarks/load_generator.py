@@ -0,0 +1,130 @@
+# python -m benchmarks.load_generator [--url http://127.0.0.1:8080] [--concurrency 64] [--requests 5000]
+#        python -m benchmarks.load_generator --spawn reports/<run_id>/model.joblib   (starts src.serve itself)
+
+"""
+Closed-loop load generator for the src.serve scoring service.
+
+`concurrency` keep-alive connections each send single-applicant POST /score
+requests back to back (payloads are real rows of application_train.csv) until
+`requests` have completed in total. Reports throughput, latency percentiles
+and the server's mean micro-batch size from /health.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+async def _request(reader, writer, host: str, method: str, path: str, body: bytes = b"") -> bytes:
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    await reader.readline()                          # status line
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        key, _, value = line.decode().partition(":")
+        if key.lower() == "content-length":
+            length = int(value)
+    return await reader.readexactly(length)
+
+
+async def _client(host, port, payloads, counter, latencies) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] > 0:
+            counter[0] -= 1
+            body = payloads[counter[0] % len(payloads)]
+            t0 = time.perf_counter()
+            await _request(reader, writer, host, "POST", "/score", body)
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        writer.close()
+
+
+async def _wait_ready(host: str, port: int, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"server at {host}:{port} did not come up")
+            await asyncio.sleep(0.2)
+
+
+async def run_load(url: str, payloads: list[bytes], concurrency: int, n_requests: int) -> dict:
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+    await _wait_ready(host, port)
+
+    counter, latencies = [n_requests], []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, payloads, counter, latencies) for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+
+    reader, writer = await asyncio.open_connection(host, port)
+    health = json.loads(await _request(reader, writer, host, "GET", "/health"))
+    writer.close()
+
+    lat_ms = np.asarray(latencies) * 1e3
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": wall,
+        "throughput_rps": len(latencies) / wall,
+        "p50_ms": float(np.percentile(lat_ms, 50)),
+        "p99_ms": float(np.percentile(lat_ms, 99)),
+        "max_ms": float(lat_ms.max()),
+        "server_mean_batch": health.get("mean_batch"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the src.serve scoring service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--data", type=Path, default=ROOT / "data" / "raw" / "application_train.csv")
+    parser.add_argument("--payload-rows", type=int, default=2000)
+    parser.add_argument("--spawn", type=Path, default=None, metavar="MODEL",
+                        help="start `python -m src.serve --model MODEL` for the duration of the test")
+    parser.add_argument("--serve-args", default="", help="extra arguments for the spawned server")
+    args = parser.parse_args()
+
+    rows = pd.read_csv(args.data, nrows=args.payload_rows).drop(columns=["TARGET"], errors="ignore")
+    payloads = [json.dumps(r).encode() for r in rows.to_dict(orient="records")]
+
+    server = None
+    if args.spawn is not None:
+        port = urlparse(args.url).port or 80
+        cmd = [sys.executable, "-m", "src.serve", "--model", str(args.spawn), "--port", str(port)]
+        server = subprocess.Popen(cmd + args.serve_args.split(), cwd=ROOT)
+    try:
+        result = asyncio.run(run_load(args.url, payloads, args.concurrency, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"{result['requests']:,} requests, concurrency {result['concurrency']}, {result['seconds']:.2f}s")
+    print(f"throughput {result['throughput_rps']:,.0f} req/s | p50 {result['p50_ms']:.2f} ms | "
+          f"p99 {result['p99_ms']:.2f} ms | max {result['max_ms']:.2f} ms | "
+          f"server mean batch {result['server_mean_batch']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,27 @@ from dataclasses import dataclass, field
 class RunConfig:
     class_weight: str = "balanced"
     calibration: str = "platt"
+    C: float = 1.0                      # inverse L2 strength of the logistic regression
+    matrix_mode: str = "dense64"        # design matrix: "dense64", "dense32" or "sparse" (CSR, uncentered)
+    solver: str = "auto"                # LR solver ("lbfgs", "newton-cholesky", "saga", ...); "auto" picks per matrix_mode
+    calibration_ensemble: bool = True   # False: one pipeline + one Platt sigmoid fit on out-of-fold scores
+    compare_calibration: bool = False   # also fit the other calibration mode and record the trade-off
+    cv_from_calibration: bool = True    # CV metrics from the calibration folds' out-of-fold scores (no separate run_cv)
+    n_jobs: int = 1                     # CV / calibration folds fitted in parallel (-1: one worker per core)
+    parallel_backend: str = "loky"      # joblib backend for those folds: "loky", "multiprocessing", "threading"
+    parallel_max_nbytes: str = "1M"     # fold arrays above this are memory-mapped into workers, not pickled
+    preprocess_cache: str = "reports/.preprocess_cache"  # fold-level preprocessing cache ("" disables)
+    preprocess_cache_mb: int = 4096     # LRU-evicted beyond this size (~400 MB per training fold)
+    run_cache: str = "reports/.run_cache"  # trained model + predictions keyed by code / config / data ("" disables)
+    run_cache_mb: int = 2048            # LRU-evicted beyond this size (~15 MB per trained run)
+    bootstrap_replicates: int = 1000    # test-set bootstrap resamples behind the AUC / PR-AUC / KS CIs (0: off)
+    bootstrap_method: str = "multinomial"  # resample weights: "multinomial" (classic) or "poisson"
+    lgd: float = 1.0                    # loss given default in the threshold / expected-loss sweep (worst case)
+    revenue_margin: float = 0.12        # revenue of a performing loan / its exposure; break-even PD = margin / (margin + lgd) ~ 0.107
+    figures: str = "inline"             # "inline", "deferred" (rendered in a process pool after logging) or "none" (no matplotlib)
+    trace_memory: bool = False          # also record each stage's peak Python heap (tracemalloc; slows the run)
+    profile: str = ""                   # "" off, "sample" (stack sampler) or "cprofile": profile.pstats + .collapsed in the run dir
+    bureau_features: bool = False       # join per-applicant bureau / bureau_balance aggregates (src.features.bureau)
     drop_cols: list[str] = field(default_factory=lambda: ["DAYS_BIRTH", "DAYS_EMPLOYED"])
     keep_cols: list[str] = field(default_factory=list)
     version: str = "v3" # optional human tag; the git SHA is the real identity
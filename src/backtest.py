@@ -0,0 +1,120 @@
+# python -m src.backtest scored_2024-*.csv [--target TARGET] [--score pd] [--workers 4] [--exact]
+#        python -m src.backtest reports/<run_id>/tables/oof_predictions.csv --target y_true --exact
+
+"""
+Backtest: AUC / PR-AUC / KS and calibration + gains tables over scored files
+of any size, in constant memory.
+
+Each file (a CSV with a 0/1 target column and a PD column, e.g. the output of
+Scorer.iter_batches joined to observed outcomes) is streamed in chunks into a
+ScoreHistogram; files are processed in parallel across `--workers` and their
+histograms merged. Every metric is reported with its approximation bound
+(see src.evaluation.streaming). With `--exact` the rows are also loaded into
+memory and scored by SortedScores -- only for samples that fit -- and each
+exact value is checked against its bound.
+
+Writes backtest.json, calibration_table.csv, gains_lift_table.csv and the
+merged histogram.npz to reports/backtest_<timestamp>/ (or --out).
+"""
+
+import argparse
+import datetime as dt
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.evaluation.streaming import DEFAULT_BINS, ScoreHistogram
+
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def histogram_file(path: Path, target: str, score: str, n_bins: int = DEFAULT_BINS,
+                   chunksize: int = DEFAULT_CHUNKSIZE) -> ScoreHistogram:
+    """Stream one scored CSV into a ScoreHistogram, `chunksize` rows at a time."""
+    h = ScoreHistogram(n_bins)
+    for chunk in pd.read_csv(path, usecols=[target, score], chunksize=chunksize):
+        h.update(chunk[target].to_numpy(), chunk[score].to_numpy())
+    return h
+
+
+def run_backtest(paths: list[Path], target: str, score: str, n_bins: int = DEFAULT_BINS,
+                 chunksize: int = DEFAULT_CHUNKSIZE, workers: int = 1) -> ScoreHistogram:
+    """One histogram per file (in parallel), merged."""
+    parts = Parallel(n_jobs=min(workers, len(paths)))(
+        delayed(histogram_file)(p, target, score, n_bins, chunksize) for p in paths
+    )
+    merged = ScoreHistogram(n_bins)
+    for h in parts:
+        merged.merge(h)
+    return merged
+
+
+def exact_check(paths: list[Path], target: str, score: str, summary: dict) -> dict:
+    """Exact metrics on the same rows, and whether each lies within its bound."""
+    from src.evaluation.sorted_scores import SortedScores
+
+    df = pd.concat([pd.read_csv(p, usecols=[target, score]) for p in paths], ignore_index=True)
+    scores = SortedScores(df[target].to_numpy(), df[score].to_numpy())
+    auc, ap = scores.roc_auc(), scores.average_precision()
+    ks, ks_thresh = scores.ks()
+    return {
+        "auc": auc,
+        "pr_auc": ap,
+        "ks": ks,
+        "ks_thresh": ks_thresh,
+        "auc_within_bound": abs(auc - summary["auc"]) <= summary["auc_max_err"] + 1e-12,
+        "pr_auc_within_bound": summary["pr_auc_lo"] - 1e-12 <= ap <= summary["pr_auc_hi"] + 1e-12,
+        "ks_within_bound": summary["ks"] - 1e-12 <= ks <= summary["ks"] + summary["ks_max_err"] + 1e-12,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Constant-memory backtest of scored files.")
+    parser.add_argument("paths", nargs="+", type=Path, help="scored CSV files (merged into one backtest)")
+    parser.add_argument("--target", default="TARGET", help="0/1 outcome column")
+    parser.add_argument("--score", default="pd", help="predicted PD column")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="fine histogram bins over [0, 1]")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=1, help="files processed in parallel")
+    parser.add_argument("--table-bins", type=int, default=10, help="quantile bins of the two tables")
+    parser.add_argument("--exact", action="store_true", help="also compute exact metrics in memory and check the bounds")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    out = args.out or Path("reports") / ("backtest_" + dt.datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+    out.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    h = run_backtest(args.paths, args.target, args.score, args.bins, args.chunksize, args.workers)
+    summary = h.summary()
+    calibration = h.calibration_table(args.table_bins)
+    gains = h.gains_table(args.table_bins)
+    elapsed = time.perf_counter() - t0
+
+    record = {"files": [str(p) for p in args.paths], "seconds": elapsed, "metrics": summary}
+    if args.exact:
+        record["exact"] = exact_check(args.paths, args.target, args.score, summary)
+
+    h.save(out / "histogram.npz")
+    calibration.to_csv(out / "calibration_table.csv", index=False)
+    gains.to_csv(out / "gains_lift_table.csv", index=False)
+    with open(out / "backtest.json", "w") as f:
+        json.dump(record, f, indent=2, default=lambda o: o.item() if isinstance(o, np.generic) else str(o))
+
+    print(f"{summary['n']:,} rows ({summary['n_pos']:,} defaults) from {len(args.paths)} file(s) in {elapsed:.1f}s")
+    print(f"AUC: {summary['auc']:.6f} +/- {summary['auc_max_err']:.1e} | "
+          f"PR-AUC: {summary['pr_auc']:.6f} in [{summary['pr_auc_lo']:.6f}, {summary['pr_auc_hi']:.6f}] | "
+          f"KS: {summary['ks']:.6f} (+{summary['ks_max_err']:.1e}) at {summary['ks_thresh']:.6f}")
+    if args.exact:
+        e = record["exact"]
+        print(f"Exact: AUC {e['auc']:.6f} | PR-AUC {e['pr_auc']:.6f} | KS {e['ks']:.6f} -- within bounds: "
+              f"{e['auc_within_bound'] and e['pr_auc_within_bound'] and e['ks_within_bound']}")
+    print(f"Saved backtest to {out.resolve()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Columnar, typed on-disk cache for the raw CSV inputs.
+
+Parsing the ~300k x 122 application_train.csv with default float64/object
+dtypes dominates the start of every run, score demo and smoke check. The
+first read of a CSV writes one .npy file per column plus a manifest.json
+into <csv dir>/.columnar_cache/<stem>-<digest>/, with dtypes narrowed:
+
+- 0/1 integer flags -> int8; other integers -> the smallest int type that fits,
+- AMT_* amounts -> float32 when that is lossless (they are whole or half
+  units, so in practice always); other floats stay float64,
+- string columns -> pandas `category` (int8/int16 codes + a category list).
+
+Later reads load only the requested columns straight from their .npy files.
+An entry is keyed by the content digest of the source file; the stored
+(size, mtime_ns) lets an unchanged file skip re-hashing, and a touched but
+identical file re-hashes once and reuses the entry. Entries for an older
+version of the same file are removed when a new one is built.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+CACHE_FORMAT_VERSION = 1
+CACHE_DIRNAME = ".columnar_cache"
+AMOUNT_PREFIX = "AMT_"
+
+
+def file_digest(path: Path, chunk_bytes: int = 1 << 20) -> str:
+    """Content digest (blake2b-128, hex) of a file, read in 1 MiB chunks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_bytes):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _narrow_int(values: np.ndarray) -> np.ndarray:
+    if values.size == 0:
+        return values.astype(np.int8)
+    lo, hi = values.min(), values.max()
+    if lo >= 0 and hi <= 1:
+        return values.astype(np.int8)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def _narrow_float(name: str, values: np.ndarray) -> np.ndarray:
+    if name.startswith(AMOUNT_PREFIX):
+        narrowed = values.astype(np.float32)
+        if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+            return narrowed
+    return values
+
+
+def write_entry(df: pd.DataFrame, entry: Path, manifest: dict) -> None:
+    """Write df into `entry` as one narrowed .npy per column plus manifest.json (`manifest` + the column specs)."""
+    columns = []
+    for name in df.columns:
+        s = df[name]
+        fname = f"{len(columns):04d}.npy"
+        if pd.api.types.is_integer_dtype(s.dtype):
+            values = _narrow_int(s.to_numpy())
+            columns.append({"name": name, "file": fname, "kind": "numeric", "dtype": str(values.dtype)})
+        elif pd.api.types.is_float_dtype(s.dtype):
+            values = _narrow_float(name, s.to_numpy())
+            columns.append({"name": name, "file": fname, "kind": "numeric", "dtype": str(values.dtype)})
+        elif pd.api.types.is_bool_dtype(s.dtype):
+            values = s.to_numpy().astype(np.int8)
+            columns.append({"name": name, "file": fname, "kind": "numeric", "dtype": "int8"})
+        else:
+            cat = pd.Categorical(s)
+            values = cat.codes
+            columns.append({
+                "name": name, "file": fname, "kind": "category", "dtype": str(values.dtype),
+                "categories": [str(c) for c in cat.categories],
+            })
+        np.save(entry / fname, values, allow_pickle=False)
+
+    manifest["columns"] = columns
+    with open(entry / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=1)
+
+
+class ColumnarCache:
+    """A built cache entry: column names, row count, and column-selective reads."""
+
+    def __init__(self, entry: Path):
+        self.entry = entry
+        with open(entry / "manifest.json") as f:
+            self.manifest = json.load(f)
+        self._by_name = {c["name"]: c for c in self.manifest["columns"]}
+
+    @property
+    def columns(self) -> list[str]:
+        return [c["name"] for c in self.manifest["columns"]]
+
+    @property
+    def n_rows(self) -> int:
+        return self.manifest["n_rows"]
+
+    def read(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Load `columns` (default: all, in file order) into a typed DataFrame."""
+        names = self.columns if columns is None else list(columns)
+        missing = [c for c in names if c not in self._by_name]
+        if missing:
+            raise KeyError(f"columns not in {self.manifest['source']}: {missing}")
+
+        data = {}
+        for name in names:
+            meta = self._by_name[name]
+            values = np.load(self.entry / meta["file"], allow_pickle=False)
+            if meta["kind"] == "category":
+                values = pd.Categorical.from_codes(values, categories=meta["categories"])
+            data[name] = values
+        return pd.DataFrame(data)
+
+
+def _entries(cache_root: Path, source: Path) -> list[Path]:
+    # The glob alone would also match a sibling whose stem extends this one
+    # (application_train-2.csv): the manifest says which file an entry is for.
+    entries = []
+    for p in cache_root.glob(f"{source.stem}-*"):
+        if (p / "manifest.json").exists():
+            with open(p / "manifest.json") as f:
+                if json.load(f).get("source") == source.name:
+                    entries.append(p)
+    return entries
+
+
+def open_cache(path: Path, cache_root: Optional[Path] = None) -> ColumnarCache:
+    """
+    Return an up-to-date cache entry for the CSV at `path`, building it (one
+    full read_csv) if no entry matches the file's content.
+    """
+    path = Path(path)
+    cache_root = Path(cache_root) if cache_root is not None else path.parent / CACHE_DIRNAME
+    stat = path.stat()
+
+    # Fast path: an entry recorded for exactly this size + mtime.
+    for entry in _entries(cache_root, path):
+        cache = ColumnarCache(entry)
+        m = cache.manifest
+        if (m.get("format_version") == CACHE_FORMAT_VERSION
+                and m["size"] == stat.st_size and m["mtime_ns"] == stat.st_mtime_ns):
+            return cache
+
+    digest = file_digest(path)
+    entry = cache_root / f"{path.stem}-{digest}"
+    if (entry / "manifest.json").exists():
+        cache = ColumnarCache(entry)
+        if cache.manifest.get("format_version") == CACHE_FORMAT_VERSION and cache.manifest["source"] == path.name:
+            # Same content, new mtime (e.g. re-copied): re-key instead of rebuilding.
+            cache.manifest["mtime_ns"] = stat.st_mtime_ns
+            with open(entry / "manifest.json", "w") as f:
+                json.dump(cache.manifest, f, indent=1)
+            return cache
+
+    cache_root.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv(path)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{path.stem}-", dir=cache_root))
+    try:
+        write_entry(df, tmp, {
+            "format_version": CACHE_FORMAT_VERSION,
+            "source": path.name,
+            "digest": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "n_rows": len(df),
+        })
+        if entry.exists():
+            shutil.rmtree(entry)
+        os.replace(tmp, entry)
+    finally:
+        if tmp.exists():
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    for stale in _entries(cache_root, path):
+        if stale != entry:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    return ColumnarCache(entry)
+
+
+def read_csv_cached(
+    path: Path,
+    columns: Optional[Sequence[str]] = None,
+    cache_root: Optional[Path] = None,
+) -> pd.DataFrame:
+    """read_csv through the columnar cache, loading only `columns` (default: all)."""
+    return open_cache(path, cache_root).read(columns)
@@ -0,0 +1,430 @@
+# python -m src.data.synthetic [--scale 1] [--out data/raw/application_train.csv] [--bureau] [--force]
+
+"""
+Synthetic Home Credit-shaped data for benchmarks and smoke checks.
+
+`data/raw/application_train.csv` is not checked in, so nothing that needs rows
+can run on a fresh clone. generate_application() produces a frame with the
+same 122 columns, dtypes and quirks the pipeline relies on:
+
+- the DAYS_EMPLOYED 365243 "unknown" sentinel (~18% of rows),
+- missing EXT_SOURCE_1 / EXT_SOURCE_3 (~56% / ~20%) and sparse building stats,
+- the real categorical levels (ORGANIZATION_TYPE's 58, OCCUPATION_TYPE's 18, ...),
+- a ~8% TARGET rate driven by EXT_SOURCE_*, age and leverage, so the model
+  has real signal to find.
+
+Values are plausible, not realistic -- use it to time code paths and to check
+that they run, never to draw modelling conclusions.
+
+write_application() writes `scale` times the real row count (1x, 10x, 100x,
+or a fraction for a quick check) to CSV in chunks of REAL_N_ROWS, so memory
+stays at one chunk's worth whatever the scale. Chunk 0 uses `seed` itself:
+the first 307,511 rows of every scale are the 1x file.
+
+write_bureau() adds the two credit bureau tables for the applicants of an
+application file (synthetic or real), with the real schemas:
+
+- bureau.csv: ~5.5 prior credits per applicant (none for ~14%), ~1.7M rows
+  at 1x, with the real CREDIT_ACTIVE / CREDIT_TYPE levels and missingness,
+- bureau_balance.csv: a monthly STATUS history (C closed, X unknown, 0 on
+  time, 1-5 days-past-due buckets) for a third of those credits, ~27M rows.
+
+Defaulters (TARGET = 1) have somewhat more active and overdue credits and
+past-due months, so bureau aggregates carry a modest signal.
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from src.features.feature_engineering import DAYS_EMPLOYED_SENTINEL
+
+# Size of the real application_train.csv; scale factors multiply this.
+REAL_N_ROWS = 307_511
+
+CATEGORICAL_LEVELS = {
+    "NAME_CONTRACT_TYPE": ["Cash loans", "Revolving loans"],
+    "CODE_GENDER": ["F", "M", "XNA"],
+    "FLAG_OWN_CAR": ["N", "Y"],
+    "FLAG_OWN_REALTY": ["Y", "N"],
+    "NAME_TYPE_SUITE": ["Unaccompanied", "Family", "Spouse, partner", "Children",
+                        "Other_B", "Other_A", "Group of people"],
+    "NAME_INCOME_TYPE": ["Working", "Commercial associate", "Pensioner", "State servant",
+                         "Unemployed", "Student", "Businessman", "Maternity leave"],
+    "NAME_EDUCATION_TYPE": ["Secondary / secondary special", "Higher education",
+                            "Incomplete higher", "Lower secondary", "Academic degree"],
+    "NAME_FAMILY_STATUS": ["Married", "Single / not married", "Civil marriage",
+                           "Separated", "Widow", "Unknown"],
+    "NAME_HOUSING_TYPE": ["House / apartment", "With parents", "Municipal apartment",
+                          "Rented apartment", "Office apartment", "Co-op apartment"],
+    "OCCUPATION_TYPE": ["Laborers", "Sales staff", "Core staff", "Managers", "Drivers",
+                        "High skill tech staff", "Accountants", "Medicine staff",
+                        "Security staff", "Cooking staff", "Cleaning staff",
+                        "Private service staff", "Low-skill Laborers", "Waiters/barmen staff",
+                        "Secretaries", "Realty agents", "HR staff", "IT staff"],
+    "WEEKDAY_APPR_PROCESS_START": ["TUESDAY", "WEDNESDAY", "MONDAY", "THURSDAY",
+                                   "FRIDAY", "SATURDAY", "SUNDAY"],
+    "ORGANIZATION_TYPE": (
+        ["Business Entity Type 3", "XNA", "Self-employed", "Other", "Medicine",
+         "Business Entity Type 2", "Government", "School", "Trade: type 7",
+         "Kindergarten", "Construction", "Business Entity Type 1", "Transport: type 4",
+         "Trade: type 3", "Industry: type 9", "Industry: type 3", "Security", "Housing",
+         "Industry: type 11", "Military", "Bank", "Agriculture", "Police",
+         "Transport: type 2", "Postal", "Security Ministries", "Trade: type 2",
+         "Restaurant", "Services", "University", "Industry: type 7", "Transport: type 3",
+         "Industry: type 1", "Hotel", "Electricity", "Industry: type 4", "Trade: type 6",
+         "Industry: type 5", "Insurance", "Telecom", "Emergency", "Industry: type 2",
+         "Advertising", "Realtor", "Culture", "Industry: type 12", "Trade: type 1",
+         "Mobile", "Legal Services", "Cleaning", "Transport: type 1", "Industry: type 6",
+         "Industry: type 10", "Religion", "Industry: type 13", "Trade: type 4",
+         "Trade: type 5", "Industry: type 8"]
+    ),
+    "FONDKAPREMONT_MODE": ["reg oper account", "reg oper spec account",
+                           "not specified", "org spec account"],
+    "HOUSETYPE_MODE": ["block of flats", "specific housing", "terraced house"],
+    "WALLSMATERIAL_MODE": ["Panel", "Stone, brick", "Block", "Wooden", "Mixed",
+                           "Monolithic", "Others"],
+    "EMERGENCYSTATE_MODE": ["No", "Yes"],
+}
+
+# Share of missing values per categorical (the rest are always populated).
+CATEGORICAL_MISSING = {
+    "NAME_TYPE_SUITE": 0.004,
+    "OCCUPATION_TYPE": 0.31,
+    "FONDKAPREMONT_MODE": 0.68,
+    "HOUSETYPE_MODE": 0.50,
+    "WALLSMATERIAL_MODE": 0.51,
+    "EMERGENCYSTATE_MODE": 0.47,
+}
+
+BUILDING_STATS = [
+    "APARTMENTS", "BASEMENTAREA", "YEARS_BEGINEXPLUATATION", "YEARS_BUILD",
+    "COMMONAREA", "ELEVATORS", "ENTRANCES", "FLOORSMAX", "FLOORSMIN", "LANDAREA",
+    "LIVINGAPARTMENTS", "LIVINGAREA", "NONLIVINGAPARTMENTS", "NONLIVINGAREA",
+]
+
+# Column order of the real file.
+APPLICATION_COLUMNS = (
+    ["SK_ID_CURR", "TARGET", "NAME_CONTRACT_TYPE", "CODE_GENDER", "FLAG_OWN_CAR",
+     "FLAG_OWN_REALTY", "CNT_CHILDREN", "AMT_INCOME_TOTAL", "AMT_CREDIT", "AMT_ANNUITY",
+     "AMT_GOODS_PRICE", "NAME_TYPE_SUITE", "NAME_INCOME_TYPE", "NAME_EDUCATION_TYPE",
+     "NAME_FAMILY_STATUS", "NAME_HOUSING_TYPE", "REGION_POPULATION_RELATIVE",
+     "DAYS_BIRTH", "DAYS_EMPLOYED", "DAYS_REGISTRATION", "DAYS_ID_PUBLISH",
+     "OWN_CAR_AGE", "FLAG_MOBIL", "FLAG_EMP_PHONE", "FLAG_WORK_PHONE",
+     "FLAG_CONT_MOBILE", "FLAG_PHONE", "FLAG_EMAIL", "OCCUPATION_TYPE",
+     "CNT_FAM_MEMBERS", "REGION_RATING_CLIENT", "REGION_RATING_CLIENT_W_CITY",
+     "WEEKDAY_APPR_PROCESS_START", "HOUR_APPR_PROCESS_START",
+     "REG_REGION_NOT_LIVE_REGION", "REG_REGION_NOT_WORK_REGION",
+     "LIVE_REGION_NOT_WORK_REGION", "REG_CITY_NOT_LIVE_CITY",
+     "REG_CITY_NOT_WORK_CITY", "LIVE_CITY_NOT_WORK_CITY", "ORGANIZATION_TYPE",
+     "EXT_SOURCE_1", "EXT_SOURCE_2", "EXT_SOURCE_3"]
+    + [f"{s}_{agg}" for agg in ("AVG", "MODE", "MEDI") for s in BUILDING_STATS]
+    + ["FONDKAPREMONT_MODE", "HOUSETYPE_MODE", "TOTALAREA_MODE",
+       "WALLSMATERIAL_MODE", "EMERGENCYSTATE_MODE",
+       "OBS_30_CNT_SOCIAL_CIRCLE", "DEF_30_CNT_SOCIAL_CIRCLE",
+       "OBS_60_CNT_SOCIAL_CIRCLE", "DEF_60_CNT_SOCIAL_CIRCLE",
+       "DAYS_LAST_PHONE_CHANGE"]
+    + [f"FLAG_DOCUMENT_{i}" for i in range(2, 22)]
+    + [f"AMT_REQ_CREDIT_BUREAU_{p}" for p in ("HOUR", "DAY", "WEEK", "MON", "QRT", "YEAR")]
+)
+
+
+def _with_missing(rng: np.random.Generator, x: np.ndarray, rate: float) -> np.ndarray:
+    x = x.astype(float)
+    x[rng.random(len(x)) < rate] = np.nan
+    return x
+
+
+def generate_application(
+    n_rows: int = REAL_N_ROWS,
+    seed: Union[int, tuple] = 42,
+    start_id: int = 100002,
+) -> pd.DataFrame:
+    """
+    Generate `n_rows` synthetic applications with the application_train.csv
+    schema. Deterministic for a given (n_rows, seed, start_id); `seed` is
+    anything np.random.default_rng accepts.
+    """
+    rng = np.random.default_rng(seed)
+    n = n_rows
+    cols: dict[str, np.ndarray] = {}
+
+    cols["SK_ID_CURR"] = np.arange(start_id, start_id + n, dtype=np.int64)
+
+    for name, levels in CATEGORICAL_LEVELS.items():
+        # Zipf-ish level frequencies: the first level dominates, as in the real data.
+        w = 1.0 / np.arange(1, len(levels) + 1) ** 1.5
+        values = np.asarray(levels, dtype=object)[rng.choice(len(levels), size=n, p=w / w.sum())]
+        rate = CATEGORICAL_MISSING.get(name, 0.0)
+        if rate:
+            values[rng.random(n) < rate] = np.nan
+        cols[name] = values
+
+    cols["CNT_CHILDREN"] = rng.poisson(0.42, n)
+    income = np.round(np.exp(rng.normal(11.95, 0.5, n)) / 450) * 450
+    credit = np.round(np.exp(rng.normal(13.1, 0.7, n)) / 450) * 450
+    cols["AMT_INCOME_TOTAL"] = income
+    cols["AMT_CREDIT"] = credit
+    cols["AMT_ANNUITY"] = _with_missing(rng, np.round(credit * rng.uniform(0.03, 0.08, n), 1), 0.00004)
+    cols["AMT_GOODS_PRICE"] = _with_missing(rng, np.round(credit * rng.uniform(0.75, 1.0, n) / 450) * 450, 0.0009)
+    cols["REGION_POPULATION_RELATIVE"] = np.round(rng.beta(2, 60, n), 6)
+
+    days_birth = -rng.integers(7489, 25229, n)
+    days_employed = -rng.integers(0, 17912, n)
+    days_employed[rng.random(n) < 0.18] = DAYS_EMPLOYED_SENTINEL
+    cols["DAYS_BIRTH"] = days_birth
+    cols["DAYS_EMPLOYED"] = days_employed
+    cols["DAYS_REGISTRATION"] = -rng.integers(0, 24672, n).astype(float)
+    cols["DAYS_ID_PUBLISH"] = -rng.integers(0, 7197, n)
+    cols["OWN_CAR_AGE"] = _with_missing(rng, rng.integers(0, 40, n), 0.66)
+
+    for flag, p in [("FLAG_MOBIL", 1.0), ("FLAG_EMP_PHONE", 0.82), ("FLAG_WORK_PHONE", 0.2),
+                    ("FLAG_CONT_MOBILE", 0.998), ("FLAG_PHONE", 0.28), ("FLAG_EMAIL", 0.057)]:
+        cols[flag] = (rng.random(n) < p).astype(np.int64)
+
+    cols["CNT_FAM_MEMBERS"] = _with_missing(rng, cols["CNT_CHILDREN"] + rng.integers(1, 3, n), 0.00001)
+    cols["REGION_RATING_CLIENT"] = rng.choice([1, 2, 3], size=n, p=[0.1, 0.74, 0.16])
+    cols["REGION_RATING_CLIENT_W_CITY"] = cols["REGION_RATING_CLIENT"]
+    cols["HOUR_APPR_PROCESS_START"] = rng.integers(0, 24, n)
+    for flag in ["REG_REGION_NOT_LIVE_REGION", "REG_REGION_NOT_WORK_REGION",
+                 "LIVE_REGION_NOT_WORK_REGION", "REG_CITY_NOT_LIVE_CITY",
+                 "REG_CITY_NOT_WORK_CITY", "LIVE_CITY_NOT_WORK_CITY"]:
+        cols[flag] = (rng.random(n) < 0.1).astype(np.int64)
+
+    ext1 = _with_missing(rng, rng.beta(3, 3, n), 0.56)
+    ext2 = _with_missing(rng, rng.beta(4, 2.5, n), 0.002)
+    ext3 = _with_missing(rng, rng.beta(4, 3, n), 0.20)
+    cols["EXT_SOURCE_1"], cols["EXT_SOURCE_2"], cols["EXT_SOURCE_3"] = ext1, ext2, ext3
+
+    building_missing = rng.random(n) < 0.5
+    for agg in ("AVG", "MODE", "MEDI"):
+        for stat in BUILDING_STATS:
+            x = np.round(rng.beta(1.5, 10, n), 4)
+            x[building_missing | (rng.random(n) < 0.1)] = np.nan
+            cols[f"{stat}_{agg}"] = x
+    total_area = np.round(rng.beta(1.5, 12, n), 4)
+    total_area[building_missing] = np.nan
+    cols["TOTALAREA_MODE"] = total_area
+
+    obs30 = _with_missing(rng, rng.poisson(1.4, n), 0.003)
+    cols["OBS_30_CNT_SOCIAL_CIRCLE"] = obs30
+    cols["DEF_30_CNT_SOCIAL_CIRCLE"] = np.where(np.isnan(obs30), np.nan, rng.binomial(np.nan_to_num(obs30).astype(int), 0.1))
+    cols["OBS_60_CNT_SOCIAL_CIRCLE"] = obs30
+    cols["DEF_60_CNT_SOCIAL_CIRCLE"] = cols["DEF_30_CNT_SOCIAL_CIRCLE"]
+    cols["DAYS_LAST_PHONE_CHANGE"] = -rng.integers(0, 4292, n).astype(float)
+
+    for i in range(2, 22):
+        cols[f"FLAG_DOCUMENT_{i}"] = (rng.random(n) < (0.7 if i == 3 else 0.01)).astype(np.int64)
+    for p, lam in [("HOUR", 0.006), ("DAY", 0.007), ("WEEK", 0.03),
+                   ("MON", 0.27), ("QRT", 0.27), ("YEAR", 1.9)]:
+        cols[f"AMT_REQ_CREDIT_BUREAU_{p}"] = _with_missing(rng, rng.poisson(lam, n), 0.135)
+
+    # Default risk: low external scores, youth, leverage and missing EXT_SOURCE
+    # raise the log-odds; the intercept is tuned for a ~8% base rate.
+    logit = (
+        -3.0
+        - 2.2 * (np.nan_to_num(ext2, nan=0.5) - 0.6)
+        - 2.6 * (np.nan_to_num(ext3, nan=0.45) - 0.55)
+        - 1.5 * (np.nan_to_num(ext1, nan=0.45) - 0.5)
+        + 0.35 * np.isnan(ext3) + 0.15 * np.isnan(ext1)
+        + 0.02 * (days_birth / 365.25 + 43)
+        + 0.12 * np.log(credit / income)
+        + 0.25 * (cols["CODE_GENDER"] == "M")
+        + rng.normal(0, 0.3, n)
+    )
+    cols["TARGET"] = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(np.int64)
+
+    return pd.DataFrame({c: cols[c] for c in APPLICATION_COLUMNS})
+
+
+def scaled_rows(scale: float) -> int:
+    """Row count of a file `scale` times the size of the real one."""
+    return max(int(round(REAL_N_ROWS * scale)), 1)
+
+
+def write_application(
+    path: Union[Path, str],
+    scale: float = 1.0,
+    seed: int = 42,
+    chunk_rows: int = REAL_N_ROWS,
+) -> int:
+    """
+    Write scaled_rows(scale) synthetic applications to the CSV at `path`,
+    `chunk_rows` at a time (chunk i > 0 is seeded with (seed, i)). Returns
+    the number of rows written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n_rows = scaled_rows(scale)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", newline="") as f:
+        for i, start in enumerate(range(0, n_rows, chunk_rows)):
+            chunk = generate_application(
+                min(chunk_rows, n_rows - start),
+                seed=seed if i == 0 else (seed, i),
+                start_id=100002 + start,
+            )
+            chunk.to_csv(f, index=False, header=(i == 0))
+    tmp.replace(path)
+    return n_rows
+
+
+BUREAU_COLUMNS = [
+    "SK_ID_CURR", "SK_ID_BUREAU", "CREDIT_ACTIVE", "CREDIT_CURRENCY", "DAYS_CREDIT",
+    "CREDIT_DAY_OVERDUE", "DAYS_CREDIT_ENDDATE", "DAYS_ENDDATE_FACT", "AMT_CREDIT_MAX_OVERDUE",
+    "CNT_CREDIT_PROLONG", "AMT_CREDIT_SUM", "AMT_CREDIT_SUM_DEBT", "AMT_CREDIT_SUM_LIMIT",
+    "AMT_CREDIT_SUM_OVERDUE", "CREDIT_TYPE", "DAYS_CREDIT_UPDATE", "AMT_ANNUITY",
+]
+
+CREDIT_TYPES = {    # level -> share of bureau rows
+    "Consumer credit": 0.729, "Credit card": 0.234, "Car loan": 0.016, "Mortgage": 0.011,
+    "Microloan": 0.007, "Loan for business development": 0.0012, "Another type of loan": 0.0006,
+    "Unknown type of loan": 0.0003, "Loan for working capital replenishment": 0.0003,
+    "Cash loan (non-earmarked)": 0.0003, "Real estate loan": 0.00002,
+    "Loan for the purchase of equipment": 0.00001, "Loan for purchase of shares (margin lending)": 0.000005,
+    "Mobile operator loan": 0.000001, "Interbank credit": 0.000001,
+}
+
+BUREAU_SEED_STREAM = 1      # bureau chunk i is seeded with (seed, BUREAU_SEED_STREAM, i)
+FIRST_BUREAU_ID = 5_000_000
+
+
+def generate_bureau(
+    ids: np.ndarray,
+    target: np.ndarray,
+    seed: Union[int, tuple] = 42,
+    start_id: int = FIRST_BUREAU_ID,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (bureau, bureau_balance) frames for the applicants `ids` with outcomes
+    `target`; SK_ID_BUREAU runs from `start_id`. Deterministic for given inputs.
+    """
+    rng = np.random.default_rng(seed)
+    n_loans = rng.poisson(6.4, len(ids))
+    n_loans[rng.random(len(ids)) < 0.14] = 0
+    owner = np.repeat(np.arange(len(ids)), n_loans)
+    m = len(owner)
+    risky = np.asarray(target)[owner] == 1
+
+    days_credit = -rng.integers(0, 2923, m)
+    active = rng.random(m) < np.where(risky, 0.39, 0.36)
+    status = np.where(active, "Active", "Closed").astype(object)
+    status[~active & (rng.random(m) < 0.004)] = "Sold"
+    status[rng.random(m) < np.where(risky, 0.0003, 0.00005)] = "Bad debt"
+    duration = rng.integers(30, 3650, m)
+    closed_at = np.minimum(days_credit + rng.integers(0, duration + 1), 0)
+    overdue = rng.random(m) < np.where(risky, 0.003, 0.002)
+    credit_sum = np.round(np.exp(rng.normal(12.3, 1.1, m)), 2)
+    weights = np.array(list(CREDIT_TYPES.values()))
+    credit_type = np.asarray(list(CREDIT_TYPES), dtype=object)[rng.choice(len(weights), size=m, p=weights / weights.sum())]
+    card = credit_type == "Credit card"
+
+    bureau = pd.DataFrame({
+        "SK_ID_CURR": np.asarray(ids)[owner],
+        "SK_ID_BUREAU": np.arange(start_id, start_id + m, dtype=np.int64),
+        "CREDIT_ACTIVE": status,
+        "CREDIT_CURRENCY": np.array(["currency 1", "currency 2", "currency 3", "currency 4"])[
+            rng.choice(4, size=m, p=[0.99918, 0.0007, 0.0001, 0.00002])],
+        "DAYS_CREDIT": days_credit,
+        "CREDIT_DAY_OVERDUE": np.where(overdue, rng.integers(1, 120, m), 0),
+        "DAYS_CREDIT_ENDDATE": _with_missing(rng, days_credit + duration, 0.06),
+        "DAYS_ENDDATE_FACT": np.where(active, np.nan, closed_at),
+        "AMT_CREDIT_MAX_OVERDUE": _with_missing(
+            rng, np.where(rng.random(m) < np.where(risky, 0.07, 0.05), np.round(credit_sum * rng.uniform(0, 0.2, m), 2), 0.0), 0.65),
+        "CNT_CREDIT_PROLONG": rng.poisson(0.006, m),
+        "AMT_CREDIT_SUM": credit_sum,
+        "AMT_CREDIT_SUM_DEBT": _with_missing(rng, np.where(active, np.round(credit_sum * rng.uniform(0, 1, m), 2), 0.0), 0.15),
+        "AMT_CREDIT_SUM_LIMIT": _with_missing(rng, np.where(card, np.round(credit_sum * rng.uniform(0, 1, m), 2), 0.0), 0.34),
+        "AMT_CREDIT_SUM_OVERDUE": np.where(overdue, np.round(credit_sum * rng.uniform(0, 0.1, m), 2), 0.0),
+        "CREDIT_TYPE": credit_type,
+        "DAYS_CREDIT_UPDATE": days_credit + rng.integers(0, -days_credit + 1),
+        "AMT_ANNUITY": _with_missing(rng, np.round(credit_sum * rng.uniform(0, 0.1, m), 2), 0.71),
+    })[BUREAU_COLUMNS]
+
+    # Monthly history from the month the credit opened (at most 96 back) to
+    # month 0; "C" once it closed, otherwise X / on time / a DPD bucket.
+    months = np.where(rng.random(m) < 0.33, np.minimum(-days_credit // 30, 96) + 1, 0)
+    loan = np.repeat(np.arange(m), months)
+    month = np.repeat(np.cumsum(months) - months, months) - np.arange(len(loan))
+    k = len(loan)
+    dpd = rng.random(k) < np.where(risky[loan], 0.011, 0.008)
+    status = np.where(rng.random(k) < 0.2, "X", "0").astype(object)
+    status[dpd] = np.array(["1", "2", "3", "4", "5"], dtype=object)[
+        rng.choice(5, size=int(dpd.sum()), p=[0.7, 0.15, 0.06, 0.04, 0.05])]
+    status[~active[loan] & (month > closed_at[loan] // 30)] = "C"
+    balance = pd.DataFrame({
+        "SK_ID_BUREAU": bureau["SK_ID_BUREAU"].to_numpy()[loan],
+        "MONTHS_BALANCE": month,
+        "STATUS": status,
+    })
+    return bureau, balance
+
+
+def write_bureau(
+    application_path: Union[Path, str],
+    out_dir: Union[Path, str, None] = None,
+    seed: int = 42,
+    chunk_rows: int = 50_000,
+) -> tuple[int, int]:
+    """
+    Write bureau.csv and bureau_balance.csv (to `out_dir`, default the
+    application file's directory) for the applicants of `application_path`,
+    reading its SK_ID_CURR / TARGET `chunk_rows` at a time. Returns the row
+    counts (bureau, bureau_balance).
+    """
+    out_dir = Path(out_dir) if out_dir is not None else Path(application_path).parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = [out_dir / "bureau.csv", out_dir / "bureau_balance.csv"]
+    tmps = [p.with_name(p.name + ".tmp") for p in paths]
+    n_bureau = n_balance = 0
+    with open(tmps[0], "w", newline="") as fb, open(tmps[1], "w", newline="") as fbb:
+        apps = pd.read_csv(application_path, usecols=["SK_ID_CURR", "TARGET"], chunksize=chunk_rows)
+        for i, chunk in enumerate(apps):
+            bureau, balance = generate_bureau(
+                chunk["SK_ID_CURR"].to_numpy(), chunk["TARGET"].to_numpy(),
+                seed=(seed, BUREAU_SEED_STREAM, i), start_id=FIRST_BUREAU_ID + n_bureau,
+            )
+            bureau.to_csv(fb, index=False, header=(i == 0))
+            balance.to_csv(fbb, index=False, header=(i == 0))
+            n_bureau += len(bureau)
+            n_balance += len(balance)
+    for tmp, path in zip(tmps, paths):
+        tmp.replace(path)
+    return n_bureau, n_balance
+
+
+def main() -> None:
+    ROOT = Path(__file__).resolve().parents[2]  # repo root (src/data/ -> ..)
+    parser = argparse.ArgumentParser(description="Write synthetic application_train-shaped data.")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiple of the real 307,511 rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, default=ROOT / "data" / "raw" / "application_train.csv")
+    parser.add_argument("--bureau", action="store_true",
+                        help="also write bureau.csv / bureau_balance.csv beside --out for its applicants "
+                             "(an existing --out is kept and read)")
+    parser.add_argument("--force", action="store_true", help="overwrite existing files")
+    args = parser.parse_args()
+
+    if args.out.exists() and not args.force and not args.bureau:
+        parser.error(f"{args.out} exists; pass --force to overwrite it")
+    if not args.out.exists() or args.force:
+        t0 = time.perf_counter()
+        n = write_application(args.out, args.scale, args.seed)
+        size_mb = args.out.stat().st_size / 1e6
+        print(f"Wrote {n:,} rows ({size_mb:,.0f} MB) to {args.out} in {time.perf_counter() - t0:.1f}s")
+    if args.bureau:
+        bureau_path = args.out.parent / "bureau.csv"
+        if bureau_path.exists() and not args.force:
+            parser.error(f"{bureau_path} exists; pass --force to overwrite it")
+        t0 = time.perf_counter()
+        n_bureau, n_balance = write_bureau(args.out, seed=args.seed)
+        print(f"Wrote {n_bureau:,} bureau / {n_balance:,} bureau_balance rows to {args.out.parent} "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
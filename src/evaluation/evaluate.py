@@ -1,22 +1,25 @@
 from __future__ import annotations
 
+import tempfile
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
+import joblib
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import StratifiedKFold, cross_validate
-from sklearn.calibration import calibration_curve
-from sklearn.metrics import (
-    roc_curve,
-    roc_auc_score,
-    precision_recall_curve,
-    average_precision_score,
-)
+
+from sklearn.metrics import roc_auc_score
+
+from src.evaluation import figures
+from src.evaluation.metrics import calibration_error
+from src.evaluation.sorted_scores import SortedScores
+from src.models.parallel import TimedFit, collect
+from src.models.pipeline import CV_SEED, CV_SPLITS, cv_splitter
+
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
 @dataclass(frozen=True)
 class EvalPaths:
@@ -47,63 +50,79 @@ def _to_numpy(x) -> np.ndarray:
 def run_cv(model: Pipeline,
            X_train: np.ndarray,
            y_train: np.ndarray,
-           n_splits: int = 5,
-           random_state: int = 42,
+           n_splits: int = CV_SPLITS,
+           random_state: int = CV_SEED,
 ) -> dict:
-    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    """
+    k-fold ROC-AUC / PR-AUC of the bare pipeline. Folds run in parallel under
+    an enclosing fold_parallelism(cfg); "folds" holds each fold's fit_s,
+    score_s and worker pid.
+    """
+    from sklearn.model_selection import cross_validate
+
+    skf = cv_splitter(n_splits=n_splits, random_state=random_state)
 
     scoring = ["roc_auc", "average_precision"]
-    cv = cross_validate(estimator=model, X=X_train, y=y_train, cv=skf, scoring=scoring)
+    cv = cross_validate(
+        estimator=TimedFit(model), X=X_train, y=y_train, cv=skf, scoring=scoring, return_estimator=True,
+    )
+    folds = collect(cv["estimator"], getattr(model, "memory", None))
+    for fold, score_s in zip(folds, cv["score_time"]):
+        fold["score_s"] = float(score_s)
 
     return {
         "roc_auc_mean": float(cv["test_roc_auc"].mean()),
         "roc_auc_std":  float(cv["test_roc_auc"].std()),
         "pr_auc_mean":  float(cv["test_average_precision"].mean()),
         "pr_auc_std":   float(cv["test_average_precision"].std()),
+        "folds": folds,
     }
-    
+
+# The same summary from out-of-fold predictions (see pipeline.out_of_fold_predictions)
+def cv_from_oof(oof: pd.DataFrame) -> dict:
+    """
+    run_cv's metrics computed per fold from already-collected out-of-fold
+    scores, so no extra fits are needed. With the same splitter and pipeline
+    the numbers equal run_cv's.
+    """
+    auc, ap = [], []
+    for _, g in oof.groupby("fold", sort=True):
+        scores = SortedScores(g["y_true"], g["score"])
+        auc.append(scores.roc_auc())
+        ap.append(scores.average_precision())
+    auc, ap = np.asarray(auc), np.asarray(ap)
+
+    return {
+        "roc_auc_mean": float(auc.mean()),
+        "roc_auc_std":  float(auc.std()),
+        "pr_auc_mean":  float(ap.mean()),
+        "pr_auc_std":   float(ap.std()),
+    }
+
 # Plot ROC curve
 def plot_roc(y_true, y_score, 
         outpath: Path,
+        scores: Optional[SortedScores] = None,
 ) -> float:
-    y_true = _to_numpy(y_true)
-    y_score = _to_numpy(y_score)
-
-    fpr, tpr, _ = roc_curve(y_true, y_score)
-    auc = roc_auc_score(y_true, y_score)
+    # `scores`: the same y_true / y_score already sorted (shared across these plots and tables)
+    scores = scores or SortedScores(y_true, y_score)
 
-    plt.figure()
-    plt.plot(fpr, tpr, label=f"ROC (AUC={auc:.4f})")
-    plt.plot([0, 1], [0, 1], linestyle="--", label="Random")
-    plt.xlabel("False Positive Rate")
-    plt.ylabel("True Positive Rate")
-    plt.title("ROC Curve")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(outpath, dpi=200)
-    plt.close()
+    fpr, tpr, _ = scores.roc_curve()
+    auc = scores.roc_auc()
+    figures.render_roc({"roc_fpr": fpr, "roc_tpr": tpr, "roc_auc": auc}, outpath)
 
     return float(auc)
 
 # Plot Precision-Recall curve
 def plot_pr(y_true, y_score,
             outpath: Path,
+            scores: Optional[SortedScores] = None,
 ) -> float:
-    y_true = _to_numpy(y_true)
-    y_score = _to_numpy(y_score)
-
-    precision, recall, _ = precision_recall_curve(y_true, y_score)
-    ap = average_precision_score(y_true, y_score)
+    scores = scores or SortedScores(y_true, y_score)
 
-    plt.figure()
-    plt.plot(recall, precision, label = f"PR (AP={ap:.4f})")
-    plt.xlabel("Recall")
-    plt.ylabel("Precision")
-    plt.title("Precision-Recall Curve")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(outpath, dpi=200)
-    plt.close()
+    precision, recall, _ = scores.pr_curve()
+    ap = scores.average_precision()
+    figures.render_pr({"pr_precision": precision, "pr_recall": recall, "pr_ap": ap}, outpath)
 
     return float(ap)
 
@@ -113,48 +132,28 @@ def calibration_report(
     y_true,
     y_score,
     n_bins: int,
-    outpath_fig: Path,
+    outpath_fig: Optional[Path],
     outpath_table: Path,
     strategy: str = "quantile",
+    scores: Optional[SortedScores] = None,
 ) -> pd.DataFrame:
     """
     Reliability / calibration curve:
     - strategy='quantile': bins by equal-sized quantiles of predicted score (good for imbalanced data)
-    - returns a table with bin stats and saves a plot of the calibration curve
+    - returns a table with bin stats and saves a plot of the calibration curve (skipped if outpath_fig is None)
+    The table always uses quantile (pd.qcut) bins: n, avg_pred, obs_rate, p_min, p_max.
     """
-    y_true = _to_numpy(y_true)
-    y_score = _to_numpy(y_score)
-
-    frac_pos, mean_pred = calibration_curve(
-        y_true, y_score, n_bins=n_bins, strategy=strategy
-    )
+    scores = scores or SortedScores(y_true, y_score)
 
-    df = pd.DataFrame({"y": y_true, "p": y_score})
-    df["bin"] = pd.qcut(df["p"], q=n_bins, duplicates="drop")
-    tab = (
-        df.groupby("bin", observed=True)
-        .agg(
-            n=("y", "size"),
-            avg_pred=("p", "mean"),
-            obs_rate=("y", "mean"),
-            p_min=("p", "min"),
-            p_max=("p", "max"),
-        )
-        .reset_index(drop=False)
-    )
+    tab = scores.calibration_table(n_bins)
     tab.to_csv(outpath_table, index=False)
 
-    # Plot
-    plt.figure()
-    plt.plot(mean_pred, frac_pos, marker="o", label="Model")
-    plt.plot([0, 1], [0, 1], linestyle="--", label="Perfectly calibrated")
-    plt.xlabel("Mean predicted PD")
-    plt.ylabel("Observed default rate")
-    plt.title(f"Calibration Curve ({strategy}, bins={n_bins})")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(outpath_fig, dpi=200)
-    plt.close()
+    if outpath_fig is not None:
+        frac_pos, mean_pred = scores.calibration_curve(n_bins=n_bins, strategy=strategy)
+        figures.render_calibration(
+            {"cal_frac_pos": frac_pos, "cal_mean_pred": mean_pred, "cal_n_bins": n_bins, "cal_strategy": strategy},
+            outpath_fig,
+        )
 
     return tab
 
@@ -165,54 +164,31 @@ def gains_lift_table(
     y_score,
     n_bins: int,
     outpath_table: Path,
-    outpath_fig: Path,
+    outpath_fig: Optional[Path],
+    scores: Optional[SortedScores] = None,
 ) -> pd.DataFrame:
     """
-    Decile (or n-tile) analysis.
+    Decile (or n-tile) analysis, highest-score bin first.
     Produces:
     - gains: cumulative % of bads captured as you move down the ranked list
     - lift: bad rate in bin / overall bad rate
+    The cumulative gains curve is saved unless outpath_fig is None.
     """
-    y_true = _to_numpy(y_true)
-    y_score = _to_numpy(y_score)
+    scores = scores or SortedScores(y_true, y_score)
 
-    df = pd.DataFrame({"y": y_true, "p": y_score}).sort_values("p", ascending=False)
-    df["bin"] = pd.qcut(df["p"], q=n_bins, duplicates="drop")
-
-    overall_bad_rate = df["y"].mean()
-    total_bads = df["y"].sum()
-
-    g = (
-        df.groupby("bin", observed=True, sort=False)
-        .agg(
-            n=("y", "size"),
-            bads=("y", "sum"),
-            bad_rate=("y", "mean"),
-            p_min=("p", "min"),
-            p_max=("p", "max"),
-        )
-        .reset_index()
-    )
-
-    g["lift"] = g["bad_rate"] / overall_bad_rate
-    g["cum_bads"] = g["bads"].cumsum()
-    g["cum_bads_pct"] = g["cum_bads"] / total_bads
+    g = scores.gains_table(n_bins)
 
     g.to_csv(outpath_table, index=False)
 
-    # Plot cumulative gains (x = population %, y = % bads captured)
+    # Cumulative gains (x = population %, y = % bads captured)
     g["cum_pop_pct"] = g["n"].cumsum() / g["n"].sum()
 
-    plt.figure()
-    plt.plot(g["cum_pop_pct"], g["cum_bads_pct"], marker="o", label="Model")
-    plt.plot([0, 1], [0, 1], linestyle="--", label="Random")
-    plt.xlabel("Cumulative population (ranked by score)")
-    plt.ylabel("Cumulative defaults captured")
-    plt.title(f"Cumulative Gains (bins={n_bins})")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(outpath_fig, dpi=200)
-    plt.close()
+    if outpath_fig is not None:
+        figures.render_gains(
+            {"gains_cum_pop_pct": g["cum_pop_pct"].to_numpy(), "gains_cum_bads_pct": g["cum_bads_pct"].to_numpy(),
+             "gains_n_bins": n_bins},
+            outpath_fig,
+        )
 
     return g
 
@@ -222,20 +198,12 @@ def score_distribution_plot(y_true, y_score, outpath: Path) -> None:
     y_true = _to_numpy(y_true)
     y_score = _to_numpy(y_score)
 
-    df = pd.DataFrame({"y": y_true, "p": y_score})
-    good = df.loc[df["y"] == 0, "p"]
-    bad = df.loc[df["y"] == 1, "p"]
-
-    plt.figure()
-    plt.hist(good, bins=50, alpha=0.7, label="Non-default (0)")
-    plt.hist(bad, bins=50, alpha=0.7, label="Default (1)")
-    plt.xlabel("Predicted PD")
-    plt.ylabel("Count")
-    plt.title("Score Distribution by Class")
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(outpath, dpi=200)
-    plt.close()
+    data = {}
+    for cls, label in (("good", 0), ("bad", 1)):
+        data[f"dist_{cls}_counts"], data[f"dist_{cls}_edges"] = np.histogram(
+            y_score[y_true == label], bins=figures.HIST_BINS
+        )
+    figures.render_score_distribution(data, outpath)
 
 # Logistic regression coefficients table
 def logistic_coefficients_table(model, 
@@ -260,3 +228,45 @@ def logistic_coefficients_table(model,
     df.to_csv(outpath, index=False)
     return df
 
+
+
+# Quality vs. serving cost of alternative fitted models
+def compare_models(models: dict,
+                   X_test,
+                   y_test,
+                   n_single: int = 200,
+) -> dict:
+    """
+    For each named fitted model: test AUC, Brier score and ECE, batched and
+    single-row predict_proba latency, and the size of its joblib artifact.
+    Used to weigh e.g. the two calibration modes against each other.
+    """
+    y_true = _to_numpy(y_test)
+    singles = [X_test.iloc[[i]] for i in range(min(n_single, len(X_test)))]
+
+    out = {}
+    for name, model in models.items():
+        t0 = time.perf_counter()
+        y_score = model.predict_proba(X_test)[:, 1]
+        batch_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for row in singles:
+            model.predict_proba(row)
+        single_s = time.perf_counter() - t0
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "model.joblib"
+            joblib.dump(model, path)
+            size = path.stat().st_size
+
+        brier, ece = calibration_error(y_true, y_score)
+        out[name] = {
+            "auc": float(roc_auc_score(y_true, y_score)),
+            "brier": brier,
+            "ece": ece,
+            "batch_us_per_row": 1e6 * batch_s / len(y_true),
+            "single_row_ms": 1e3 * single_s / max(len(singles), 1),
+            "artifact_bytes": size,
+        }
+    return out
@@ -0,0 +1,191 @@
+# python -m src.evaluation.figures reports/<run_id> [--workers 5]
+
+"""
+Evaluation figures, rendered from saved arrays.
+
+A run's five figures (ROC, PR, calibration, cumulative gains, score
+distribution) need only a few small arrays, not the model or the test set.
+figure_data() extracts them from the run's SortedScores and
+save_figure_data() writes them to figures/figure_data.npz; each render_*
+function draws one figure from those arrays. matplotlib is imported inside
+the renderers only, so computing and saving the data never loads it.
+
+That lets RunConfig.figures choose when plotting happens:
+
+    inline    render in-process during the run (the previous behaviour)
+    deferred  log the run first, then render the figures in a process pool
+    none      no plotting and no matplotlib import (sweep points default to this)
+
+and `main()` renders any finished run's figures later from its
+figure_data.npz. The pictures are identical in every mode.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # Rendering (including in deferred-mode worker processes) needs neither
+    # SortedScores nor the pandas it imports.
+    from src.evaluation.sorted_scores import SortedScores
+
+FIGURE_MODES = ("inline", "deferred", "none")
+DATA_FILE = "figure_data.npz"
+DPI = 200
+HIST_BINS = 50
+
+
+def figure_data(scores: SortedScores, n_bins: int = 10, strategy: str = "quantile") -> dict:
+    """Every array the five figures are drawn from."""
+    fpr, tpr, _ = scores.roc_curve()
+    precision, recall, _ = scores.pr_curve()
+    frac_pos, mean_pred = scores.calibration_curve(n_bins=n_bins, strategy=strategy)
+    g = scores.gains_table(n_bins)
+    # plt.hist(x, bins=50) bins with np.histogram; keep its counts and edges, not x
+    good_counts, good_edges = np.histogram(scores.y_score[scores.y_true == 0], bins=HIST_BINS)
+    bad_counts, bad_edges = np.histogram(scores.y_score[scores.y_true == 1], bins=HIST_BINS)
+    return {
+        "roc_fpr": fpr, "roc_tpr": tpr, "roc_auc": scores.roc_auc(),
+        "pr_precision": precision, "pr_recall": recall, "pr_ap": scores.average_precision(),
+        "cal_frac_pos": frac_pos, "cal_mean_pred": mean_pred, "cal_n_bins": n_bins, "cal_strategy": strategy,
+        "gains_cum_pop_pct": (g["n"].cumsum() / g["n"].sum()).to_numpy(),
+        "gains_cum_bads_pct": g["cum_bads_pct"].to_numpy(), "gains_n_bins": n_bins,
+        "dist_good_counts": good_counts, "dist_good_edges": good_edges,
+        "dist_bad_counts": bad_counts, "dist_bad_edges": bad_edges,
+    }
+
+
+def save_figure_data(figures_dir: Path, data: dict) -> Path:
+    path = Path(figures_dir) / DATA_FILE
+    np.savez(path, **data)
+    return path
+
+
+def load_figure_data(figures_dir: Path) -> dict:
+    with np.load(Path(figures_dir) / DATA_FILE) as f:
+        return {k: (f[k].item() if f[k].ndim == 0 else f[k]) for k in f.files}
+
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _save(plt, outpath: Path) -> None:
+    plt.tight_layout()
+    plt.savefig(outpath, dpi=DPI)
+    plt.close()
+
+
+def render_roc(data: dict, outpath: Path) -> None:
+    plt = _pyplot()
+    plt.figure()
+    plt.plot(data["roc_fpr"], data["roc_tpr"], label=f"ROC (AUC={data['roc_auc']:.4f})")
+    plt.plot([0, 1], [0, 1], linestyle="--", label="Random")
+    plt.xlabel("False Positive Rate")
+    plt.ylabel("True Positive Rate")
+    plt.title("ROC Curve")
+    plt.legend()
+    _save(plt, outpath)
+
+
+def render_pr(data: dict, outpath: Path) -> None:
+    plt = _pyplot()
+    plt.figure()
+    plt.plot(data["pr_recall"], data["pr_precision"], label=f"PR (AP={data['pr_ap']:.4f})")
+    plt.xlabel("Recall")
+    plt.ylabel("Precision")
+    plt.title("Precision-Recall Curve")
+    plt.legend()
+    _save(plt, outpath)
+
+
+def render_calibration(data: dict, outpath: Path) -> None:
+    plt = _pyplot()
+    plt.figure()
+    plt.plot(data["cal_mean_pred"], data["cal_frac_pos"], marker="o", label="Model")
+    plt.plot([0, 1], [0, 1], linestyle="--", label="Perfectly calibrated")
+    plt.xlabel("Mean predicted PD")
+    plt.ylabel("Observed default rate")
+    plt.title(f"Calibration Curve ({data['cal_strategy']}, bins={data['cal_n_bins']})")
+    plt.legend()
+    _save(plt, outpath)
+
+
+def render_gains(data: dict, outpath: Path) -> None:
+    plt = _pyplot()
+    plt.figure()
+    plt.plot(data["gains_cum_pop_pct"], data["gains_cum_bads_pct"], marker="o", label="Model")
+    plt.plot([0, 1], [0, 1], linestyle="--", label="Random")
+    plt.xlabel("Cumulative population (ranked by score)")
+    plt.ylabel("Cumulative defaults captured")
+    plt.title(f"Cumulative Gains (bins={data['gains_n_bins']})")
+    plt.legend()
+    _save(plt, outpath)
+
+
+def render_score_distribution(data: dict, outpath: Path) -> None:
+    plt = _pyplot()
+    plt.figure()
+    # Same bars as plt.hist(scores, bins=50), drawn from the saved counts
+    for cls, label in (("good", "Non-default (0)"), ("bad", "Default (1)")):
+        edges = data[f"dist_{cls}_edges"]
+        plt.hist(edges[:-1], bins=edges, weights=data[f"dist_{cls}_counts"], alpha=0.7, label=label)
+    plt.xlabel("Predicted PD")
+    plt.ylabel("Count")
+    plt.title("Score Distribution by Class")
+    plt.legend()
+    _save(plt, outpath)
+
+
+FIGURES = {
+    "roc_curve.png": render_roc,
+    "pr_curve.png": render_pr,
+    "calibration_curve.png": render_calibration,
+    "gains_curve.png": render_gains,
+    "score_distribution.png": render_score_distribution,
+}
+
+
+def _render_one(figures_dir: Path, name: str, data: Optional[dict] = None) -> Path:
+    data = data if data is not None else load_figure_data(figures_dir)
+    FIGURES[name](data, Path(figures_dir) / name)
+    return Path(figures_dir) / name
+
+
+def render_figures(figures_dir: Path, workers: int = 1) -> list[Path]:
+    """
+    Draw every figure from figures_dir/figure_data.npz: in this process with
+    workers=1, else one figure per task across `workers` processes.
+    """
+    if workers == 1:
+        data = load_figure_data(figures_dir)
+        return [_render_one(figures_dir, name, data) for name in FIGURES]
+
+    from joblib import Parallel, delayed
+
+    return Parallel(n_jobs=min(workers, len(FIGURES)))(
+        delayed(_render_one)(figures_dir, name) for name in FIGURES
+    )
+
+
+def main() -> None:
+    """Render a finished run's figures from its saved figure data."""
+    import time
+
+    parser = argparse.ArgumentParser(description="Render a run's evaluation figures from figure_data.npz.")
+    parser.add_argument("run_dir", type=Path)
+    parser.add_argument("--workers", type=int, default=1, help="render figures in parallel processes")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    paths = render_figures(args.run_dir / "figures", workers=args.workers)
+    print(f"Rendered {len(paths)} figures to {(args.run_dir / 'figures').resolve()} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -36,4 +36,30 @@ def ks_statistic(
     ks = np.abs(diff[ks_idx])
     ks_threshold = y_score_sorted[ks_idx]
 
-    return float(ks), float(ks_threshold)
\ No newline at end of file
+    return float(ks), float(ks_threshold)
+
+def calibration_error(
+        y_true: pd.Series,
+        y_score: np.ndarray,
+        n_bins: int = 10,
+) -> Tuple[float, float]:
+    """
+    Compute (Brier score, expected calibration error) for predicted PDs.
+
+    ECE uses equal-count (quantile) bins, the same binning as the calibration
+    table: the population-weighted mean of |observed default rate - mean
+    predicted PD| across bins.
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_score = np.asarray(y_score, dtype=float)
+
+    brier = np.mean((y_score - y_true) ** 2)
+
+    order = np.argsort(y_score, kind="mergesort")
+    ece = 0.0
+    for idx in np.array_split(order, n_bins):
+        if len(idx):
+            ece += len(idx) * abs(y_true[idx].mean() - y_score[idx].mean())
+    ece /= len(y_true)
+
+    return float(brier), float(ece)
@@ -0,0 +1,217 @@
+"""
+Sort-once evaluation kernel for a binary target and a score.
+
+Every test-set metric a run reports is a function of the scores' ordering:
+ROC / AUC, PR / average precision, KS and its threshold, quantile-binned
+calibration and gains/lift tables. Computed one library call at a time
+(roc_curve, roc_auc_score, precision_recall_curve, average_precision_score,
+ks_statistic, two pd.qcut passes, calibration_curve) that is about eight
+sorts or binnings of the same array. SortedScores argsorts once and derives
+all of them from the sorted scores and a cumulative count of defaults:
+
+- the distinct thresholds are the starts of the runs of equal scores; the
+  true / false positives above each are counts read off the cumulative sum,
+  exactly as sklearn's confusion_matrix_at_thresholds builds them,
+- quantile bin edges are read from the sorted scores, and bin boundaries are
+  searchsorted positions in it (O(bins * log n) instead of O(n * log bins)),
+- per-bin counts, defaults, minima and maxima are differences / endpoints of
+  those runs.
+
+Results are bit-identical to the functions they replace. Per-bin sums of
+the scores themselves (the calibration table's avg_pred, calibration_curve's
+mean predicted PD) are still accumulated in the original row order, as
+pandas and sklearn do, since float addition is order-sensitive.
+
+The one deliberate difference is KS when a group of tied scores mixes both
+classes: ks_statistic's quicksort orders such a group arbitrarily and can
+report a separation part-way through it, while here KS is only evaluated
+between distinct scores (the order-independent definition). Continuous
+predicted PDs have no such ties.
+"""
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+class SortedScores:
+    """
+    y_true (0/1) and y_score sorted once by score; every metric method below
+    reads from that ordering. Both classes must be present.
+    """
+
+    def __init__(self, y_true, y_score):
+        self.y_true = np.asarray(y_true)
+        self.y_score = np.asarray(y_score)
+        if self.y_true.shape != self.y_score.shape or self.y_true.ndim != 1:
+            raise ValueError("y_true and y_score must be 1-d arrays of the same length.")
+
+        # The one sort. Its order within ties is irrelevant: every metric is
+        # read at run boundaries or summed per bin in the original row order.
+        self.order = np.argsort(self.y_score)
+        self.sorted = self.y_score[self.order]
+        self.n = len(self.sorted)
+        # cum_pos[i]: defaults among the i+1 lowest scores
+        self.cum_pos = np.cumsum(self.y_true[self.order] == 1)
+        self.n_pos = int(self.cum_pos[-1]) if self.n else 0
+        self.n_neg = self.n - self.n_pos
+        if self.n_pos == 0 or self.n_neg == 0:
+            raise ValueError("Metrics undefined. Need samples of both classes.")
+
+    # Runs of equal scores, as [start, end] positions in ascending order
+    @cached_property
+    def run_starts(self) -> np.ndarray:
+        return np.r_[0, np.flatnonzero(np.diff(self.sorted)) + 1]
+
+    @cached_property
+    def _run_ends(self) -> np.ndarray:
+        return np.r_[self.run_starts[1:] - 1, self.n - 1]
+
+    def _pos_below(self, positions: np.ndarray) -> np.ndarray:
+        # Defaults strictly below each sorted position (0..n)
+        return np.where(positions > 0, self.cum_pos[np.maximum(positions - 1, 0)], 0)
+
+    @cached_property
+    def _counts_at_thresholds(self) -> tuple:
+        # sklearn's confusion_matrix_at_thresholds (fps, tps, thresholds):
+        # descending distinct thresholds, counts of scores >= each.
+        starts = self.run_starts[::-1]
+        tps = (self.n_pos - self._pos_below(starts)).astype(np.float64)
+        fps = 1 + (self.n - 1 - starts).astype(np.float64) - tps
+        return fps, tps, self.sorted[starts]
+
+    # ROC / AUC
+    def roc_curve(self, drop_intermediate: bool = True) -> tuple:
+        """(fpr, tpr, thresholds), as sklearn.metrics.roc_curve."""
+        fps, tps, thresholds = self._counts_at_thresholds
+        if drop_intermediate and fps.shape[0] > 2:
+            keep = np.r_[True, np.logical_or(np.diff(fps, 2), np.diff(tps, 2)), True]
+            fps, tps, thresholds = fps[keep], tps[keep], thresholds[keep]
+
+        tps = np.r_[0.0, tps]
+        fps = np.r_[0.0, fps]
+        thresholds = np.r_[np.inf, thresholds.astype(np.float64)]
+        return fps / fps[-1], tps / tps[-1], thresholds
+
+    def roc_auc(self) -> float:
+        """As sklearn.metrics.roc_auc_score."""
+        fpr, tpr, _ = self._roc
+        return float(np.trapezoid(tpr, fpr))
+
+    @cached_property
+    def _roc(self) -> tuple:
+        return self.roc_curve()
+
+    # Precision-recall
+    def pr_curve(self) -> tuple:
+        """(precision, recall, thresholds), as sklearn.metrics.precision_recall_curve."""
+        fps, tps, thresholds = self._counts_at_thresholds
+        precision = tps / (tps + fps)
+        recall = tps / tps[-1]
+        return np.r_[precision[::-1], 1.0], np.r_[recall[::-1], 0.0], thresholds[::-1]
+
+    def average_precision(self) -> float:
+        """As sklearn.metrics.average_precision_score."""
+        precision, recall, _ = self.pr_curve()
+        return float(max(0.0, -np.sum(np.diff(recall) * precision[:-1])))
+
+    # KS
+    def ks(self) -> tuple[float, float]:
+        """(KS, score at which it is attained), as metrics.ks_statistic."""
+        ends = self._run_ends
+        cum_def = self.cum_pos[ends] / self.n_pos
+        cum_ndef = (ends + 1 - self.cum_pos[ends]) / self.n_neg
+        diff = cum_def - cum_ndef
+        i = np.argmax(np.abs(diff))
+        return float(np.abs(diff[i])), float(self.sorted[ends[i]])
+
+    # Binning
+    def _bounds(self, inner_edges: np.ndarray) -> np.ndarray:
+        # Sorted positions splitting the scores into (e_k, e_k+1] bins
+        return np.r_[0, np.searchsorted(self.sorted, inner_edges, side="right"), self.n]
+
+    def _codes(self, bounds: np.ndarray) -> np.ndarray:
+        # Bin of every row, in the original row order
+        codes = np.empty(self.n, dtype=np.intp)
+        codes[self.order] = np.repeat(np.arange(len(bounds) - 1), np.diff(bounds))
+        return codes
+
+    def qcut_edges(self, q: int) -> np.ndarray:
+        """Unique bin edges of pd.qcut(y_score, q, duplicates="drop")."""
+        quantiles = np.linspace(0, 1, q + 1)
+        # pd.qcut rounds quantiles that are not exact in base 2 up
+        np.putmask(quantiles, q * quantiles != np.arange(q + 1), np.nextafter(quantiles, 1))
+        return np.unique(np.quantile(self.sorted, quantiles))
+
+    def _qcut_bins(self, q: int) -> tuple:
+        # (bounds, interval dtype, observed bin ids) for the qcut tables
+        edges = self.qcut_edges(q)
+        bounds = self._bounds(edges[1:-1])
+        # The interval labels pd.qcut would attach (rounded to 3 digits)
+        dtype = pd.cut(edges, bins=edges, include_lowest=True).dtype
+        observed = np.flatnonzero(np.diff(bounds))
+        return bounds, dtype, observed
+
+    def _bin_stats(self, bounds: np.ndarray, bins: np.ndarray) -> dict:
+        starts, stops = bounds[bins], bounds[bins + 1]
+        bads = self._pos_below(stops) - self._pos_below(starts)
+        return {
+            "n": stops - starts,
+            "bads": bads,
+            "p_min": self.sorted[starts],
+            "p_max": self.sorted[stops - 1],
+        }
+
+    def calibration_curve(self, n_bins: int = 10, strategy: str = "quantile") -> tuple:
+        """(prob_true, prob_pred), as sklearn.calibration.calibration_curve."""
+        if self.sorted[0] < 0 or self.sorted[-1] > 1:
+            raise ValueError("y_prob has values outside [0, 1].")
+        if strategy == "quantile":
+            bins = np.percentile(self.sorted, np.linspace(0, 1, n_bins + 1) * 100)
+        elif strategy == "uniform":
+            bins = np.linspace(0.0, 1.0, n_bins + 1)
+        else:
+            raise ValueError("strategy must be either 'quantile' or 'uniform'.")
+
+        bounds = self._bounds(bins[1:-1])
+        bin_total = np.diff(bounds)
+        bin_true = np.diff(self._pos_below(bounds))
+        # Score sums in original row order, like sklearn's bincount
+        bin_sums = np.bincount(self._codes(bounds), weights=self.y_score, minlength=len(bins))
+
+        nonzero = bin_total != 0
+        return bin_true[nonzero] / bin_total[nonzero], bin_sums[:len(bin_total)][nonzero] / bin_total[nonzero]
+
+    def calibration_table(self, n_bins: int = 10) -> pd.DataFrame:
+        """Reliability table over pd.qcut bins (evaluate.calibration_report's)."""
+        bounds, dtype, observed = self._qcut_bins(n_bins)
+        s = self._bin_stats(bounds, observed)
+        # Group means in original row order: pandas' (compensated) sum is order-sensitive
+        avg_pred = pd.Series(self.y_score).groupby(self._codes(bounds)).mean()
+        return pd.DataFrame({
+            "bin": pd.Categorical.from_codes(observed, dtype=dtype),
+            "n": s["n"],
+            "avg_pred": avg_pred.to_numpy(),
+            "obs_rate": s["bads"] / s["n"],
+            "p_min": s["p_min"],
+            "p_max": s["p_max"],
+        })
+
+    def gains_table(self, n_bins: int = 10) -> pd.DataFrame:
+        """Gains / lift over pd.qcut bins, highest scores first (evaluate.gains_lift_table's)."""
+        bounds, dtype, observed = self._qcut_bins(n_bins)
+        observed = observed[::-1]
+        s = self._bin_stats(bounds, observed)
+        g = pd.DataFrame({
+            "bin": pd.Categorical.from_codes(observed, dtype=dtype),
+            "n": s["n"],
+            "bads": s["bads"],
+            "bad_rate": s["bads"] / s["n"],
+            "p_min": s["p_min"],
+            "p_max": s["p_max"],
+        })
+        g["lift"] = g["bad_rate"] / (self.n_pos / self.n)
+        g["cum_bads"] = g["bads"].cumsum()
+        g["cum_bads_pct"] = g["cum_bads"] / self.n_pos
+        return g
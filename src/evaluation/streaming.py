@@ -0,0 +1,228 @@
+"""
+Mergeable, fixed-memory metric accumulators for out-of-core backtests.
+
+A backtest over tens of millions of scored applications cannot hold y_true /
+y_score in memory for SortedScores or the functions in evaluate.py.
+ScoreHistogram instead keeps, per fine score bin of a fixed grid over
+[0, 1], the number of defaults and non-defaults, the sum of the scores and
+their min / max. That is all AUC, KS, average precision and the quantile
+calibration / gains tables need, up to the order of rows inside one bin:
+
+- update(y, score) adds a chunk; memory is O(bins), never O(rows),
+- a + b (or a.merge(b)) combines histograms built on different chunks, files
+  or processes -- counts and sums add, minima / maxima combine -- so a
+  backtest can be split any way and the result does not depend on the split,
+- save() / load() persist one as .npz for a later merge.
+
+Every metric comes with a guaranteed bound on its distance from the exact
+value (SortedScores / evaluate.py on the same rows), derived from how many
+defaults and non-defaults share a bin:
+
+    AUC        |exact - estimate| <= 0.5 * sum_b pos_b * neg_b / (P * N)
+    KS         estimate <= exact <= estimate + max_b max(pos_b / P, neg_b / N)
+    AP         exact within [lo, hi]: each bin's precision at any of its
+               thresholds lies between its all-negatives-first and
+               all-positives-first values
+    tables     each quantile boundary falls on a fine-bin edge, so a bin's
+               n is off by at most the count of the fine bins at its ends
+               (n_err); avg_pred / obs_rate / p_min / p_max are exact for
+               the rows the approximate bin holds.
+
+With the default 2**16 bins over [0, 1] the AUC / AP bounds on 300k-row test
+sets are ~1e-5.
+"""
+
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BINS = 2 ** 16
+
+
+class ScoreHistogram:
+    """
+    Per-bin default / non-default counts, score sums and min / max over a
+    uniform grid of `n_bins` on [0, 1] (scores are PDs).
+    """
+
+    def __init__(self, n_bins: int = DEFAULT_BINS):
+        self.n_bins = n_bins
+        self.pos = np.zeros(n_bins, dtype=np.int64)
+        self.neg = np.zeros(n_bins, dtype=np.int64)
+        self.score_sum = np.zeros(n_bins)
+        self.score_min = np.full(n_bins, np.inf)
+        self.score_max = np.full(n_bins, -np.inf)
+
+    # Accumulation
+    def update(self, y_true, y_score) -> "ScoreHistogram":
+        """Add one chunk of rows."""
+        y = np.asarray(y_true) == 1
+        s = np.asarray(y_score, dtype=np.float64)
+        if y.shape != s.shape:
+            raise ValueError("y_true and y_score must have the same length.")
+        if not len(s):
+            return self
+        if not (s.min() >= 0.0 and s.max() <= 1.0):   # also rejects NaN
+            raise ValueError("y_score has values outside [0, 1].")
+
+        b = np.minimum((s * self.n_bins).astype(np.intp), self.n_bins - 1)
+        total = np.bincount(b, minlength=self.n_bins)
+        pos = np.bincount(b[y], minlength=self.n_bins)
+        self.pos += pos
+        self.neg += total - pos
+        self.score_sum += np.bincount(b, weights=s, minlength=self.n_bins)
+        np.minimum.at(self.score_min, b, s)
+        np.maximum.at(self.score_max, b, s)
+        return self
+
+    def merge(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        """Fold `other` (same grid) into this histogram."""
+        if other.n_bins != self.n_bins:
+            raise ValueError(f"cannot merge histograms with {self.n_bins} and {other.n_bins} bins")
+        self.pos += other.pos
+        self.neg += other.neg
+        self.score_sum += other.score_sum
+        np.minimum(self.score_min, other.score_min, out=self.score_min)
+        np.maximum(self.score_max, other.score_max, out=self.score_max)
+        return self
+
+    def __add__(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        return ScoreHistogram(self.n_bins).merge(self).merge(other)
+
+    def save(self, path: Path) -> None:
+        np.savez(path, pos=self.pos, neg=self.neg, score_sum=self.score_sum,
+                 score_min=self.score_min, score_max=self.score_max)
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> "ScoreHistogram":
+        with np.load(path) as f:
+            h = cls(len(f["pos"]))
+            for key in ("pos", "neg", "score_sum", "score_min", "score_max"):
+                getattr(h, key)[:] = f[key]
+        return h
+
+    # Totals
+    @property
+    def n(self) -> int:
+        return int(self.pos.sum() + self.neg.sum())
+
+    @property
+    def n_pos(self) -> int:
+        return int(self.pos.sum())
+
+    @property
+    def n_neg(self) -> int:
+        return int(self.neg.sum())
+
+    def _check(self) -> None:
+        if self.n_pos == 0 or self.n_neg == 0:
+            raise ValueError("Metrics undefined. Need samples of both classes.")
+
+    # Metrics, each with its error bound
+    def roc_auc(self) -> tuple[float, float]:
+        """(AUC, max |exact - AUC|). Rows sharing a bin count as ties (half a pair)."""
+        self._check()
+        P, N = self.n_pos, self.n_neg
+        neg_below = np.cumsum(self.neg) - self.neg
+        wins = np.dot(self.pos, neg_below) + 0.5 * np.dot(self.pos, self.neg)
+        ties = 0.5 * np.dot(self.pos, self.neg)
+        return float(wins / (P * N)), float(ties / (P * N))
+
+    def ks(self) -> tuple[float, float, float]:
+        """
+        (KS, threshold, max error) with KS evaluated at bin edges; the exact
+        KS lies in [KS, KS + max error]. The threshold is the highest score in
+        the bin where the separation is attained.
+        """
+        self._check()
+        cum_def = np.cumsum(self.pos) / self.n_pos
+        cum_ndef = np.cumsum(self.neg) / self.n_neg
+        occupied = (self.pos + self.neg) > 0
+        diff = np.where(occupied, np.abs(cum_def - cum_ndef), -1.0)
+        i = int(np.argmax(diff))
+        err = max(self.pos.max() / self.n_pos, self.neg.max() / self.n_neg)
+        return float(diff[i]), float(self.score_max[i]), float(err)
+
+    def average_precision(self) -> tuple[float, float, float]:
+        """
+        (AP, lo, hi): AP with each bin as one threshold, and the interval
+        that contains the exact average precision.
+        """
+        self._check()
+        # Descending score order: counts at or above each bin
+        pos, neg = self.pos[::-1], self.neg[::-1]
+        tp_above = np.cumsum(pos) - pos
+        fp_above = np.cumsum(neg) - neg
+        m = pos > 0
+        pos, neg, tp_above, fp_above = pos[m], neg[m], tp_above[m], fp_above[m]
+
+        recall_step = pos / self.n_pos
+        tp = tp_above + pos
+        ap = np.dot(recall_step, tp / (tp + fp_above + neg))
+        lo = np.dot(recall_step, (tp_above + 1) / (tp_above + 1 + fp_above + neg))
+        hi = np.dot(recall_step, tp / (tp + fp_above))
+        return float(ap), float(lo), float(hi)
+
+    # Quantile tables (approximate pd.qcut bins)
+    def _quantile_groups(self, q: int) -> pd.DataFrame:
+        # Fine-bin ranges holding ~1/q of the rows each, split after the fine
+        # bin containing each exact quantile. Only that bin's rows could fall
+        # on the other side of the exact boundary, hence n_err.
+        counts = self.pos + self.neg
+        cum = np.cumsum(counts)
+        cuts = np.unique(np.r_[np.searchsorted(cum, np.arange(1, q) * self.n / q), self.n_bins - 1])
+        cuts = cuts[np.diff(np.r_[0, cum[cuts]]) > 0]          # drop empty groups
+        firsts = np.r_[0, cuts[:-1] + 1]
+        ambiguous = counts[cuts].copy()
+        ambiguous[-1] = 0                                      # the top of the last bin is the max
+        n_err = ambiguous + np.r_[0, ambiguous[:-1]]
+
+        pos, neg = np.add.reduceat(self.pos, firsts), np.add.reduceat(self.neg, firsts)
+        n = pos + neg
+        # Interval labels on the grid, formatted the way pd.qcut formats its own
+        edges = np.r_[firsts[0], cuts + 1] / self.n_bins
+        dtype = pd.cut(edges, bins=edges, include_lowest=True).dtype
+        return pd.DataFrame({
+            "bin": pd.Categorical.from_codes(np.arange(len(cuts)), dtype=dtype),
+            "n": n,
+            "bads": pos,
+            "avg_pred": np.add.reduceat(self.score_sum, firsts) / n,
+            "rate": pos / n,
+            "p_min": np.minimum.reduceat(self.score_min, firsts),
+            "p_max": np.maximum.reduceat(self.score_max, firsts),
+            "n_err": n_err,
+        })
+
+    def calibration_table(self, n_bins: int = 10) -> pd.DataFrame:
+        """evaluate.calibration_report's table over approximate quantile bins, plus n_err."""
+        self._check()
+        t = self._quantile_groups(n_bins)
+        return t.rename(columns={"rate": "obs_rate"})[
+            ["bin", "n", "avg_pred", "obs_rate", "p_min", "p_max", "n_err"]
+        ]
+
+    def gains_table(self, n_bins: int = 10) -> pd.DataFrame:
+        """evaluate.gains_lift_table's table over approximate quantile bins (highest first), plus n_err."""
+        self._check()
+        g = self._quantile_groups(n_bins).iloc[::-1].reset_index(drop=True)
+        g = g.rename(columns={"rate": "bad_rate"})[["bin", "n", "bads", "bad_rate", "p_min", "p_max", "n_err"]]
+        g.insert(6, "lift", g["bad_rate"] / (self.n_pos / self.n))
+        g.insert(7, "cum_bads", g["bads"].cumsum())
+        g.insert(8, "cum_bads_pct", g["cum_bads"] / self.n_pos)
+        return g
+
+    def summary(self) -> dict:
+        """Every scalar metric with its error bound, for run.json-style records."""
+        auc, auc_err = self.roc_auc()
+        ks, ks_thresh, ks_err = self.ks()
+        ap, ap_lo, ap_hi = self.average_precision()
+        return {
+            "n": self.n,
+            "n_pos": self.n_pos,
+            "bins": self.n_bins,
+            "auc": auc, "auc_max_err": auc_err,
+            "pr_auc": ap, "pr_auc_lo": ap_lo, "pr_auc_hi": ap_hi,
+            "ks": ks, "ks_thresh": ks_thresh, "ks_max_err": ks_err,
+        }
@@ -0,0 +1,499 @@
+# python -m src.features.bureau [--bureau data/raw/bureau.csv] [--balance data/raw/bureau_balance.csv] [--chunksize 1000000]
+
+"""
+Per-applicant aggregates of the credit bureau tables, streamed in chunks.
+
+bureau.csv (~1.7M prior credits, keyed by SK_ID_BUREAU, with the applicant's
+SK_ID_CURR) and bureau_balance.csv (~27M monthly statuses per SK_ID_BUREAU)
+are too large to groupby-merge comfortably on top of the application frame.
+bureau_aggregates() reads each `chunksize` rows at a time and never holds
+more than one chunk plus per-applicant state:
+
+- every row is turned into a few numeric columns (derive_bureau /
+  derive_balance) and each is reduced per SK_ID_CURR with sum, min or max.
+  Combining two partial results uses the same operation, so partial tables
+  from different chunks (GroupReducer) fold in any order, and the result
+  does not depend on the chunking;
+- bureau_balance rows reach their applicant through a sorted SK_ID_BUREAU ->
+  SK_ID_CURR array built during the bureau pass (binary search per chunk, no
+  hash join); balance rows of credits not in bureau.csv are dropped;
+- finalize() turns the reduced sums into the features: counts, amounts,
+  overdue ratios and months since the first / latest credit and the latest
+  past-due month.
+
+The table is cached on disk (bureau_features) under
+<bureau dir>/.bureau_cache/bureau-<key>/ in the columnar cache's format,
+keyed by the content digests of both inputs and AGGREGATES_VERSION: a rerun
+on unchanged files loads it (a stat, not a re-hash, when size and mtime
+match) instead of re-reading 27M rows. Building an entry removes the older
+ones for the same pair of file names, not those of other inputs in the same
+directory. join_bureau_features adds the
+columns to an application frame by binary search on its sorted SK_ID_CURR
+index; applicants with no bureau history get 0 counts and NaN elsewhere.
+
+RunConfig.bureau_features switches the columns on for a run. A model trained
+with them expects them in its inputs; its kernel.json / model_npy/ record the
+flag, and src.score.Scorer (so src.serve too) joins this table onto the raw
+applications it scores. src.quick_score refuses such a model.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.data.columnar import ColumnarCache, file_digest, write_entry
+
+ROOT = Path(__file__).resolve().parents[2]
+BUREAU_PATH = ROOT / "data" / "raw" / "bureau.csv"
+BALANCE_PATH = ROOT / "data" / "raw" / "bureau_balance.csv"
+
+ID_COL = "SK_ID_CURR"
+BUREAU_ID_COL = "SK_ID_BUREAU"
+AGGREGATES_VERSION = 2      # bump when a derivation or feature below changes
+CACHE_DIRNAME = ".bureau_cache"
+DEFAULT_CHUNKSIZE = 1_000_000
+REDUCE_ROWS = 2_000_000     # pending partial rows that trigger a fold
+DAYS_PER_MONTH = 365.25 / 12
+
+# Per-row columns and how they reduce per applicant. Each is a sum, min or
+# max, so partial results reduce again with the same operation.
+BUREAU_OPS = {
+    "loans": "sum",
+    "active": "sum",
+    "bad_debt": "sum",
+    "overdue": "sum",
+    "prolonged": "sum",
+    "credit_sum": "sum",
+    "active_credit_sum": "sum",
+    "debt_sum": "sum",
+    "overdue_sum": "sum",
+    "max_overdue": "max",
+    "first_credit_days": "min",
+    "last_credit_days": "max",
+}
+BALANCE_OPS = {
+    "months": "sum",
+    "known_months": "sum",
+    "dpd_months": "sum",
+    "dpd60_months": "sum",
+    "worst_status": "max",
+    "last_dpd_month": "max",
+}
+
+# STATUS of a bureau_balance month: C closed, X unknown, 0 on time, 1-5 DPD buckets (1-30 ... 120+ days)
+STATUS_LEVEL = {"C": np.nan, "X": np.nan, "0": 0.0, "1": 1.0, "2": 2.0, "3": 3.0, "4": 4.0, "5": 5.0}
+
+COUNT_COLUMNS = [
+    "BUREAU_LOAN_COUNT", "BUREAU_ACTIVE_COUNT", "BUREAU_BAD_DEBT_COUNT", "BUREAU_OVERDUE_COUNT",
+    "BUREAU_PROLONG_COUNT", "BB_MONTHS", "BB_DPD_MONTHS", "BB_DPD60_MONTHS",
+]
+BUREAU_COLUMNS = COUNT_COLUMNS + [
+    "BUREAU_ACTIVE_RATIO", "BUREAU_OVERDUE_RATIO", "BUREAU_CREDIT_SUM", "BUREAU_DEBT_SUM",
+    "BUREAU_DEBT_CREDIT_RATIO", "BUREAU_OVERDUE_SUM", "BUREAU_MAX_OVERDUE",
+    "BUREAU_MONTHS_SINCE_FIRST_CREDIT", "BUREAU_MONTHS_SINCE_LAST_CREDIT",
+    "BB_DPD_RATIO", "BB_WORST_STATUS", "BB_MONTHS_SINCE_DPD",
+]
+
+_BUREAU_USECOLS = [ID_COL, BUREAU_ID_COL, "CREDIT_ACTIVE", "DAYS_CREDIT", "CREDIT_DAY_OVERDUE",
+                   "AMT_CREDIT_MAX_OVERDUE", "CNT_CREDIT_PROLONG", "AMT_CREDIT_SUM",
+                   "AMT_CREDIT_SUM_DEBT", "AMT_CREDIT_SUM_OVERDUE"]
+
+
+class GroupReducer:
+    """
+    Per-key sum / min / max of a stream of frames: each update() adds one
+    partial groupby, and the partials are folded into one table whenever
+    they outgrow REDUCE_ROWS or twice the folded table, so memory stays at
+    about the size of the result.
+    """
+
+    def __init__(self, ops: dict, key: str = ID_COL, reduce_rows: int = REDUCE_ROWS):
+        self.ops = ops
+        self.key = key
+        self.reduce_rows = reduce_rows
+        self.parts: list[pd.DataFrame] = []
+        self.pending = 0
+        self.folded = 0
+
+    def update(self, frame: pd.DataFrame) -> "GroupReducer":
+        part = frame.groupby(self.key, sort=False).agg(self.ops)
+        self.parts.append(part)
+        self.pending += len(part)
+        if self.pending > max(self.reduce_rows, 2 * self.folded):
+            self._fold()
+        return self
+
+    def merge(self, other: "GroupReducer") -> "GroupReducer":
+        self.parts.extend(other.parts)
+        self._fold()
+        return self
+
+    def _fold(self) -> None:
+        if len(self.parts) > 1:
+            self.parts = [pd.concat(self.parts).groupby(level=0, sort=False).agg(self.ops)]
+        self.folded = self.pending = len(self.parts[0]) if self.parts else 0
+
+    def result(self) -> pd.DataFrame:
+        """The reduced table, sorted by key."""
+        self._fold()
+        if not self.parts:
+            return pd.DataFrame(columns=list(self.ops), index=pd.Index([], name=self.key), dtype=float)
+        return self.parts[0].sort_index()
+
+
+def derive_bureau(chunk: pd.DataFrame) -> pd.DataFrame:
+    """The BUREAU_OPS columns of a bureau.csv chunk, one row per credit, plus SK_ID_CURR."""
+    active = (chunk["CREDIT_ACTIVE"] == "Active").to_numpy()
+    credit = chunk["AMT_CREDIT_SUM"].to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        ID_COL: chunk[ID_COL].to_numpy(),
+        "loans": np.ones(len(chunk), dtype=np.int64),
+        "active": active.astype(np.int64),
+        "bad_debt": (chunk["CREDIT_ACTIVE"] == "Bad debt").to_numpy().astype(np.int64),
+        "overdue": (chunk["CREDIT_DAY_OVERDUE"].to_numpy() > 0).astype(np.int64),
+        "prolonged": (chunk["CNT_CREDIT_PROLONG"].to_numpy() > 0).astype(np.int64),
+        "credit_sum": credit,
+        "active_credit_sum": np.where(active, credit, 0.0),
+        "debt_sum": chunk["AMT_CREDIT_SUM_DEBT"].to_numpy(dtype=np.float64),
+        "overdue_sum": chunk["AMT_CREDIT_SUM_OVERDUE"].to_numpy(dtype=np.float64),
+        "max_overdue": chunk["AMT_CREDIT_MAX_OVERDUE"].to_numpy(dtype=np.float64),
+        "first_credit_days": chunk["DAYS_CREDIT"].to_numpy(dtype=np.float64),
+        "last_credit_days": chunk["DAYS_CREDIT"].to_numpy(dtype=np.float64),
+    })
+
+
+def derive_balance(chunk: pd.DataFrame, bureau_ids: np.ndarray, owners: np.ndarray) -> pd.DataFrame:
+    """
+    The BALANCE_OPS columns of a bureau_balance.csv chunk, one row per month,
+    with the SK_ID_CURR looked up in the sorted `bureau_ids` (-> `owners`).
+    """
+    bid = chunk[BUREAU_ID_COL].to_numpy()
+    pos = np.minimum(np.searchsorted(bureau_ids, bid), max(len(bureau_ids) - 1, 0))
+    known = (bureau_ids[pos] == bid) if len(bureau_ids) else np.zeros(len(bid), dtype=bool)
+    codes = chunk["STATUS"].astype("category").cat
+    levels = np.array([STATUS_LEVEL.get(str(c), np.nan) for c in codes.categories] + [np.nan])
+    status = levels[codes.codes.to_numpy()[known]]     # code -1 (missing) -> the trailing NaN
+    month = chunk["MONTHS_BALANCE"].to_numpy(dtype=np.float64)[known]
+    dpd = status >= 1
+    return pd.DataFrame({
+        ID_COL: owners[pos[known]],
+        "months": np.ones(len(status), dtype=np.int64),
+        "known_months": (~np.isnan(status)).astype(np.int64),
+        "dpd_months": dpd.astype(np.int64),
+        "dpd60_months": (status >= 3).astype(np.int64),
+        "worst_status": status,
+        "last_dpd_month": np.where(dpd, month, np.nan),
+    })
+
+
+def finalize(bureau: pd.DataFrame, balance: pd.DataFrame) -> pd.DataFrame:
+    """The BUREAU_COLUMNS feature table (index SK_ID_CURR, sorted) from the two reduced tables."""
+    balance = balance.reindex(bureau.index.union(balance.index))
+    bureau = bureau.reindex(balance.index)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = pd.DataFrame({
+            "BUREAU_LOAN_COUNT": bureau["loans"],
+            "BUREAU_ACTIVE_COUNT": bureau["active"],
+            "BUREAU_BAD_DEBT_COUNT": bureau["bad_debt"],
+            "BUREAU_OVERDUE_COUNT": bureau["overdue"],
+            "BUREAU_PROLONG_COUNT": bureau["prolonged"],
+            "BB_MONTHS": balance["months"],
+            "BB_DPD_MONTHS": balance["dpd_months"],
+            "BB_DPD60_MONTHS": balance["dpd60_months"],
+            "BUREAU_ACTIVE_RATIO": bureau["active"] / bureau["loans"],
+            "BUREAU_OVERDUE_RATIO": bureau["overdue"] / bureau["loans"],
+            "BUREAU_CREDIT_SUM": bureau["credit_sum"],
+            "BUREAU_DEBT_SUM": bureau["debt_sum"],
+            "BUREAU_DEBT_CREDIT_RATIO": bureau["debt_sum"] / bureau["active_credit_sum"].where(bureau["active_credit_sum"] != 0),
+            "BUREAU_OVERDUE_SUM": bureau["overdue_sum"],
+            "BUREAU_MAX_OVERDUE": bureau["max_overdue"],
+            "BUREAU_MONTHS_SINCE_FIRST_CREDIT": -bureau["first_credit_days"] / DAYS_PER_MONTH,
+            "BUREAU_MONTHS_SINCE_LAST_CREDIT": -bureau["last_credit_days"] / DAYS_PER_MONTH,
+            "BB_DPD_RATIO": balance["dpd_months"] / balance["known_months"].where(balance["known_months"] > 0),
+            "BB_WORST_STATUS": balance["worst_status"],
+            "BB_MONTHS_SINCE_DPD": -balance["last_dpd_month"],
+        }, index=balance.index)
+    out[COUNT_COLUMNS] = out[COUNT_COLUMNS].fillna(0).astype(np.int64)
+    return out[BUREAU_COLUMNS].astype({c: np.float64 for c in BUREAU_COLUMNS if c not in COUNT_COLUMNS})
+
+
+def bureau_aggregates(
+        bureau_path: Union[Path, str] = BUREAU_PATH,
+        balance_path: Union[Path, str] = BALANCE_PATH,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+) -> pd.DataFrame:
+    """Stream both tables and return the per-applicant feature table (no cache)."""
+    bureau = GroupReducer(BUREAU_OPS)
+    id_parts, owner_parts = [], []
+    for chunk in pd.read_csv(bureau_path, usecols=_BUREAU_USECOLS, chunksize=chunksize,
+                             dtype={"CREDIT_ACTIVE": "category"}):
+        bureau.update(derive_bureau(chunk))
+        id_parts.append(chunk[BUREAU_ID_COL].to_numpy())
+        owner_parts.append(chunk[ID_COL].to_numpy())
+
+    bureau_ids = np.concatenate(id_parts) if id_parts else np.empty(0, dtype=np.int64)
+    owners = np.concatenate(owner_parts) if owner_parts else np.empty(0, dtype=np.int64)
+    order = np.argsort(bureau_ids, kind="stable")
+    bureau_ids, owners = bureau_ids[order], owners[order]
+    del id_parts, owner_parts, order
+
+    balance = GroupReducer(BALANCE_OPS)
+    for chunk in pd.read_csv(balance_path, chunksize=chunksize, dtype={"STATUS": "category"}):
+        balance.update(derive_balance(chunk, bureau_ids, owners))
+
+    return finalize(bureau.result(), balance.result())
+
+
+def _inputs(paths: dict) -> dict:
+    return {name: {"size": p.stat().st_size, "mtime_ns": p.stat().st_mtime_ns} for name, p in paths.items()}
+
+
+def bureau_features(
+        bureau_path: Union[Path, str] = BUREAU_PATH,
+        balance_path: Union[Path, str] = BALANCE_PATH,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        cache_root: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    bureau_aggregates(), cached: an entry whose inputs match both files is
+    loaded instead of recomputed. table.attrs["cache_key"] identifies the
+    inputs and aggregate definitions (for the run cache's fingerprint).
+    """
+    paths = {"bureau": Path(bureau_path), "balance": Path(balance_path)}
+    cache_root = Path(cache_root) if cache_root is not None else paths["bureau"].parent / CACHE_DIRNAME
+    source = f"{paths['bureau'].name} + {paths['balance'].name}"
+    # Only this pair's entries: another pair of files in the same directory
+    # (e.g. a scaled synthetic set) keeps its own.
+    entries = [p for p in cache_root.glob("bureau-*")
+               if (p / "manifest.json").exists() and ColumnarCache(p).manifest.get("source") == source]
+
+    def load(entry: Path) -> pd.DataFrame:
+        table = ColumnarCache(entry).read().set_index(ID_COL)
+        table.attrs["cache_key"] = entry.name.split("-", 1)[1]
+        return table
+
+    # Fast path: an entry recorded for exactly these sizes + mtimes.
+    stats = _inputs(paths)
+    for entry in entries:
+        m = ColumnarCache(entry).manifest
+        if m.get("aggregates_version") == AGGREGATES_VERSION and m["inputs"] == stats:
+            return load(entry)
+
+    digests = {name: file_digest(p) for name, p in paths.items()}
+    key = hashlib.blake2b(json.dumps({"version": AGGREGATES_VERSION, "digests": digests},
+                                     sort_keys=True).encode(), digest_size=16).hexdigest()
+    entry = cache_root / f"bureau-{key}"
+    if (entry / "manifest.json").exists():
+        # Same content, new mtimes (or the same content under other names): re-key instead of recomputing.
+        manifest = ColumnarCache(entry).manifest
+        manifest["inputs"] = stats
+        manifest["source"] = source
+        with open(entry / "manifest.json", "w") as f:
+            json.dump(manifest, f, indent=1)
+        return load(entry)
+
+    table = bureau_aggregates(paths["bureau"], paths["balance"], chunksize)
+    cache_root.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=".bureau-", dir=cache_root))
+    try:
+        write_entry(table.reset_index(), tmp, {
+            "aggregates_version": AGGREGATES_VERSION,
+            "source": source,
+            "digests": digests,
+            "inputs": stats,
+            "n_rows": len(table),
+        })
+        if entry.exists():
+            shutil.rmtree(entry)
+        os.replace(tmp, entry)
+    finally:
+        if tmp.exists():
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    for stale in entries:
+        if stale != entry:
+            shutil.rmtree(stale, ignore_errors=True)
+    return load(entry)
+
+
+def join_bureau_features(df: pd.DataFrame, table: pd.DataFrame) -> pd.DataFrame:
+    """
+    df with the table's columns appended, matched on SK_ID_CURR by binary
+    search in the table's sorted index (df's row order is kept). Like
+    add_application_features, the raw columns are shared with df and the new
+    ones are attached in one concat, replacing any already in df.
+    """
+    keys = table.index.to_numpy()
+    ids = df[ID_COL].to_numpy()
+    pos = np.minimum(np.searchsorted(keys, ids), max(len(keys) - 1, 0))
+    found = (keys[pos] == ids) if len(keys) else np.zeros(len(ids), dtype=bool)
+    new = {}
+    for col in table.columns:
+        values = table[col].to_numpy()
+        missing = 0 if col in COUNT_COLUMNS else np.nan
+        new[col] = np.where(found, values[pos] if len(keys) else missing, missing)
+    new = pd.DataFrame(new, index=df.index)
+    stale = [c for c in new.columns if c in df.columns]
+    return pd.concat([df.drop(columns=stale) if stale else df, new], axis=1)
+
+
+def reference_features(bureau: pd.DataFrame, balance: pd.DataFrame) -> pd.DataFrame:
+    """
+    The BUREAU_COLUMNS table computed the plain way: whole frames, one merge
+    and one groupby per table, each feature written out from its definition
+    without derive_bureau / derive_balance / finalize. The --check reference
+    (small inputs only).
+    """
+    b = bureau.assign(
+        is_active=bureau["CREDIT_ACTIVE"].eq("Active"),
+        is_bad_debt=bureau["CREDIT_ACTIVE"].eq("Bad debt"),
+        is_overdue=bureau["CREDIT_DAY_OVERDUE"].gt(0),
+        is_prolonged=bureau["CNT_CREDIT_PROLONG"].gt(0),
+    )
+    b["active_credit"] = b["AMT_CREDIT_SUM"].where(b["is_active"])
+    g = b.groupby(ID_COL)
+    loans = g.size()
+    active_credit = g["active_credit"].sum()
+    features = pd.DataFrame({
+        "BUREAU_LOAN_COUNT": loans,
+        "BUREAU_ACTIVE_COUNT": g["is_active"].sum(),
+        "BUREAU_BAD_DEBT_COUNT": g["is_bad_debt"].sum(),
+        "BUREAU_OVERDUE_COUNT": g["is_overdue"].sum(),
+        "BUREAU_PROLONG_COUNT": g["is_prolonged"].sum(),
+        "BUREAU_ACTIVE_RATIO": g["is_active"].sum() / loans,
+        "BUREAU_OVERDUE_RATIO": g["is_overdue"].sum() / loans,
+        "BUREAU_CREDIT_SUM": g["AMT_CREDIT_SUM"].sum(),
+        "BUREAU_DEBT_SUM": g["AMT_CREDIT_SUM_DEBT"].sum(),
+        "BUREAU_DEBT_CREDIT_RATIO": g["AMT_CREDIT_SUM_DEBT"].sum() / active_credit.where(active_credit != 0),
+        "BUREAU_OVERDUE_SUM": g["AMT_CREDIT_SUM_OVERDUE"].sum(),
+        "BUREAU_MAX_OVERDUE": g["AMT_CREDIT_MAX_OVERDUE"].max(),
+        "BUREAU_MONTHS_SINCE_FIRST_CREDIT": -g["DAYS_CREDIT"].min() / DAYS_PER_MONTH,
+        "BUREAU_MONTHS_SINCE_LAST_CREDIT": -g["DAYS_CREDIT"].max() / DAYS_PER_MONTH,
+    })
+
+    # STATUS "1".."5" are the DPD buckets, "0" on time; C / X / missing carry no level
+    m = balance.merge(bureau[[BUREAU_ID_COL, ID_COL]], on=BUREAU_ID_COL, how="inner")
+    level = pd.to_numeric(m["STATUS"].astype(str).where(m["STATUS"].astype(str).isin(list("012345"))))
+    m = m.assign(level=level, dpd=level >= 1, dpd60=level >= 3)
+    m["dpd_month"] = m["MONTHS_BALANCE"].where(m["dpd"])
+    g = m.groupby(ID_COL)
+    known = g["level"].count()
+    history = pd.DataFrame({
+        "BB_MONTHS": g.size(),
+        "BB_DPD_MONTHS": g["dpd"].sum(),
+        "BB_DPD60_MONTHS": g["dpd60"].sum(),
+        "BB_DPD_RATIO": g["dpd"].sum() / known.where(known > 0),
+        "BB_WORST_STATUS": g["level"].max(),
+        "BB_MONTHS_SINCE_DPD": -g["dpd_month"].max(),
+    })
+    out = features.join(history, how="left")
+    out[COUNT_COLUMNS] = out[COUNT_COLUMNS].fillna(0).astype(np.int64)
+    return out[BUREAU_COLUMNS].astype({c: np.float64 for c in BUREAU_COLUMNS if c not in COUNT_COLUMNS})
+
+
+def _fixture() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    (bureau, balance, expected): three applicants whose features are worked
+    out by hand below, covering every status level, the DPD thresholds, the
+    sign of the months-since features and an undefined debt / credit ratio.
+    """
+    nan = np.nan
+    bureau = pd.DataFrame(
+        [   # SK_ID_CURR, SK_ID_BUREAU, CREDIT_ACTIVE, DAYS_CREDIT, CREDIT_DAY_OVERDUE,
+            # AMT_CREDIT_MAX_OVERDUE, CNT_CREDIT_PROLONG, AMT_CREDIT_SUM, _DEBT, _OVERDUE
+            (1, 10, "Active", -100.0, 0, nan, 0, 1000.0, 400.0, 0.0),
+            (1, 11, "Closed", -730.5, 5, 50.0, 1, 500.0, 0.0, 20.0),
+            (2, 20, "Bad debt", -30.0, 0, 10.0, 0, 300.0, 300.0, 0.0),
+            (3, 30, "Active", -365.25, 0, nan, 0, 0.0, -50.0, 0.0),    # no active credit: ratio undefined
+        ],
+        columns=_BUREAU_USECOLS,
+    )
+    balance = pd.DataFrame(
+        [(10, 0, "0"), (10, -1, "1"), (10, -2, "C"), (10, -3, "X"), (11, -10, "3"), (11, -11, "5"),
+         (20, -1, "0"), (20, -2, "2"),
+         (99, -1, "5")],    # a credit not in bureau.csv: dropped
+        columns=[BUREAU_ID_COL, "MONTHS_BALANCE", "STATUS"],
+    )
+    expected = pd.DataFrame(
+        {   # applicant 1: 2 credits, 6 months of which 4 with a level (0, 1, 3, 5), latest DPD at month -1;
+            # applicant 2: a 31-60 DPD month (level 2) -- past due, but not 60+
+            "BUREAU_LOAN_COUNT": [2, 1, 1],
+            "BUREAU_ACTIVE_COUNT": [1, 0, 1],
+            "BUREAU_BAD_DEBT_COUNT": [0, 1, 0],
+            "BUREAU_OVERDUE_COUNT": [1, 0, 0],
+            "BUREAU_PROLONG_COUNT": [1, 0, 0],
+            "BB_MONTHS": [6, 2, 0],
+            "BB_DPD_MONTHS": [3, 1, 0],
+            "BB_DPD60_MONTHS": [2, 0, 0],
+            "BUREAU_ACTIVE_RATIO": [0.5, 0.0, 1.0],
+            "BUREAU_OVERDUE_RATIO": [0.5, 0.0, 0.0],
+            "BUREAU_CREDIT_SUM": [1500.0, 300.0, 0.0],
+            "BUREAU_DEBT_SUM": [400.0, 300.0, -50.0],
+            "BUREAU_DEBT_CREDIT_RATIO": [0.4, nan, nan],
+            "BUREAU_OVERDUE_SUM": [20.0, 0.0, 0.0],
+            "BUREAU_MAX_OVERDUE": [50.0, 10.0, nan],
+            "BUREAU_MONTHS_SINCE_FIRST_CREDIT": [24.0, 30 / DAYS_PER_MONTH, 12.0],
+            "BUREAU_MONTHS_SINCE_LAST_CREDIT": [100 / DAYS_PER_MONTH, 30 / DAYS_PER_MONTH, 12.0],
+            "BB_DPD_RATIO": [0.75, 0.5, nan],
+            "BB_WORST_STATUS": [5.0, 2.0, nan],
+            "BB_MONTHS_SINCE_DPD": [1.0, 2.0, nan],
+        },
+        index=pd.Index([1, 2, 3], name=ID_COL),
+    )
+    return bureau, balance, expected
+
+
+def _assert_features_equal(table: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(table, expected, check_exact=False, rtol=1e-12,
+                                  check_dtype=False, check_index_type=False)
+
+
+def main() -> None:
+    """
+    Build the bureau features through the cache and time a cached reload.
+    --check first runs the chunked aggregation on a hand-worked fixture (one
+    row per chunk) and compares it with the fixture's expected values and
+    with reference_features; then (small files only) compares the files'
+    table with reference_features of the whole files.
+    """
+    parser = argparse.ArgumentParser(description="Aggregate bureau / bureau_balance per applicant.")
+    parser.add_argument("--bureau", type=Path, default=BUREAU_PATH)
+    parser.add_argument("--balance", type=Path, default=BALANCE_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--check", action="store_true", help="also recompute in memory and compare (small files only)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    table = bureau_features(args.bureau, args.balance, args.chunksize)
+    t1 = time.perf_counter()
+    bureau_features(args.bureau, args.balance, args.chunksize)
+    t2 = time.perf_counter()
+    print(f"{len(table):,} applicants x {table.shape[1]} features in {t1 - t0:.1f}s "
+          f"(cache key {table.attrs['cache_key']}); cached reload {1e3 * (t2 - t1):.0f} ms")
+
+    if args.check:
+        bureau, balance, expected = _fixture()
+        with tempfile.TemporaryDirectory() as tmp:
+            bureau.to_csv(Path(tmp) / "bureau.csv", index=False)
+            balance.to_csv(Path(tmp) / "bureau_balance.csv", index=False)
+            fixture_table = bureau_aggregates(Path(tmp) / "bureau.csv", Path(tmp) / "bureau_balance.csv", chunksize=1)
+        _assert_features_equal(fixture_table, expected)
+        _assert_features_equal(reference_features(bureau, balance), expected)
+        print("OK -- fixture: chunked aggregates and the reference match the hand-worked values.")
+
+        reference = reference_features(pd.read_csv(args.bureau, usecols=_BUREAU_USECOLS), pd.read_csv(args.balance))
+        _assert_features_equal(table, reference)
+        print("OK -- chunked aggregates match the in-memory merge + groupby reference.")
+
+
+if __name__ == "__main__":
+    main()
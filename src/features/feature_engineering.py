@@ -15,68 +15,249 @@ Evidence references:
   - DAYS_BIRTH and DAYS_EMPLOYED become more interpretable as YEARS_* and show monotone trends with default risk.
 """
 
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
 import numpy as np
-import pandas as pd
+
+if TYPE_CHECKING:
+    # pandas is imported where a frame is built: the online path
+    # (application_features_row -> src.models.kernel) never needs it.
+    import pandas as pd
 
 # DAYS_EMPLOYED has sentinel 365243 indicating "unknown"
 DAYS_EMPLOYED_SENTINEL = 365243
 
-def add_application_features(
-        df: pd.DataFrame
+# Raw columns each engineered feature is derived from, so a loader can read
+# only what a config actually needs (e.g. keep DAYS_BIRTH for YEARS_BIRTH even
+# when DAYS_BIRTH itself is dropped from the model).
+FEATURE_SOURCES = {
+    "YEARS_BIRTH": ["DAYS_BIRTH"],
+    "YEARS_EMPLOYED": ["DAYS_EMPLOYED"],
+    "DAYS_EMPLOYED_MISSING": ["DAYS_EMPLOYED"],
+    "CREDIT_INCOME_RATIO": ["AMT_CREDIT", "AMT_INCOME_TOTAL"],
+    "ANNUITY_INCOME_RATIO": ["AMT_ANNUITY", "AMT_INCOME_TOTAL"],
+    "GOODS_CREDIT_RATIO": ["AMT_GOODS_PRICE", "AMT_CREDIT"],
+    "EXT_SOURCE_1_MISSING": ["EXT_SOURCE_1"],
+    "EXT_SOURCE_3_MISSING": ["EXT_SOURCE_3"],
+    "LOG_AMT_INCOME_TOTAL": ["AMT_INCOME_TOTAL"],
+    "LOG_AMT_ANNUITY": ["AMT_ANNUITY"],
+    "LOG_AMT_CREDIT": ["AMT_CREDIT"],
+    "LOG_AMT_GOODS_PRICE": ["AMT_GOODS_PRICE"],
+}
+
+
+ENGINEERED_COLUMNS = list(FEATURE_SOURCES)
+FLAG_COLUMNS = ["DAYS_EMPLOYED_MISSING", "EXT_SOURCE_1_MISSING", "EXT_SOURCE_3_MISSING"]
+
+
+def _values(df: pd.DataFrame, col: str) -> np.ndarray:
+    # float64 view of a raw column (no copy when it already is float64). Amounts
+    # may arrive as float32 from the columnar cache; features are derived in
+    # float64 so they do not depend on the storage dtype.
+    return df[col].to_numpy(dtype=np.float64)
+
+
+def compute_application_features(
+        df: pd.DataFrame,
+        columns: Optional[Iterable[str]] = None,
+        dtype=np.float32,
 ) -> pd.DataFrame:
-    df = df.copy()
+    """
+    Compute only the engineered columns -- all of them, or just `columns` --
+    and return them as a new frame on df's index. The input is only read,
+    never copied: each feature is written straight into one column of a
+    preallocated (n_rows x n_features) array of `dtype`. A feature whose raw
+    sources are absent from df is skipped, as in add_application_features.
+
+    Arithmetic is float64 throughout; with dtype=np.float32 every value equals
+    the float64 result rounded once to float32.
+    """
+    import pandas as pd
+
+    wanted = ENGINEERED_COLUMNS if columns is None else [c for c in ENGINEERED_COLUMNS if c in set(columns)]
+    names = [c for c in wanted if all(src in df.columns for src in FEATURE_SOURCES[c])]
+    out = np.empty((len(df), len(names)), dtype=dtype, order="F")
+    cols = dict(zip(names, out.T))  # contiguous per-column views into `out`
 
     # -- Age / employment tenure --
     # EDA evidence:
     # - Both YEARS_BIRTH and YEARS_EMPLOYED show monotonic bad-rate pattern across deciles.
-    if "DAYS_BIRTH" in df.columns:
-        df['YEARS_BIRTH'] = (-df['DAYS_BIRTH']) / 365.25
-    if "DAYS_EMPLOYED" in df.columns:
-        days_emp = df["DAYS_EMPLOYED"].replace(DAYS_EMPLOYED_SENTINEL, np.nan)
-        df["YEARS_EMPLOYED"] = (-days_emp) / 365.25
-        df["DAYS_EMPLOYED_MISSING"] = (df["DAYS_EMPLOYED"] == DAYS_EMPLOYED_SENTINEL).astype(int)
+    if "YEARS_BIRTH" in cols:
+        np.divide(-_values(df, "DAYS_BIRTH"), 365.25, out=cols["YEARS_BIRTH"])
+    if "YEARS_EMPLOYED" in cols or "DAYS_EMPLOYED_MISSING" in cols:
+        days_emp = _values(df, "DAYS_EMPLOYED")
+        sentinel = days_emp == DAYS_EMPLOYED_SENTINEL
+        if "YEARS_EMPLOYED" in cols:
+            np.divide(-days_emp, 365.25, out=cols["YEARS_EMPLOYED"])
+            cols["YEARS_EMPLOYED"][sentinel] = np.nan
+        if "DAYS_EMPLOYED_MISSING" in cols:
+            cols["DAYS_EMPLOYED_MISSING"][:] = sentinel
 
     # -- Affordability / leverage ratios --
     # EDA evidence:
     # - CREDIT_INCOME_RATIO and ANNUITY_INCOME_RATIO show clearer monotone relationships with default than raw features.
     # Domain intuition: 
     # - Higher leverage / repayment burden  -> higher default risk.
-    if "AMT_INCOME_TOTAL" in df.columns:
-        income_safe = df["AMT_INCOME_TOTAL"].replace(0, np.nan)
-        
-        if "AMT_CREDIT" in df.columns:
-            df["CREDIT_INCOME_RATIO"] = df["AMT_CREDIT"] / income_safe
-        if "AMT_ANNUITY" in df.columns:
-            df["ANNUITY_INCOME_RATIO"] = df["AMT_ANNUITY"] / income_safe
+    if "CREDIT_INCOME_RATIO" in cols or "ANNUITY_INCOME_RATIO" in cols:
+        income = _values(df, "AMT_INCOME_TOTAL")
+        income_safe = np.where(income == 0, np.nan, income)
+
+        if "CREDIT_INCOME_RATIO" in cols:
+            np.divide(_values(df, "AMT_CREDIT"), income_safe, out=cols["CREDIT_INCOME_RATIO"])
+        if "ANNUITY_INCOME_RATIO" in cols:
+            np.divide(_values(df, "AMT_ANNUITY"), income_safe, out=cols["ANNUITY_INCOME_RATIO"])
     
     # -- Equity -- 
     # EDA evidence:
     # - GOODS_CREDIT_RATIO shows clear monotone relationship with default more than raw features.
     # Domain intuition:
     # - Higher equity -> lower default risk.
-    if "AMT_CREDIT" in df.columns:
-        credit_safe = df["AMT_CREDIT"].replace(0, np.nan)
-
-        if "AMT_GOODS_PRICE" in df.columns:
-            df["GOODS_CREDIT_RATIO"] = df["AMT_GOODS_PRICE"] / credit_safe
+    if "GOODS_CREDIT_RATIO" in cols:
+        credit = _values(df, "AMT_CREDIT")
+        credit_safe = np.where(credit == 0, np.nan, credit)
+        np.divide(_values(df, "AMT_GOODS_PRICE"), credit_safe, out=cols["GOODS_CREDIT_RATIO"])
 
     # -- Missigness indicators -- 
     # EDA evidence:
     # - EXT_SOURCE_1 / EXT_SOURCE_3 missingness corresponds to higher observed bad rate.
     # Missingness is treated as a signal, so we crease explicit flags 
     for col in ["EXT_SOURCE_1", "EXT_SOURCE_3"]:
-        if col in df.columns:
-            df[f"{col}_MISSING"] = df[col].isna().astype(int)
+        if f"{col}_MISSING" in cols:
+            cols[f"{col}_MISSING"][:] = df[col].isna().to_numpy()
 
     ## -- Log transforms for skewed amount features --
     # Amount features are heavily right-skewed 
     # Logarithms measure relative percentage changes, not absolute changes
     # Financial risk scales by percentages/multipliers
     for col in ["AMT_INCOME_TOTAL", "AMT_ANNUITY", "AMT_CREDIT", "AMT_GOODS_PRICE"]:
-        if col in df.columns:
-            df[f"LOG_{col}"] = np.log1p(df[col])
+        if f"LOG_{col}" in cols:
+            np.log1p(_values(df, col), out=cols[f"LOG_{col}"])
+
+    return pd.DataFrame(out, index=df.index, columns=names, copy=False)
+
+
+def add_application_features(
+        df: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Return df with the engineered columns appended (float64, 0/1 flags as int).
+
+    The raw columns are not copied: the result is a shallow, copy-on-write
+    copy of df, so peak memory grows by the engineered columns only, not by a
+    second copy of the raw frame. The engineered columns are attached in one
+    concat (inserting them one by one fragments the frame); any already in df
+    are replaced. Use compute_application_features directly to get just the
+    engineered columns (or a subset of them) in float32.
+    """
+    import pandas as pd
+
+    feats = compute_application_features(df, dtype=np.float64)
+    new = pd.DataFrame(
+        {name: feats[name].to_numpy().astype(int) if name in FLAG_COLUMNS else feats[name].to_numpy()
+         for name in feats.columns},
+        index=df.index,
+    )
+    stale = [c for c in new.columns if c in df.columns]
+    return pd.concat([df.drop(columns=stale) if stale else df, new], axis=1)
+
+
+def model_feature_columns(model) -> list[str]:
+    """
+    Engineered columns a fitted estimator actually consumes, read from its
+    `feature_names_in_` -- pass to compute_application_features(columns=...)
+    to skip the ones the model never sees.
+    """
+    seen = set(getattr(model, "feature_names_in_", ENGINEERED_COLUMNS))
+    return [c for c in ENGINEERED_COLUMNS if c in seen]
+
+
+def iter_application_features(
+        path: Path,
+        chunksize: int = 100_000,
+        columns: Optional[Iterable[str]] = None,
+        dtype=np.float32,
+        keep: Iterable[str] = (),
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a raw CSV and yield its engineered columns chunk by chunk.
+
+    Only the raw source columns of the requested features (plus `keep`, e.g.
+    SK_ID_CURR / TARGET, placed first) are parsed, so memory stays bounded by
+    `chunksize` whatever the file size. Chunk indexes continue across chunks.
+    """
+    import pandas as pd
+
+    names = ENGINEERED_COLUMNS if columns is None else [c for c in ENGINEERED_COLUMNS if c in set(columns)]
+    keep = list(keep)
+    usecols = set(keep).union(*(FEATURE_SOURCES[c] for c in names))
+    for chunk in pd.read_csv(path, usecols=lambda c: c in usecols, chunksize=chunksize):
+        feats = compute_application_features(chunk, names, dtype)
+        yield pd.concat([chunk[keep], feats], axis=1) if keep else feats
+
+
+def _isnan(x) -> bool:
+    return x is None or x != x
+
+
+def application_features_row(row: dict) -> dict:
+    """
+    add_application_features for a single raw-field dict, in pure Python.
+
+    Returns only the engineered fields (merge them over `row` to get the full
+    record). Used by the online scoring path, where building a one-row
+    DataFrame costs far more than the arithmetic; the logic mirrors
+    add_application_features branch for branch and must be kept in step with it.
+    """
+    nan = float("nan")
+    out = {}
+
+    if "DAYS_BIRTH" in row:
+        days_birth = row["DAYS_BIRTH"]
+        out["YEARS_BIRTH"] = nan if _isnan(days_birth) else (-days_birth) / 365.25
+    if "DAYS_EMPLOYED" in row:
+        days_emp = row["DAYS_EMPLOYED"]
+        is_sentinel = not _isnan(days_emp) and days_emp == DAYS_EMPLOYED_SENTINEL
+        out["YEARS_EMPLOYED"] = nan if (is_sentinel or _isnan(days_emp)) else (-days_emp) / 365.25
+        out["DAYS_EMPLOYED_MISSING"] = int(is_sentinel)
+
+    if "AMT_INCOME_TOTAL" in row:
+        income = row["AMT_INCOME_TOTAL"]
+        income_safe = nan if (_isnan(income) or income == 0) else income
+
+        if "AMT_CREDIT" in row:
+            credit = row["AMT_CREDIT"]
+            out["CREDIT_INCOME_RATIO"] = nan if _isnan(credit) else credit / income_safe
+        if "AMT_ANNUITY" in row:
+            annuity = row["AMT_ANNUITY"]
+            out["ANNUITY_INCOME_RATIO"] = nan if _isnan(annuity) else annuity / income_safe
+
+    if "AMT_CREDIT" in row:
+        credit = row["AMT_CREDIT"]
+        credit_safe = nan if (_isnan(credit) or credit == 0) else credit
+
+        if "AMT_GOODS_PRICE" in row:
+            goods = row["AMT_GOODS_PRICE"]
+            out["GOODS_CREDIT_RATIO"] = nan if _isnan(goods) else goods / credit_safe
+
+    for col in ["EXT_SOURCE_1", "EXT_SOURCE_3"]:
+        if col in row:
+            out[f"{col}_MISSING"] = int(_isnan(row[col]))
+
+    for col in ["AMT_INCOME_TOTAL", "AMT_ANNUITY", "AMT_CREDIT", "AMT_GOODS_PRICE"]:
+        if col in row:
+            x = row[col]
+            if _isnan(x) or x < -1:
+                out[f"LOG_{col}"] = nan
+            elif x == -1:
+                out[f"LOG_{col}"] = -math.inf
+            else:
+                out[f"LOG_{col}"] = math.log1p(x)
 
-    return df
+    return out
 
 
 def main() -> None:
@@ -86,7 +267,9 @@ def main() -> None:
 
     Run with `python -m src.features.feature_engineering`.
     """
-    df = pd.read_csv("data/raw/application_train.csv")
+    from src.models.pipeline import load_data
+
+    df = load_data("data/raw/application_train.csv")
     before = df.shape[1]
     out = add_application_features(df)
 
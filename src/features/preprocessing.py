@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from typing import Tuple, List
 
@@ -5,7 +6,9 @@ from sklearn.model_selection import train_test_split
 from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+
+MATRIX_MODES = ("dense64", "dense32", "sparse")
 
 
 # 1. Split features and target
@@ -66,35 +69,62 @@ def train_val_split(
     return X_train, X_val, y_train, y_val
 
 # 4. ColumnTransformer implementation
+def _to_float32(X):
+    return X.astype(np.float32)
+
+
 def build_preprocessor(
     numeric_cols: List[str],
     categorical_cols: List[str],
+    matrix_mode: str = "dense64",
 ) -> ColumnTransformer:
     """
     Builds an sklearn ColumnTransformer that:
     - Imputes & scales numeric features
     - Imputes + one-hot encodes categorical features
 
+    matrix_mode sets the design matrix it produces:
+    - "dense64": dense float64 (~250 columns x n rows).
+    - "dense32": dense float32, half the memory. Scaling is still computed
+      in float64, then cast.
+    - "sparse": CSR. Numerics are scaled but not centered (with_mean=False),
+      so zero flags stay zero. Centering only shifts the logistic intercept,
+      which is unpenalized, so the fitted model is the same.
+
     Note:
     - This function does not fit anything.
     - Fitting happens on training data only: preprocessor.fit(X_train)
     """
-    numeric_pipeline = Pipeline(steps=[
+    if matrix_mode not in MATRIX_MODES:
+        raise ValueError(f"matrix_mode must be one of {MATRIX_MODES}, got {matrix_mode!r}")
+
+    numeric_steps = [
         ("imputer", SimpleImputer(strategy="median")),
-        ("scaler", StandardScaler()),
-    ])
+        ("scaler", StandardScaler(with_mean=matrix_mode != "sparse")),
+    ]
+    if matrix_mode == "dense32":
+        numeric_steps.append(("float32", FunctionTransformer(_to_float32, feature_names_out="one-to-one")))
+    numeric_pipeline = Pipeline(steps=numeric_steps)
 
     categorical_pipeline = Pipeline(steps=[
         ("imputer", SimpleImputer(strategy="most_frequent")),
-        ("onehot", OneHotEncoder(handle_unknown="ignore")),
+        ("onehot", OneHotEncoder(
+            handle_unknown="ignore",
+            dtype=np.float32 if matrix_mode == "dense32" else np.float64,
+        )),
     ])
 
+    # sparse_threshold: 0.3 is sklearn's default (dense here, the matrix is
+    # mostly numeric); force dense for float32 and CSR for sparse.
+    sparse_threshold = {"dense64": 0.3, "dense32": 0.0, "sparse": 1.0}[matrix_mode]
+
     preprocessor = ColumnTransformer(
         transformers=[
             ("num", numeric_pipeline, numeric_cols),
             ("cat", categorical_pipeline, categorical_cols),
         ],
         remainder="drop",
+        sparse_threshold=sparse_threshold,
     )
 
     return preprocessor
@@ -107,7 +137,9 @@ def main() -> None:
     Run directly (`python -m src.features.preprocessing`) to confirm the module
     still behaves; the asserts fail loudly if a step regresses.
     """
-    df = pd.read_csv("data/raw/application_train.csv")
+    from src.models.pipeline import load_data
+
+    df = load_data("data/raw/application_train.csv")
 
     X, y = split_X_y(df)
     numeric_cols, categorical_cols = identify_feature_types(X)
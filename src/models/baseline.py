@@ -3,6 +3,14 @@ from sklearn.pipeline import Pipeline
 from sklearn.linear_model import LogisticRegression
 
 from config import RunConfig
+from src.models.fold_cache import fold_cache
+
+# solver="auto": lbfgs always upcasts to float64, so dense32 uses
+# newton-cholesky (keeps float32; ~250 features make its Hessian cheap).
+# Uncentered sparse columns are badly conditioned for first-order solvers
+# (saga ~745 epochs, lbfgs ~680 iterations on the full data) while
+# newton-cholesky converges in 3 steps -- see benchmarks.bench_matrix_modes.
+AUTO_SOLVER = {"dense64": "lbfgs", "dense32": "newton-cholesky", "sparse": "newton-cholesky"}
 
 def build_baseline_model(
         preprocessor: ColumnTransformer,
@@ -21,15 +29,20 @@ def build_baseline_model(
     if cw_config.lower() == "none":
         cw_config = None
  
+    solver = AUTO_SOLVER[cfg.matrix_mode] if cfg.solver == "auto" else cfg.solver
+
     model = LogisticRegression(
+        C=cfg.C,
         max_iter=1000,
         class_weight=cw_config,
-        solver="lbfgs",
+        solver=solver,
     )
 
+    # The fitted preprocessor is cached per training fold (see fold_cache),
+    # so CV and calibration folds with the same rows share one fit.
     pipeline = Pipeline(steps=[
         ("preprocessor", preprocessor),
         ("model", model),
-    ])
+    ], memory=fold_cache(cfg))
 
     return pipeline
\ No newline at end of file
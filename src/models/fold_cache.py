@@ -0,0 +1,129 @@
+"""
+On-disk cache for the preprocessing step of cross-validated fits.
+
+Every run fits the ColumnTransformer (median imputer, scaler, one-hot) once
+per run_cv fold and again once per CalibratedClassifierCV fold. When both use
+the same splitter (pipeline.cv_splitter) the five training folds are
+identical, so the calibration pass can reuse the CV pass's fitted
+preprocessors and transformed matrices instead of refitting them -- and a
+rerun with unchanged data and columns reuses all ten.
+
+FoldCache plugs into Pipeline(memory=...): sklearn hands it the unfitted
+transformer plus the fold's X / y, and joblib.Memory keys the result on a
+hash of exactly those (the fold's rows and the preprocessor's params).
+Results are stored with mmap_mode="r", so a hit maps the matrix instead of
+reading it. The store is size-bounded: after each new entry, the least
+recently used entries are evicted until it fits `bytes_limit`.
+"""
+
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.pipeline import Pipeline
+
+from config import RunConfig
+
+
+def _fit_transform(fit_transform_one, stats, y_codes, transformer, X, y, *args, **kwargs):
+    # The function joblib memoizes: its body only runs on a cache miss. The
+    # key uses y_codes (label-encoded y) rather than y itself, because the
+    # same fold arrives as an int8 Series from cross_validate but as an int64
+    # array from cross_val_predict (calibration_ensemble=False).
+    stats["misses"] += 1
+    return fit_transform_one(transformer, X, y, *args, **kwargs)
+
+
+class FoldCache:
+    """
+    A joblib.Memory-compatible store for Pipeline(memory=...) that evicts
+    least-recently-used entries beyond `bytes_limit` and counts hits/misses.
+    """
+
+    def __init__(self, location: Path, bytes_limit: int):
+        # Entries are only valid for the sklearn version that produced them.
+        self.location = Path(location) / f"sklearn-{sklearn.__version__}"
+        self.bytes_limit = bytes_limit
+        self.memory = joblib.Memory(self.location, mmap_mode="r", verbose=0)
+        self._stats = {"calls": 0, "misses": 0, "miss_s": 0.0, "hit_s": 0.0, "saved_s": 0.0}
+
+    def __deepcopy__(self, memo):
+        # clone() deep-copies Pipeline params; every clone must share this
+        # handle so the counters see the calls made by CV / calibration folds.
+        return self
+
+    def cache(self, func):
+        memorized = self.memory.cache(_fit_transform, ignore=["stats", "y"])
+
+        def cached(transformer, X, y, *args, **kwargs):
+            misses = self._stats["misses"]
+            t0 = time.perf_counter()
+            y_codes = None if y is None else np.unique(np.asarray(y), return_inverse=True)[1]
+            # call_and_shelve (rather than a plain call) exposes the entry's
+            # original compute time, which is what a hit saves.
+            result = memorized.call_and_shelve(func, self._stats, y_codes, transformer, X, y, *args, **kwargs)
+            out = result.get()
+            elapsed = time.perf_counter() - t0
+            self._stats["calls"] += 1
+            if self._stats["misses"] > misses:
+                self._stats["miss_s"] += elapsed
+                self.memory.reduce_size(bytes_limit=self.bytes_limit)
+            else:
+                self._stats["hit_s"] += elapsed
+                self._stats["saved_s"] += (result.duration or 0.0) - elapsed
+            return out
+
+        return cached
+
+    def counters(self) -> dict:
+        return dict(self._stats)
+
+    def absorb(self, delta: dict) -> None:
+        """Add counters recorded by a copy of this cache in a worker process."""
+        for key, value in delta.items():
+            self._stats[key] += value
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.location.rglob("*") if p.is_file())
+
+    def stats(self, since: Optional[dict] = None) -> dict:
+        """
+        Hit/miss counts, seconds spent on each, and the net time saved by
+        hits -- since an earlier counters() snapshot if given.
+        """
+        s = dict(self._stats)
+        if since is not None:
+            s = {k: v - since[k] for k, v in s.items()}
+        s["hits"] = s["calls"] - s["misses"]
+        s["bytes"] = self.size_bytes()
+        s["bytes_limit"] = self.bytes_limit
+        return s
+
+
+@lru_cache(maxsize=None)
+def _open(location: str, bytes_limit: int) -> FoldCache:
+    return FoldCache(Path(location), bytes_limit)
+
+
+def fold_cache(cfg: RunConfig) -> Optional[FoldCache]:
+    """The process-wide FoldCache for this config, or None if caching is off."""
+    if not cfg.preprocess_cache:
+        return None
+    return _open(cfg.preprocess_cache, cfg.preprocess_cache_mb * 1024 * 1024)
+
+
+def detach(model) -> None:
+    """
+    Drop the cache handle from every Pipeline inside a fitted model, so the
+    persisted artifact does not carry (or write to) the training machine's
+    cache directory. Fitted state is untouched.
+    """
+    pipelines = [model, getattr(model, "estimator", None)]
+    pipelines += [cc.estimator for cc in getattr(model, "calibrated_classifiers_", [])]
+    for pipe in pipelines:
+        if isinstance(pipe, Pipeline):
+            pipe.set_params(memory=None)
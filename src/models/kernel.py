@@ -0,0 +1,371 @@
+# python -m src.models.kernel reports/<run_id>
+
+"""
+Compiled scoring kernel: the fitted PD model flattened into a few NumPy arrays.
+
+score_applicant spends almost all of its time in one-row DataFrame
+construction, add_application_features' copy and sklearn's ColumnTransformer /
+Pipeline dispatch, not in arithmetic. Every piece of the persisted model is
+linear up to the final sigmoid, so it can be folded ahead of time:
+
+    decision_f = intercept_f + sum_j coef_fj * (x_j - mean_fj) / scale_fj + sum_c coef_f[onehot(c)]
+               = bias_f      + sum_j w_fj * x_j                         + sum_c cat_table[c, f]
+    pd         = mean_f  1 / (1 + exp(a_f * decision_f + b_f))
+
+per calibrated fold f, with a missing x_j replaced by that fold's median (its
+contribution w_fj * median_fj is precomputed) and a missing category by the
+fold's most-frequent level. compile_kernel() does the folding; ScoringKernel
+then scores a raw-field dict directly, with application_features_row standing
+in for add_application_features.
+
+The kernel is exported next to the run's model.joblib in two forms:
+
+- kernel.json, one compact JSON document, for the single-applicant path,
+- model_npy/, a versioned directory of .npy arrays (the folded
+  coefficients, imputer fills, biases, one-hot table and Platt parameters)
+  plus schema.json (feature order, category maps, array shapes). load_dir()
+  memory-maps the arrays, so scoring processes share one copy of them in
+  the page cache instead of each unpickling the sklearn model, and
+  predict_proba() scores a whole frame the way model.predict_proba does.
+
+Both record whether the model was trained with the bureau aggregates
+(RunConfig.bureau_features): such a model's inputs include the
+src.features.bureau columns, which scoring must join onto the raw
+application first (src.score.Scorer does; src.quick_score refuses the model).
+
+Both must agree with model.predict_proba to within 1e-9 (1e-5 for a float32
+design matrix) -- `main()` checks that on the run's held-out test set and
+reports per-applicant latency.
+"""
+
+import json
+import math
+import time
+from dataclasses import dataclass, fields
+from operator import itemgetter
+from pathlib import Path
+
+import numpy as np
+
+from src.features.feature_engineering import application_features_row
+
+KERNEL_FORMAT_VERSION = 1
+ARRAYS_DIR = "model_npy"
+SCHEMA_FILE = "schema.json"
+_ARRAYS = ("weights", "fill", "bias", "cat_table", "calib_a", "calib_b")
+
+
+@dataclass
+class ScoringKernel:
+    numeric_cols: list[str]
+    categorical_cols: list[str]
+    weights: np.ndarray       # (n_folds, n_numeric): coef / scale
+    fill: np.ndarray          # (n_folds, n_numeric): weights * imputer median
+    bias: np.ndarray          # (n_folds,): intercept - sum(weights * scaler mean)
+    cat_maps: list[dict]      # per categorical column: level -> row of cat_table
+    cat_missing: list[int]    # per categorical column: row used when the value is missing
+    cat_table: np.ndarray     # (n_levels + n_categorical, n_folds): one-hot coefficients
+    calib_a: np.ndarray       # (n_folds,) Platt slope (a=-1, b=0 for an uncalibrated model)
+    calib_b: np.ndarray       # (n_folds,) Platt intercept
+    bureau_features: bool = False   # inputs include the joined bureau aggregates
+
+    def __post_init__(self):
+        # Per-call work is dominated by fixed NumPy call overhead, not FLOPs,
+        # so keep the number of array operations per applicant to a handful.
+        self._get_numeric = itemgetter(*self.numeric_cols) if self.numeric_cols else (lambda row: ())
+        self._calib = list(zip(self.calib_a.tolist(), self.calib_b.tolist()))
+
+    def decision(self, raw: dict) -> np.ndarray:
+        """Per-fold logistic decision values for one raw-field dict."""
+        row = {**raw, **application_features_row(raw)}
+
+        x = np.array(self._get_numeric(row), dtype=float)
+        missing = np.isnan(x)
+        x[missing] = 0.0
+
+        rows = []
+        for col, levels, missing_row in zip(self.categorical_cols, self.cat_maps, self.cat_missing):
+            value = row[col]
+            if value is None or value != value:
+                rows.append(missing_row)
+            else:
+                idx = levels.get(value)
+                if idx is not None:   # unseen level: OneHotEncoder(handle_unknown="ignore") -> 0
+                    rows.append(idx)
+
+        return self.bias + self.weights @ x + self.fill @ missing + self.cat_table[rows].sum(axis=0)
+
+    def score(self, raw: dict) -> float:
+        """Calibrated PD for one raw-field dict."""
+        d = self.decision(raw).tolist()
+        return sum(1.0 / (1.0 + math.exp(a * d_f + b)) for d_f, (a, b) in zip(d, self._calib)) / len(d)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        model.predict_proba(X) for a frame of model inputs (raw columns plus
+        add_application_features' engineered ones): an (n, 2) array.
+        """
+        import pandas as pd
+
+        missing = set(self.numeric_cols + self.categorical_cols) - set(X.columns)
+        if missing:     # the error sklearn raises for the same input
+            raise ValueError(f"columns are missing: {missing}")
+        d = np.empty((len(X), len(self.bias)))
+        d[:] = self.bias
+        if self.numeric_cols:
+            x = X[self.numeric_cols].to_numpy(dtype=np.float64)
+            missing = np.isnan(x)
+            x[missing] = 0.0
+            d += x @ self.weights.T
+            d += missing @ self.fill.T
+
+        # The one-hot table plus a zero row for levels no fold saw (handle_unknown="ignore")
+        table = np.vstack([self.cat_table, np.zeros((1, len(self.bias)))])
+        unseen = len(table) - 1
+        for col, levels, missing_row in zip(self.categorical_cols, self.cat_maps, self.cat_missing):
+            values = X[col]
+            codes = pd.Categorical(values, categories=list(levels)).codes
+            level_rows = np.fromiter(levels.values(), dtype=np.intp, count=len(levels))
+            rows = np.where(codes >= 0, level_rows[codes], unseen)
+            rows[pd.isna(values).to_numpy()] = missing_row
+            d += table[rows]
+
+        p = (1.0 / (1.0 + np.exp(d * self.calib_a + self.calib_b))).mean(axis=1)
+        return np.column_stack([1.0 - p, p])
+
+    def save_dir(self, path: Path) -> None:
+        """
+        Write the kernel as a directory of .npy arrays plus schema.json. The
+        schema is written last, so a directory without one is incomplete.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        (path / SCHEMA_FILE).unlink(missing_ok=True)
+        arrays = {}
+        for name in _ARRAYS:
+            value = np.ascontiguousarray(getattr(self, name), dtype=np.float64)
+            np.save(path / f"{name}.npy", value)
+            arrays[name] = {"shape": list(value.shape), "dtype": str(value.dtype)}
+        schema = {
+            "format_version": KERNEL_FORMAT_VERSION,
+            "numeric_cols": self.numeric_cols,
+            "categorical_cols": self.categorical_cols,
+            "cat_maps": self.cat_maps,
+            "cat_missing": self.cat_missing,
+            "bureau_features": self.bureau_features,
+            "arrays": arrays,
+        }
+        with open(path / SCHEMA_FILE, "w") as f:
+            json.dump(schema, f, indent=1)
+
+    @classmethod
+    def load_dir(cls, path: Path, mmap: bool = True) -> "ScoringKernel":
+        """Load a save_dir() artifact, memory-mapping its arrays unless mmap=False."""
+        path = Path(path)
+        with open(path / SCHEMA_FILE) as f:
+            schema = json.load(f)
+        version = schema["format_version"]
+        if version != KERNEL_FORMAT_VERSION:
+            raise ValueError(f"kernel format {version} not supported (expected {KERNEL_FORMAT_VERSION})")
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None) for name in _ARRAYS}
+        for name, spec in schema["arrays"].items():
+            if list(arrays[name].shape) != spec["shape"]:
+                raise ValueError(f"{path / name}.npy has shape {arrays[name].shape}, schema says {spec['shape']}")
+        return cls(
+            numeric_cols=schema["numeric_cols"],
+            categorical_cols=schema["categorical_cols"],
+            cat_maps=schema["cat_maps"],
+            cat_missing=schema["cat_missing"],
+            bureau_features=schema.get("bureau_features", False),
+            **arrays,
+        )
+
+    def save(self, path: Path) -> None:
+        """Write the kernel as a single compact JSON document (no pickle, no sklearn)."""
+        record = {"format_version": KERNEL_FORMAT_VERSION}
+        for key, value in ((f.name, getattr(self, f.name)) for f in fields(self)):
+            record[key] = value.tolist() if isinstance(value, np.ndarray) else value
+        with open(path, "w") as f:
+            json.dump(record, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: Path) -> "ScoringKernel":
+        with open(path) as f:
+            record = json.load(f)
+        version = record.pop("format_version")
+        if version != KERNEL_FORMAT_VERSION:
+            raise ValueError(f"kernel format {version} not supported (expected {KERNEL_FORMAT_VERSION})")
+        arrays = {"weights", "fill", "bias", "cat_table", "calib_a", "calib_b"}
+        return cls(**{k: np.asarray(v, dtype=float) if k in arrays else v for k, v in record.items()})
+
+
+def _fold_pairs(model) -> list[tuple]:
+    """
+    (fitted Pipeline, a, b) per averaged member of the model: every
+    calibrated fold of a CalibratedClassifierCV, or the bare Pipeline itself
+    with an identity sigmoid (a=-1, b=0 gives expit(decision)).
+    """
+    if hasattr(model, "calibrated_classifiers_"):
+        pairs = []
+        for cc in model.calibrated_classifiers_:
+            if cc.method != "sigmoid":
+                raise ValueError(f"only sigmoid (Platt) calibration compiles to a kernel, got {cc.method!r}")
+            (calibrator,) = cc.calibrators
+            pairs.append((cc.estimator, float(calibrator.a_), float(calibrator.b_)))
+        return pairs
+    return [(model, -1.0, 0.0)]
+
+
+def compile_kernel(model, bureau_features: bool = False) -> ScoringKernel:
+    """
+    Fold a fitted Pipeline(preprocessor -> LogisticRegression), optionally
+    wrapped in a sigmoid CalibratedClassifierCV, into a ScoringKernel.
+    `bureau_features` is the training run's RunConfig.bureau_features.
+    """
+    pairs = _fold_pairs(model)
+    n_folds = len(pairs)
+
+    pre0 = pairs[0][0].named_steps["preprocessor"]
+    cols = {name: list(c) for name, _, c in pre0.transformers_ if name in ("num", "cat")}
+    numeric_cols, categorical_cols = cols.get("num", []), cols.get("cat", [])
+
+    weights = np.zeros((n_folds, len(numeric_cols)))
+    fill = np.zeros_like(weights)
+    bias = np.zeros(n_folds)
+
+    # Level -> cat_table row, shared across folds; a fold that never saw a
+    # level simply has a 0 coefficient for it (handle_unknown="ignore").
+    cat_maps = [{} for _ in categorical_cols]
+    for pipe, _, _ in pairs:
+        onehot = pipe.named_steps["preprocessor"].named_transformers_["cat"].named_steps["onehot"]
+        for levels, cats in zip(cat_maps, onehot.categories_):
+            for level in cats:
+                levels.setdefault(level.item() if hasattr(level, "item") else level, len(levels))
+    offsets = np.cumsum([0] + [len(m) for m in cat_maps])
+    for levels, offset in zip(cat_maps, offsets):
+        for level in levels:
+            levels[level] += int(offset)
+    n_levels = int(offsets[-1])
+    cat_missing = [n_levels + i for i in range(len(categorical_cols))]
+    cat_table = np.zeros((n_levels + len(categorical_cols), n_folds))
+
+    for f, (pipe, _, _) in enumerate(pairs):
+        pre = pipe.named_steps["preprocessor"]
+        lr = pipe.named_steps["model"]
+        coef = lr.coef_.ravel()
+
+        if numeric_cols:
+            num = pre.named_transformers_["num"]
+            median = num.named_steps["imputer"].statistics_
+            scaler = num.named_steps["scaler"]
+            w = coef[pre.output_indices_["num"]] / scaler.scale_
+            weights[f] = w
+            fill[f] = w * median
+            # matrix_mode="sparse" scales without centering (with_mean=False).
+            bias[f] = lr.intercept_[0] - (np.dot(w, scaler.mean_) if scaler.with_mean else 0.0)
+        else:
+            bias[f] = lr.intercept_[0]
+
+        if categorical_cols:
+            cat = pre.named_transformers_["cat"]
+            mode = cat.named_steps["imputer"].statistics_
+            onehot = cat.named_steps["onehot"]
+            cat_coef = coef[pre.output_indices_["cat"]]
+            start = 0
+            for i, (levels, cats) in enumerate(zip(cat_maps, onehot.categories_)):
+                fold_coef = dict(zip(cats.tolist(), cat_coef[start:start + len(cats)]))
+                start += len(cats)
+                for level, coef_ in fold_coef.items():
+                    cat_table[levels[level], f] = coef_
+                cat_table[cat_missing[i], f] = fold_coef.get(mode[i], 0.0)
+
+    return ScoringKernel(
+        numeric_cols=numeric_cols,
+        categorical_cols=categorical_cols,
+        weights=weights,
+        fill=fill,
+        bias=bias,
+        cat_maps=cat_maps,
+        cat_missing=cat_missing,
+        cat_table=cat_table,
+        calib_a=np.array([a for _, a, _ in pairs]),
+        calib_b=np.array([b for _, _, b in pairs]),
+        bureau_features=bureau_features,
+    )
+
+
+def export_kernel(model, run_dir: Path, bureau_features: bool = False) -> bool:
+    """
+    Write kernel.json and model_npy/ for a fitted model into run_dir. Returns
+    False (writing nothing) for a model that does not compile, e.g. isotonic
+    calibration.
+    """
+    try:
+        kernel = compile_kernel(model, bureau_features)
+    except ValueError:
+        return False
+    kernel.save(Path(run_dir) / "kernel.json")
+    kernel.save_dir(Path(run_dir) / ARRAYS_DIR)
+    return True
+
+
+def main() -> None:
+    """
+    Compile reports/<run_id>/model.joblib to kernel.json and model_npy/, then
+    check both against model.predict_proba on that run's held-out test set
+    and report per-applicant latency.
+    """
+    import argparse
+
+    import joblib
+
+    from config import RunConfig
+    from src.features.feature_engineering import add_application_features
+    from src.models.pipeline import load_data, make_splits
+
+    parser = argparse.ArgumentParser(description="Compile a run's model into a scoring kernel.")
+    parser.add_argument("run_dir", type=Path)
+    parser.add_argument("--latency-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    ROOT = Path(__file__).resolve().parents[2]  # repo root (src/models/ -> ..)
+    with open(args.run_dir / "run.json") as f:
+        cfg = RunConfig(**json.load(f)["config"])
+    model = joblib.load(args.run_dir / "model.joblib")
+    kernel = compile_kernel(model, cfg.bureau_features)
+    kernel.save(args.run_dir / "kernel.json")
+    kernel.save_dir(args.run_dir / ARRAYS_DIR)
+    kernel = ScoringKernel.load(args.run_dir / "kernel.json")
+    print(f"Compiled {len(kernel.bias)} fold(s) -> {args.run_dir / 'kernel.json'}, {args.run_dir / ARRAYS_DIR}")
+    raw = load_data(ROOT / "data" / "raw" / "application_train.csv")
+    if cfg.bureau_features:
+        from src.features.bureau import bureau_features, join_bureau_features
+
+        raw = join_bureau_features(raw, bureau_features())
+    _, X_test, _, _ = make_splits(add_application_features(raw), cfg)
+    records = raw.loc[X_test.index].to_dict(orient="records")
+
+    expected = model.predict_proba(X_test)[:, 1]
+    got = np.array([kernel.score(r) for r in records])
+    max_err = float(np.max(np.abs(got - expected)))
+    # A dense32 model scores float32 features; the kernel folds in float64.
+    tol = 1e-5 if cfg.matrix_mode == "dense32" else 1e-9
+    assert max_err < tol, f"kernel disagrees with predict_proba: max |diff| = {max_err:.3e}"
+    print(f"Held-out agreement: {len(got):,} rows, max |diff| = {max_err:.2e}")
+
+    batch = ScoringKernel.load_dir(args.run_dir / ARRAYS_DIR).predict_proba(X_test)[:, 1]
+    batch_err = float(np.max(np.abs(batch - expected)))
+    assert batch_err < tol, f"{ARRAYS_DIR} predict_proba disagrees: max |diff| = {batch_err:.3e}"
+    print(f"{ARRAYS_DIR}/ predict_proba agreement: max |diff| = {batch_err:.2e}")
+
+    timings = np.empty(min(args.latency_rows, len(records)))
+    for i in range(len(timings)):
+        t0 = time.perf_counter()
+        kernel.score(records[i])
+        timings[i] = time.perf_counter() - t0
+    p50, p99 = np.percentile(timings, [50, 99]) * 1e6
+    print(f"Latency per applicant: p50 {p50:.1f} us | p99 {p99:.1f} us ({len(timings):,} calls)")
+
+
+if __name__ == "__main__":
+    main()
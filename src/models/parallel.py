@@ -0,0 +1,152 @@
+"""
+Process-parallel CV and calibration folds (RunConfig.n_jobs / parallel_backend).
+
+cross_validate and CalibratedClassifierCV both dispatch their k fold fits
+through joblib; fold_parallelism(cfg) sets the backend and worker count for
+everything inside it. With a process backend ("loky", "multiprocessing")
+any array in the fold arguments larger than `parallel_max_nbytes` -- the
+numeric blocks of X_train -- is dumped once per call and memory-mapped
+read-only in every worker rather than pickled to each one.
+
+Folds are fixed by cv_splitter's random_state and LogisticRegression(lbfgs)
+is deterministic, so fold results do not depend on which worker ran them or
+in what order; joblib returns them in split order.
+
+TimedFit wraps the pipeline for the duration of a fit so each fold reports
+its wall time, lbfgs iterations, worker pid and fold-cache activity back to
+the parent (the fitted estimator is the only thing a worker returns). It can
+also warm-start the final LogisticRegression of a fold from coefficients
+keyed by fold_key -- src.sweep uses that along a C path. unwrap_timed()
+strips it again, leaving the same fitted objects an unwrapped fit would
+produce.
+"""
+
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+from joblib import effective_n_jobs, parallel_config
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.calibration import CalibratedClassifierCV
+
+from config import RunConfig
+from src.models.fold_cache import FoldCache
+
+
+@contextmanager
+def fold_parallelism(cfg: RunConfig):
+    """joblib context for the fold fits of a run: backend, workers, memmapping."""
+    with parallel_config(
+        backend=cfg.parallel_backend,
+        n_jobs=cfg.n_jobs,
+        max_nbytes=cfg.parallel_max_nbytes,
+        mmap_mode="r",
+    ):
+        yield
+
+
+def n_workers(cfg: RunConfig, n_tasks: int) -> int:
+    """Workers actually used for `n_tasks` fold fits under this config."""
+    return min(effective_n_jobs(cfg.n_jobs), n_tasks)
+
+
+def fold_key(X) -> Optional[str]:
+    """Fingerprint of a fold's training rows (its index), or None for bare arrays."""
+    index = getattr(X, "index", None)
+    if index is None:
+        return None
+    return hashlib.blake2b(np.ascontiguousarray(index.to_numpy()).tobytes(), digest_size=8).hexdigest()
+
+
+class TimedFit(ClassifierMixin, BaseEstimator):
+    """
+    Fit a clone of `estimator`, recording fit_s_, n_iter_, pid_, key_ (the
+    fold_key) and cache_ (the fold-cache counters this fit moved).
+    Predictions delegate to the clone.
+
+    `init` maps fold_key -> (coef, intercept): when this fold's key is in it,
+    the final step (a LogisticRegression) starts from those coefficients
+    instead of zeros. The fitted step is left with warm_start=False.
+    """
+
+    def __init__(self, estimator, init: Optional[dict] = None):
+        self.estimator = estimator
+        self.init = init
+
+    def fit(self, X, y, **fit_params):
+        cache = getattr(self.estimator, "memory", None)
+        before = cache.counters() if isinstance(cache, FoldCache) else None
+
+        est = clone(self.estimator)
+        final = est[-1] if hasattr(est, "steps") else est
+        self.key_ = fold_key(X)
+        warm = bool(self.init) and self.key_ in self.init
+        if warm:
+            coef, intercept = self.init[self.key_]
+            final.set_params(warm_start=True)
+            final.coef_, final.intercept_ = np.array(coef), np.array(intercept)
+
+        t0 = time.perf_counter()
+        self.estimator_ = est.fit(X, y, **fit_params)
+        self.fit_s_ = time.perf_counter() - t0
+        if warm:
+            final.set_params(warm_start=False)
+
+        n_iter = getattr(final, "n_iter_", None)
+        self.n_iter_ = None if n_iter is None else int(np.max(n_iter))
+        self.warm_ = warm
+        self.pid_ = os.getpid()
+        self.cache_ = None if before is None else {
+            k: v - before[k] for k, v in cache.counters().items()
+        }
+        self.classes_ = self.estimator_.classes_
+        return self
+
+    def decision_function(self, X):
+        return self.estimator_.decision_function(X)
+
+    def predict_proba(self, X):
+        return self.estimator_.predict_proba(X)
+
+    def predict(self, X):
+        return self.estimator_.predict(X)
+
+    def record(self) -> dict:
+        return {"fit_s": self.fit_s_, "n_iter": self.n_iter_, "warm": self.warm_, "pid": self.pid_, "key": self.key_}
+
+
+def collect(timed: list[TimedFit], cache: Optional[FoldCache] = None) -> list[dict]:
+    """
+    One TimedFit.record() per fitted TimedFit. Fits in this process
+    already counted themselves on `cache`; fits in worker processes counted
+    on a pickled copy, so their deltas are added to `cache` here.
+    """
+    for t in timed:
+        if cache is not None and t.pid_ != os.getpid() and t.cache_:
+            cache.absorb(t.cache_)
+    return [t.record() for t in timed]
+
+
+def unwrap_timed(model, cache: Optional[FoldCache] = None) -> tuple:
+    """
+    Replace every TimedFit inside a fitted model by the estimator it fitted.
+    Returns (model, collect() records in fold order).
+
+    For an ensemble CalibratedClassifierCV each record is one fold; with
+    ensemble=False the folds run inside cross_val_predict and only the final
+    refit is visible.
+    """
+    if isinstance(model, TimedFit):
+        return model.estimator_, collect([model], cache)
+
+    if isinstance(model, CalibratedClassifierCV):
+        timed = [cc.estimator for cc in model.calibrated_classifiers_]
+        for cc, t in zip(model.calibrated_classifiers_, timed):
+            cc.estimator = t.estimator_
+        model.estimator = model.estimator.estimator
+        return model, collect(timed, cache)
+
+    return model, []
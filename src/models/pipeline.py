@@ -6,50 +6,127 @@ A single-responsibility decomposition of what used to be one
 order: load_data -> make_splits -> build_pipeline -> train -> persist.
 """
 
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Union
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.base import BaseEstimator
 from sklearn.pipeline import Pipeline
 from sklearn.calibration import CalibratedClassifierCV
+from sklearn.model_selection import StratifiedKFold
 
 from config import RunConfig
+from src.data.columnar import read_csv_cached, open_cache
+from src.features.bureau import BUREAU_COLUMNS
+from src.features.feature_engineering import FEATURE_SOURCES
 from src.features.preprocessing import (
     split_X_y,
     train_val_split,
     build_preprocessor,
 )
 from src.models.baseline import build_baseline_model
+from src.models.fold_cache import detach
+from src.models.parallel import TimedFit, fold_parallelism, unwrap_timed
 
+CV_SPLITS = 5
+CV_SEED = 42
 
-def load_data(path: Path) -> pd.DataFrame:
-    """Read the raw application CSV into a DataFrame."""
-    return pd.read_csv(path)
 
+def load_data(
+    path: Union[Path, str],
+    columns: Optional[List[str]] = None,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Read the raw application CSV into a DataFrame -- only `columns` if given.
 
-def make_splits(
+    By default this goes through the columnar cache (src.data.columnar): the
+    first read parses the CSV once and stores narrowed, typed columns; later
+    reads load just the requested columns. use_cache=False is a plain read_csv.
+    """
+    if not use_cache:
+        return pd.read_csv(path, usecols=columns)
+    return read_csv_cached(Path(path), columns)
+
+
+def data_columns(path: Union[Path, str]) -> List[str]:
+    """Column names of the raw CSV, in file order (from the cache manifest)."""
+    return open_cache(Path(path)).columns
+
+
+def required_columns(
+    available: List[str],
+    cfg: RunConfig,
+    target_col: str = "TARGET",
+) -> List[str]:
+    """
+    The raw columns a run with this config actually needs, in file order.
+
+    keep_cols (if set) plus the raw sources of any engineered feature in it;
+    otherwise everything except drop_cols -- but a dropped column is still
+    read when a kept engineered feature is derived from it (DAYS_BIRTH ->
+    YEARS_BIRTH). The target is always included.
+    """
+    if cfg.keep_cols:
+        wanted = set(cfg.keep_cols)
+    else:
+        wanted = (set(available) | set(FEATURE_SOURCES)) - set(cfg.drop_cols)
+
+    needed = {target_col}
+    for col in wanted:
+        needed.update(FEATURE_SOURCES.get(col, [col]))
+
+    return [c for c in available if c in needed]
+
+
+def select_features(
     df: pd.DataFrame,
     cfg: RunConfig,
-) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+) -> Tuple[pd.DataFrame, pd.Series]:
     """
-    Split features/target, apply the config's column selection, and make one
-    stratified train/test split. The test set is held out for a single, final
-    evaluation -- it must not inform any modelling decision.
+    Split features/target and apply the config's column selection (drop_cols /
+    keep_cols; joined bureau aggregates only with bureau_features).
     """
     X, y = split_X_y(df)
 
+    if not cfg.bureau_features:
+        X = X.drop(columns=[c for c in BUREAU_COLUMNS if c in X.columns])
+
     if cfg.drop_cols:
         X = X.drop(columns=cfg.drop_cols)
     if cfg.keep_cols:
         X = X[cfg.keep_cols]
 
+    return X, y
+
+
+def make_splits(
+    df: pd.DataFrame,
+    cfg: RunConfig,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+    """
+    Split features/target, apply the config's column selection, and make one
+    stratified train/test split. The test set is held out for a single, final
+    evaluation -- it must not inform any modelling decision.
+    """
+    X, y = select_features(df, cfg)
+
     X_train, X_test, y_train, y_test = train_val_split(X, y)
 
     return X_train, X_test, y_train, y_test
 
 
+def cv_splitter(n_splits: int = CV_SPLITS, random_state: int = CV_SEED) -> StratifiedKFold:
+    """
+    The shuffled stratified k-fold used by both run_cv and calibration. Using
+    one splitter for both means their training folds are identical, so each
+    fold's preprocessing is fitted once and reused from the fold cache.
+    """
+    return StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+
+
 def build_pipeline(
     numeric_cols: List[str],
     categorical_cols: List[str],
@@ -60,7 +137,7 @@ def build_pipeline(
     regression. Calibration is not applied here -- that happens in train(), so
     this bare pipeline can also be cross-validated cheaply.
     """
-    preprocessor = build_preprocessor(numeric_cols, categorical_cols)
+    preprocessor = build_preprocessor(numeric_cols, categorical_cols, cfg.matrix_mode)
     model = build_baseline_model(preprocessor, cfg)
     return model
 
@@ -75,18 +152,105 @@ def train(
     Fit the estimator on the training data and return it fitted.
 
     If the config requests Platt calibration, the whole pipeline is wrapped in
-    CalibratedClassifierCV(cv=5) first -- so the sigmoid is fit on held-out
-    folds of the training set (never on the reported test set), and the
-    returned object is a CalibratedClassifierCV rather than a bare Pipeline.
+    CalibratedClassifierCV over the run_cv folds (cv_splitter) first -- so the
+    sigmoid is fit on held-out folds of the training set (never on the
+    reported test set), and the returned object is a CalibratedClassifierCV
+    rather than a bare Pipeline.
+
+    cfg.calibration_ensemble picks the CalibratedClassifierCV mode:
+    - True: five (pipeline, sigmoid) pairs, one per fold, averaged at predict
+      time -- five preprocessor + LR passes per prediction.
+    - False: one pipeline refit on the full training set plus one sigmoid fit
+      on its out-of-fold decision values -- a single pass per prediction and
+      one ColumnTransformer in the persisted artifact.
+
+    `estimator` itself is left unfitted; the returned model is fitted on a
+    clone and no longer references the fold cache.
+    """
+    return train_timed(estimator, X_train, y_train, cfg)[0]
+
+
+def train_timed(
+    estimator: Pipeline,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    cfg: RunConfig,
+    warm_start: Optional[dict] = None,
+) -> Tuple[BaseEstimator, List[dict]]:
+    """
+    train(), also returning one TimedFit record (fit_s, n_iter, pid, fold
+    key) per pipeline fit -- per calibration fold for the ensemble. Folds run
+    in parallel under cfg.n_jobs / cfg.parallel_backend. `warm_start` maps
+    fold keys to initial LR coefficients (see warm_start_from).
     """
-    model = estimator
+    model = TimedFit(estimator, init=warm_start)
 
     if cfg.calibration == "platt":
-        model = CalibratedClassifierCV(estimator, method='sigmoid', cv=5)
+        model = CalibratedClassifierCV(
+            model, method='sigmoid', cv=cv_splitter(), ensemble=cfg.calibration_ensemble,
+        )
 
-    model.fit(X_train, y_train)
+    with fold_parallelism(cfg):
+        model.fit(X_train, y_train)
+    model, fits = unwrap_timed(model, getattr(estimator, "memory", None))
+    detach(model)
 
-    return model
+    return model, fits
+
+
+def warm_start_from(model: BaseEstimator, fits: List[dict]) -> dict:
+    """
+    fold key -> (coef, intercept) of each fitted fold pipeline in a
+    train_timed result, to warm-start the same folds of a nearby config.
+    """
+    if isinstance(model, CalibratedClassifierCV):
+        pipelines = [cc.estimator for cc in model.calibrated_classifiers_]
+    else:
+        pipelines = [model]
+    return {
+        f["key"]: (p[-1].coef_.copy(), p[-1].intercept_.copy())
+        for f, p in zip(fits, pipelines) if f["key"] is not None
+    }
+
+
+def out_of_fold_predictions(
+    model: CalibratedClassifierCV,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+) -> pd.DataFrame:
+    """
+    Score every training row with the calibrated fold that held it out.
+
+    Only for a CalibratedClassifierCV trained by train() with
+    calibration_ensemble=True: its k (pipeline, sigmoid) pairs were fit on
+    the folds of model.cv in split order, so re-splitting recovers which rows
+    each pair never saw in fitting. Returns one row per training row (same index):
+    fold, y_true, score (the pipeline's decision value, the quantity run_cv
+    ranks by) and pd (that pair's calibrated probability -- its sigmoid was fit
+    on these same rows, so pd is in-sample for the calibrator).
+    """
+    if not (isinstance(model, CalibratedClassifierCV) and model.ensemble):
+        raise ValueError("out-of-fold predictions need a CalibratedClassifierCV with ensemble=True")
+
+    folds = list(model.cv.split(X_train, y_train))
+    if len(folds) != len(model.calibrated_classifiers_):
+        raise ValueError(
+            f"model has {len(model.calibrated_classifiers_)} calibrated folds, its cv yields {len(folds)}"
+        )
+
+    fold = np.empty(len(X_train), dtype=np.int8)
+    score = np.empty(len(X_train))
+    pd_ = np.empty(len(X_train))
+    for i, ((_, test_idx), cc) in enumerate(zip(folds, model.calibrated_classifiers_)):
+        X_fold = X_train.iloc[test_idx]
+        fold[test_idx] = i
+        score[test_idx] = cc.estimator.decision_function(X_fold)
+        pd_[test_idx] = cc.predict_proba(X_fold)[:, 1]
+
+    return pd.DataFrame(
+        {"fold": fold, "y_true": np.asarray(y_train), "score": score, "pd": pd_},
+        index=X_train.index,
+    )
 
 
 def persist(
@@ -0,0 +1,378 @@
+# python -m src.profiling diff reports/<run_a> reports/<run_b> [--top 20] [--sort tottime | cumtime]
+
+"""
+Per-stage wall time, CPU time and peak memory of a run; opt-in profiles.
+
+A run used to report one "Script executed in N seconds" total, which cannot
+say whether a slow run was CSV loading, CV, the calibration fits or
+plotting. StageTimer wraps each step, as a context manager or a decorator:
+
+    timer = StageTimer()
+    with timer.stage("load_data"):
+        df = load_data(path)
+
+    @timer.timed("tables")
+    def write_tables(): ...
+
+and records, per stage:
+
+    wall_s        perf_counter time
+    cpu_s         CPU time of this process (user + system). Fold fits in
+                  joblib worker processes are not included -- their own
+                  fit_s / pid are in metrics.timing.fits
+    peak_rss_mb   the stage's peak resident set size. On Linux the process
+                  high-water mark (VmHWM) is reset as the stage starts, so
+                  this is the stage's own peak; elsewhere it is the peak of
+                  the process so far ("peak_rss_scope": "process")
+    rss_mb        resident set size when the stage ended
+    peak_traced_mb  (trace_memory=True only) peak Python-heap allocation
+                  traced by tracemalloc -- more precise than RSS, but it
+                  slows allocation-heavy code, so it is off by default
+
+record() is what run_evaluation stores as metrics["timing"]["stages"]; the
+tracking view reads it back per run and per git SHA (`python -m
+src.tracking --timing`). Stages do not nest, and a stage name used twice
+accumulates (times add, peaks take the max).
+
+When a stage is slow, a profile says which functions inside it are
+(OneHotEncoder.transform vs SimpleImputer vs qcut). Profiler wraps a whole
+run in one of two modes (RunConfig.profile / --profile):
+
+    "sample"    a daemon thread samples the main thread's Python stack every
+                SAMPLE_INTERVAL_S. Each sample is weighted by the time since
+                the previous one, so a C call that holds the GIL (and delays
+                the sampler) still gets its full duration. Low overhead.
+    "cprofile"  cProfile, deterministic: exact call counts, but every Python
+                call pays for it, so pure-Python code looks relatively slower.
+                The sampler runs alongside for the stack file.
+
+save() writes two files into the run directory: <name>.pstats (cProfile's,
+or one built from the samples -- ncalls then counts samples; it loads with
+pstats / snakeviz either way) and <name>.collapsed, one
+"outer;...;inner <microseconds>" line per distinct stack, the input of
+flamegraph.pl and speedscope. Only the main process is profiled: fold fits
+in joblib worker processes appear as the time spent waiting for them.
+
+`python -m src.profiling diff <run_a> <run_b>` lines up the top functions of
+two runs' profiles by self (or cumulative) time, largest change first.
+"""
+
+import cProfile
+import pstats
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Union
+
+PROFILE_MODES = ("", "sample", "cprofile")
+SAMPLE_INTERVAL_S = 0.01     # 100 Hz: ~1,300 samples over one 13 s LR fit, a few % overhead
+_STATUS = "/proc/self/status"
+_CLEAR_REFS = "/proc/self/clear_refs"
+
+
+def _status_mb(field: str) -> Optional[float]:
+    """A /proc/self/status memory field (VmRSS, VmHWM, ...) in MB, or None off Linux."""
+    try:
+        with open(_STATUS) as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the process's VmHWM to its current RSS (Linux >= 4.0); False if unsupported."""
+    try:
+        with open(_CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS since the last reset (VmHWM), else the process's lifetime peak."""
+    hwm = _status_mb("VmHWM")
+    if hwm is not None:
+        return hwm
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024   # bytes on macOS, KB elsewhere
+
+
+def rss_mb() -> Optional[float]:
+    return _status_mb("VmRSS")
+
+
+class StageTimer:
+    """Wall / CPU time and peak memory of named, sequential pipeline stages."""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: dict[str, dict] = {}
+        self.peak_scope = "stage"
+        self._active: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if self._active is not None:
+            raise RuntimeError(f"stage {name!r} started inside stage {self._active!r}; stages do not nest")
+        self._active = name
+        if not _reset_peak_rss():
+            self.peak_scope = "process"
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stats = {
+                "wall_s": time.perf_counter() - t0,
+                "cpu_s": time.process_time() - c0,
+                "peak_rss_mb": peak_rss_mb(),
+                "rss_mb": rss_mb(),
+            }
+            if self.trace_memory:
+                stats["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            self._add(name, stats)
+            self._active = None
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorator form of stage(); the stage is named after the function by default."""
+        def decorate(fn: Callable) -> Callable:
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or fn.__name__):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _add(self, name: str, stats: dict) -> None:
+        prev = self.stages.get(name)
+        if prev is not None:
+            for key in ("wall_s", "cpu_s"):
+                stats[key] += prev[key]
+            for key in ("peak_rss_mb", "peak_traced_mb"):
+                if key in prev:
+                    stats[key] = max(stats[key], prev[key])
+        self.stages[name] = stats
+
+    def wall_s(self, name: str) -> float:
+        """A recorded stage's wall time (0.0 if it never ran)."""
+        return self.stages[name]["wall_s"] if name in self.stages else 0.0
+
+    def record(self) -> dict:
+        """The stages plus totals, as stored in run.json under metrics.timing.stages."""
+        return {
+            **self.stages,
+            "total": {
+                "wall_s": sum(s["wall_s"] for s in self.stages.values()),
+                "cpu_s": sum(s["cpu_s"] for s in self.stages.values()),
+                "peak_rss_mb": max((s["peak_rss_mb"] for s in self.stages.values()), default=None),
+                "peak_rss_scope": self.peak_scope,
+            },
+        }
+
+    def summary(self) -> str:
+        """One line: each stage's wall time, then the overall peak RSS."""
+        parts = [f"{name} {s['wall_s']:.1f}s" for name, s in self.stages.items()]
+        peak = max((s["peak_rss_mb"] for s in self.stages.values()), default=0.0)
+        return " | ".join(parts) + f" | peak RSS {peak:,.0f} MB"
+
+
+# -- profiles ----------------------------------------------------------------
+def _short_path(filename: str) -> str:
+    """A code file relative to site-packages / the stdlib / this repo, so profiles compare across machines."""
+    for marker in ("site-packages/", "dist-packages/", f"python{sys.version_info[0]}.{sys.version_info[1]}/"):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    root = str(Path(__file__).resolve().parent.parent) + "/"
+    return filename[len(root):] if filename.startswith(root) else filename
+
+
+def _key(code) -> tuple:
+    """pstats' (file, line, function) key of a code object, named as cProfile names it."""
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a daemon
+    thread; stacks maps each distinct stack (outermost code first) to the
+    seconds attributed to it, samples to how many times it was seen.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_S, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stacks: Counter = Counter()
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            weight, last = now - last, now
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                stack = tuple(reversed(stack))
+                self.stacks[stack] += weight
+                self.samples[stack] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, weights in microseconds."""
+        merged = Counter()
+        for stack, seconds in self.stacks.items():
+            labels = (f"{c.co_qualname} ({_short_path(c.co_filename)}:{c.co_firstlineno})" for c in stack)
+            merged[";".join(label.replace(";", ":") for label in labels)] += seconds
+        return "".join(f"{stack} {round(1e6 * s)}\n" for stack, s in merged.most_common() if s >= 1e-6)
+
+    def create_stats(self) -> None:
+        """
+        Fill self.stats in cProfile's layout -- {func: (samples, samples,
+        self s, cumulative s, {caller: (...)})} -- so pstats.Stats(sampler)
+        loads it.
+        """
+        stats: dict = {}
+
+        def entry(func):
+            return stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+
+        for stack, seconds in self.stacks.items():
+            n = self.samples[stack]
+            keys = [_key(c) for c in stack]
+            entry(keys[-1])[2] += seconds
+            for func in set(keys):      # recursion counts once toward cumulative time
+                e = entry(func)
+                e[0] += n
+                e[1] += n
+                e[3] += seconds
+            for caller, callee in set(zip(keys, keys[1:])):
+                calls, _, tt, ct = entry(callee)[4].get(caller, (0, 0, 0.0, 0.0))
+                entry(callee)[4][caller] = (calls + n, calls + n, tt, ct + seconds)
+        self.stats = {func: tuple(e) for func, e in stats.items()}
+
+
+class Profiler:
+    """
+    Profile the enclosed block in `mode` ("sample" or "cprofile"; "" makes it
+    a no-op), then save() it into a run directory.
+    """
+
+    def __init__(self, mode: str, interval: float = SAMPLE_INTERVAL_S):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"profile must be one of {PROFILE_MODES}, got {mode!r}")
+        self.mode = mode
+        self.sampler = StackSampler(interval) if mode else None
+        self.cprofile = cProfile.Profile() if mode == "cprofile" else None
+
+    def __enter__(self) -> "Profiler":
+        if self.sampler is not None:
+            self.sampler.start()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if self.sampler is not None:
+            self.sampler.stop()
+        return False
+
+    def save(self, out_dir: Path, name: str = "profile") -> list[Path]:
+        """Write <name>.pstats and <name>.collapsed into out_dir; nothing if profiling was off."""
+        if not self.mode:
+            return []
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stats_path, stacks_path = out_dir / f"{name}.pstats", out_dir / f"{name}.collapsed"
+        pstats.Stats(self.cprofile or self.sampler).dump_stats(stats_path)
+        stacks_path.write_text(self.sampler.collapsed())
+        return [stats_path, stacks_path]
+
+
+def load_profile(path: Union[Path, str], name: str = "profile") -> pstats.Stats:
+    """A saved profile: a .pstats file, or a run directory containing <name>.pstats."""
+    path = Path(path)
+    if path.is_dir():
+        path = path / f"{name}.pstats"
+    if not path.exists():
+        raise FileNotFoundError(f"{path} not found; profile a run with RunConfig.profile / --profile")
+    return pstats.Stats(str(path))
+
+
+def hot_functions(stats: pstats.Stats) -> dict:
+    """function label -> (self s, cumulative s), labelled as in the collapsed stacks."""
+    out = {}
+    for (filename, line, func), (_, _, tt, ct, _) in stats.stats.items():
+        label = f"{func} ({_short_path(filename)}:{line})" if line else func   # builtins: ('~', 0, name)
+        prev = out.get(label, (0.0, 0.0))
+        out[label] = (prev[0] + tt, prev[1] + ct)
+    return out
+
+
+def diff_profiles(a: pstats.Stats, b: pstats.Stats, top: int = 20, sort: str = "tottime") -> list[tuple]:
+    """
+    (function, seconds in a, seconds in b) for the union of each profile's
+    `top` functions by `sort` ("tottime": self time, "cumtime": cumulative),
+    largest absolute change first.
+    """
+    col = {"tottime": 0, "cumtime": 1}[sort]
+    hot_a, hot_b = hot_functions(a), hot_functions(b)
+    funcs = set()
+    for hot in (hot_a, hot_b):
+        funcs.update(sorted(hot, key=lambda f: hot[f][col], reverse=True)[:top])
+    rows = [(f, hot_a.get(f, (0.0, 0.0))[col], hot_b.get(f, (0.0, 0.0))[col]) for f in funcs]
+    return sorted(rows, key=lambda r: abs(r[2] - r[1]), reverse=True)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the hot functions of two runs' saved profiles.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    diff = sub.add_parser("diff", help="top functions of two profiles side by side")
+    diff.add_argument("a", type=Path, help="run directory (or .pstats file) -- the baseline")
+    diff.add_argument("b", type=Path, help="run directory (or .pstats file) -- the candidate")
+    diff.add_argument("--top", type=int, default=20, help="top functions taken from each profile")
+    diff.add_argument("--sort", choices=("tottime", "cumtime"), default="tottime")
+    diff.add_argument("--name", default="profile", help="profile file name in a run directory (score: 'score')")
+    args = parser.parse_args()
+
+    a, b = load_profile(args.a, args.name), load_profile(args.b, args.name)
+    print(f"{args.sort} (s): a = {args.a} ({a.total_tt:.1f}s total), b = {args.b} ({b.total_tt:.1f}s total)")
+    width = 90
+    print(f"{'function':<{width}}{'a':>9}{'b':>9}{'b - a':>9}{'b / a':>8}")
+    for func, sa, sb in diff_profiles(a, b, args.top, args.sort):
+        ratio = f"{sb / sa:>8.2f}" if sa > 0 else f"{'new':>8}"
+        name = func if len(func) <= width - 2 else "..." + func[-(width - 5):]
+        print(f"{name:<{width}}{sa:>9.2f}{sb:>9.2f}{sb - sa:>+9.2f}{ratio}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# python -m src.quick_score reports/<run_id> applicants.jsonl [--threshold 0.08] > scored.jsonl
+#        echo '{"AMT_CREDIT": 406597.5, ...}' | python -m src.quick_score reports/<run_id>
+
+"""
+Fast-start scoring from a run's compiled kernel.
+
+src.score unpickles model.joblib, which imports pandas, joblib and sklearn's
+calibration / compose / linear_model stack before the first applicant is
+scored -- most of a short-lived batch container's or CLI call's run time.
+This entry point scores from reports/<run_id>/kernel.json instead (written by
+`python -m src.models.kernel`, which checks it against predict_proba), so
+its whole import closure is the standard library plus NumPy.
+
+Input is JSON lines, one raw-field object per applicant (a file, or stdin
+with "-"); JSON null is a missing value. Each output line is
+{"pd": float, "decision": "approve" | "reject"}, with the input's
+SK_ID_CURR first when present.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+from src.models.kernel import ScoringKernel
+
+DEFAULT_THRESHOLD = 0.08    # same as src.score.DEFAULT_THRESHOLD (not imported: src.score loads pandas)
+KERNEL_FILE = "kernel.json"
+ID_COL = "SK_ID_CURR"
+
+
+class KernelScorer:
+    """
+    A loaded ScoringKernel plus the decision threshold -- Scorer's
+    single-applicant API without pandas or sklearn.
+    """
+
+    def __init__(self, kernel: ScoringKernel, threshold: float = DEFAULT_THRESHOLD):
+        self.kernel = kernel
+        self.threshold = threshold
+
+    @classmethod
+    def from_path(cls, path: Union[Path, str], threshold: float = DEFAULT_THRESHOLD) -> "KernelScorer":
+        """Load `path`: a kernel.json, or a run directory containing one."""
+        path = Path(path)
+        if path.is_dir():
+            path = path / KERNEL_FILE
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found; compile it with `python -m src.models.kernel {path.parent}`")
+        kernel = ScoringKernel.load(path)
+        if kernel.bureau_features:
+            raise ValueError(
+                f"{path} was trained with bureau features (RunConfig.bureau_features), which the pandas-free "
+                f"path cannot join; score it with src.score.Scorer or src.serve instead"
+            )
+        return cls(kernel, threshold)
+
+    def score_one(self, features: dict) -> tuple[float, str]:
+        """Score one raw-field dict, returning (pd, decision)."""
+        pd_hat = self.kernel.score(features)
+        return pd_hat, ("reject" if pd_hat >= self.threshold else "approve")
+
+    def score_records(self, records: Iterable[dict]) -> Iterator[dict]:
+        """Yield one {"pd", "decision"} dict per record (with its SK_ID_CURR, if any)."""
+        for record in records:
+            pd_hat, decision = self.score_one(record)
+            out = {ID_COL: record[ID_COL]} if ID_COL in record else {}
+            out.update(pd=pd_hat, decision=decision)
+            yield out
+
+
+def _read_jsonl(lines: Iterable[str]) -> Iterator[dict]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def main() -> None:
+    t0 = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Score JSON-lines applicants from a run's kernel.json.")
+    parser.add_argument("run_dir", type=Path, help="run directory (or its kernel.json)")
+    parser.add_argument("input", nargs="?", default="-", help="JSON-lines file of raw applicants ('-': stdin)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    scorer = KernelScorer.from_path(args.run_dir, args.threshold)
+    src = sys.stdin if args.input == "-" else open(args.input)
+    n = 0
+    try:
+        for scored in scorer.score_records(_read_jsonl(src)):
+            sys.stdout.write(json.dumps(scored) + "\n")
+            n += 1
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    print(f"Scored {n:,} applicant(s) in {time.perf_counter() - t0:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
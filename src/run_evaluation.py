@@ -1,92 +1,238 @@
-# python -m src.run_evaluation
+# python -m src.run_evaluation [--profile sample | cprofile]
 
 from config import RunConfig
 
 from pathlib import Path
+from dataclasses import replace
+from typing import Optional
 import datetime as dt
 import time
 
-from src.evaluation.metrics import ks_statistic
+import pandas as pd
 
+from src.evaluation.bootstrap import bootstrap_ci
+from src.evaluation.figures import FIGURE_MODES, FIGURES, figure_data, render_figures, save_figure_data
+from src.evaluation.sorted_scores import SortedScores
+from src.evaluation.thresholds import BP_GRID, recommend_threshold, threshold_sweep
 from src.evaluation.evaluate import (
     EvalPaths,
     run_cv,
-    plot_roc,
-    plot_pr,
+    cv_from_oof,
     calibration_report,
     gains_lift_table,
-    score_distribution_plot,
     logistic_coefficients_table,
+    compare_models,
 )
 from src.models.pipeline import (
     load_data,
+    data_columns,
+    required_columns,
     make_splits,
     build_pipeline,
     train,
+    train_timed,
+    out_of_fold_predictions,
     persist,
 )
+from src.models.fold_cache import fold_cache
+from src.models.kernel import export_kernel
+from src.data.columnar import open_cache
+from src.run_cache import load_train_stage, save_train_stage, train_key
+from src.models.parallel import fold_parallelism, n_workers
 from src.tracking import log_run
+from src.profiling import PROFILE_MODES, Profiler, StageTimer
+from src.features.bureau import ID_COL, bureau_features, join_bureau_features
 from src.features.feature_engineering import add_application_features
 from src.features.preprocessing import identify_feature_types
 
 from sklearn.calibration import CalibratedClassifierCV
 
-def main() -> None:
-    start_time = time.perf_counter()
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "raw" / "application_train.csv"
 
-    cfg = RunConfig()
 
-    run_id = dt.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+def load_features(
+    cfgs: list[RunConfig],
+    data_path: Path = DATA_PATH,
+    timer: Optional[StageTimer] = None,
+) -> pd.DataFrame:
+    """
+    The raw columns any of `cfgs` needs (their union, in file order) plus the
+    engineered features: loaded once and shared by every run over it. The
+    source file's content digest rides along in df.attrs["data_digest"] for
+    the run cache's fingerprint. If any config sets bureau_features, the
+    bureau aggregates (src.features.bureau, cached by input digest) are
+    joined on and their cache key is folded into that digest. `timer`
+    records the load_data, features and bureau stages.
+    """
+    timer = timer or StageTimer()
+    bureau = any(cfg.bureau_features for cfg in cfgs)
+    with timer.stage("load_data"):
+        available = data_columns(data_path)     # parses the CSV into the columnar cache on first use
+        needed = set().union(*(required_columns(available, cfg) for cfg in cfgs))
+        if bureau:
+            needed.add(ID_COL)
+        df = load_data(data_path, columns=[c for c in available if c in needed])
+    with timer.stage("features"):
+        df = add_application_features(df)
+    digest = open_cache(data_path).manifest["digest"]
+    if bureau:
+        with timer.stage("bureau"):
+            table = bureau_features()
+            df = join_bureau_features(df, table)
+        digest = f"{digest}+bureau-{table.attrs['cache_key']}"
+    df.attrs["data_digest"] = digest
+    return df
+
 
+def evaluate_run(
+    cfg: RunConfig,
+    df: pd.DataFrame,
+    run_id: str,
+    warm_start: Optional[dict] = None,
+    extra: Optional[dict] = None,
+    timer: Optional[StageTimer] = None,
+) -> tuple:
+    """
+    One full run on an already-loaded feature frame: split, CV + train,
+    persist, evaluate, and write run.json (with `extra` merged into its
+    metrics) to reports/<run_id>_<version>/. `warm_start` is passed to
+    train_timed. Every step runs as a stage of `timer` (pass the one
+    load_features used to include loading), recorded under
+    metrics.timing.stages. Returns (fitted model, fit records, metrics).
+    """
+    timer = timer or StageTimer(cfg.trace_memory)
+    if cfg.figures not in FIGURE_MODES:
+        raise ValueError(f"figures must be one of {FIGURE_MODES}, got {cfg.figures!r}")
     paths = EvalPaths(Path(f"reports/{run_id}_{cfg.version}"))
     paths.ensure()
 
-    ROOT = Path(__file__).resolve().parent.parent  # repo root (src/ -> ..)
-    data_path = ROOT / "data" / "raw" / "application_train.csv"
-    df = load_data(data_path)
+    cache = fold_cache(cfg)
+    cache_before = cache.counters() if cache is not None else None
 
-    df = add_application_features(df)
-    
-    X_train, X_test, y_train, y_test = make_splits(df, cfg)
-    numeric_cols, categorical_cols = identify_feature_types(X_train)
-    model = build_pipeline(numeric_cols, categorical_cols, cfg)
+    with timer.stage("split"):
+        X_train, X_test, y_train, y_test = make_splits(df, cfg)
+        numeric_cols, categorical_cols = identify_feature_types(X_train)
+        model = build_pipeline(numeric_cols, categorical_cols, cfg)
+
+    # A finished run with the same code / config / data / library fingerprint
+    # already has the trained model and its predictions: reuse them.
+    stage_cache, key, uncached = train_key(cfg, df.attrs.get("data_digest"), warm_start)
+    hit = stage_cache.get("train", key) if key is not None else None
+    cv_folds = None
+    if hit is not None:
+        with timer.stage("run_cache"):
+            model, y_test_pred, stage = load_train_stage(stage_cache, hit, paths.root)
+        results, fits, cv_folds = stage["cv"], stage["fits"], stage["cv_folds"]
+        print(f"Run cache hit {key[:12]}: reusing the model and predictions of run {stage['run_id']}")
+    else:
+        # Stratified k-fold validation + training. A Platt-calibrated ensemble is
+        # itself fit on the CV folds, so by default its out-of-fold scores give
+        # the CV metrics and the separate run_cv pass (5 more fits) is skipped.
+        if cfg.cv_from_calibration and cfg.calibration == "platt" and cfg.calibration_ensemble:
+            with timer.stage("train"):
+                model, fits = train_timed(model, X_train, y_train, cfg, warm_start)
+
+            with timer.stage("cv"):
+                oof = out_of_fold_predictions(model, X_train, y_train)
+                results = cv_from_oof(oof)
+                if "SK_ID_CURR" in X_train.columns:
+                    oof.insert(0, "SK_ID_CURR", X_train["SK_ID_CURR"])
+                oof.to_csv(paths.tables / "oof_predictions.csv", index_label="row")
+        else:
+            with timer.stage("cv"), fold_parallelism(cfg):
+                results = run_cv(model=model, X_train=X_train, y_train=y_train)
+            cv_folds = results.pop("folds")
+
+            with timer.stage("train"):
+                model, fits = train_timed(model, X_train, y_train, cfg, warm_start)
+
+        # Persist and predict
+        with timer.stage("predict"):
+            y_test_pred = model.predict_proba(X_test)[:, 1]
+        with timer.stage("persist"):
+            persist(model, paths.root / "model.joblib")
+            if key is not None:
+                save_train_stage(stage_cache, key, paths.root, run_id, y_test_pred, {
+                    "cv": results, "fits": fits, "cv_folds": cv_folds,
+                    "train_s": timer.wall_s("train"), "cv_s": timer.wall_s("cv"),
+                })
+
+    # The same model as kernel.json + memory-mappable model_npy/ arrays (no sklearn to load)
+    with timer.stage("persist"):
+        export_kernel(model, paths.root, cfg.bureau_features)
 
-    # Stratified k-fold validation
-    results = run_cv(model=model, X_train=X_train, y_train=y_train)
     print(f"CV ROC AUC: {results['roc_auc_mean']:.6f} +/- {results['roc_auc_std']:.6f}")
     print(f"CV PR-AUC:  {results['pr_auc_mean']:.6f} +/- {results['pr_auc_std']:.6f}")
 
-    # Train, persist, and predict
-    model = train(model, X_train, y_train, cfg)
-    persist(model, paths.root / "model.joblib")
-    y_test_pred = model.predict_proba(X_test)[:, 1]
-
-    # Curves
-    auc = plot_roc(y_test, y_test_pred, paths.figures / "roc_curve.png")
-    pr_auc = plot_pr(y_test, y_test_pred, paths.figures / "pr_curve.png")
-    ks, ks_thresh = ks_statistic(y_test, y_test_pred)
-
-    # Calibration + reliability table
-    calibration_report(
-        y_test,
-        y_test_pred,
-        n_bins=10,
-        strategy="quantile",
-        outpath_fig=paths.figures / "calibration_curve.png",
-        outpath_table=paths.tables / "calibration_table.csv",
-    )
-
-    # Gains/lift
-    gains_lift_table(
-        y_test,
-        y_test_pred,
-        n_bins=10,
-        outpath_table=paths.tables / "gains_lift_table.csv",
-        outpath_fig=paths.figures / "gains_curve.png",
-    )
-
-    # Score distributions
-    score_distribution_plot(y_test, y_test_pred, paths.figures / "score_distribution.png")
+    # Optionally fit the other calibration mode to quantify the trade-off:
+    # AUC / calibration quality vs. scoring latency and artifact size.
+    comparison = None
+    if cfg.compare_calibration and cfg.calibration == "platt":
+        with timer.stage("compare_calibration"):
+            alt_cfg = replace(cfg, calibration_ensemble=not cfg.calibration_ensemble)
+            alt_model = train(build_pipeline(numeric_cols, categorical_cols, alt_cfg), X_train, y_train, alt_cfg)
+            modes = {"ensemble": model, "single": alt_model} if cfg.calibration_ensemble \
+                else {"ensemble": alt_model, "single": model}
+            comparison = compare_models(modes, X_test, y_test)
+            comparison["single_minus_ensemble"] = {
+                k: comparison["single"][k] - comparison["ensemble"][k] for k in comparison["single"]
+            }
+        for mode in ("ensemble", "single"):
+            m = comparison[mode]
+            print(f"{mode:>8}: AUC {m['auc']:.6f} | Brier {m['brier']:.6f} | ECE {m['ece']:.6f} | "
+                  f"{m['batch_us_per_row']:.1f} us/row batched | {m['single_row_ms']:.2f} ms single | "
+                  f"{m['artifact_bytes'] / 1e6:.2f} MB")
+
+    # Curves. The test scores are sorted once; every curve, KS and table below reads that ordering.
+    with timer.stage("metrics"):
+        scores = SortedScores(y_test, y_test_pred)
+        auc, pr_auc = scores.roc_auc(), scores.average_precision()
+        ks, ks_thresh = scores.ks()
+
+    # Bootstrap CIs for the three, from the same sorted scores
+    test_ci = {}
+    if cfg.bootstrap_replicates:
+        with timer.stage("bootstrap"):
+            test_ci = bootstrap_ci(scores, cfg.bootstrap_replicates, method=cfg.bootstrap_method, n_jobs=cfg.n_jobs)
+
+    # Tables: calibration, gains / lift, threshold sweep
+    with timer.stage("tables"):
+        # Calibration + reliability table
+        calibration_report(
+            y_test,
+            y_test_pred,
+            n_bins=10,
+            strategy="quantile",
+            outpath_fig=None,
+            outpath_table=paths.tables / "calibration_table.csv",
+            scores=scores,
+        )
+
+        # Gains/lift
+        gains_lift_table(
+            y_test,
+            y_test_pred,
+            n_bins=10,
+            outpath_table=paths.tables / "gains_lift_table.csv",
+            outpath_fig=None,
+            scores=scores,
+        )
+
+        # Approve / reject trade-off and expected loss per cut-off (notebook 03's analysis).
+        # EAD is the mean test-set loan amount, as in the notebook.
+        ead = float(df.loc[X_test.index, "AMT_CREDIT"].mean()) if "AMT_CREDIT" in df.columns else 1.0
+        threshold_sweep(scores, BP_GRID, ead=ead, lgd=cfg.lgd, margin=cfg.revenue_margin).to_csv(
+            paths.tables / "threshold_table.csv", index=False
+        )
+        operating_point = recommend_threshold(scores, ead=ead, lgd=cfg.lgd, margin=cfg.revenue_margin)
+        operating_point["ead"] = ead
+
+    # Figures: the arrays behind them are always saved, so `python -m src.evaluation.figures`
+    # can draw any run later; cfg.figures decides whether (and when) this run draws them.
+    with timer.stage("figures"):
+        save_figure_data(paths.figures, figure_data(scores))
+        if cfg.figures == "inline":
+            render_figures(paths.figures)
 
     # Extract the first fold's fitted pipeline to allow for feature name extraction
     if isinstance(model, CalibratedClassifierCV):
@@ -96,24 +242,107 @@ def main() -> None:
 
     # Feature names + coefficients
     # Extract feature names from the fitted preprocessor
-    pre = base_pipeline.named_steps["preprocessor"]
-    feature_names = pre.get_feature_names_out().tolist()
-    logistic_coefficients_table(
-        base_pipeline,
-        feature_names,
-        outpath=paths.tables / "top_coefficients.csv",
-        top_k=40,
-    )
+    with timer.stage("coefficients"):
+        pre = base_pipeline.named_steps["preprocessor"]
+        feature_names = pre.get_feature_names_out().tolist()
+        logistic_coefficients_table(
+            base_pipeline,
+            feature_names,
+            outpath=paths.tables / "top_coefficients.csv",
+            top_k=40,
+        )
 
     # Log this runs metadata
     metrics = {
-        "test": {"auc": auc, "pr_auc": pr_auc, "ks": ks, "ks_thresh": ks_thresh},
+        "test": {"auc": auc, "pr_auc": pr_auc, "ks": ks, "ks_thresh": ks_thresh, **test_ci},
         "cv": results,      # the run_cv dict
+        "operating_point": operating_point,   # cost-minimising PD cut-off on the test set
+        "cache": {
+            "fingerprint": key,
+            "hit": hit is not None,
+            "source_run": stage["run_id"] if hit is not None else None,
+            # CV + training time the hit skipped
+            "saved_s": stage["train_s"] + stage["cv_s"] if hit is not None else 0.0,
+            "uncached": uncached,   # why no fingerprint: disabled, warm start, uncommitted changes
+        },
+        "timing": {
+            "cv_s": timer.wall_s("cv"),
+            "train_s": timer.wall_s("train"),
+            "bootstrap_s": timer.wall_s("bootstrap"),
+            "figures": cfg.figures,
+            "figures_s": timer.wall_s("figures"),   # incl. figure_data.npz; deferred figures are drawn after logging
+            "backend": cfg.parallel_backend,
+            "workers": n_workers(cfg, len(fits)),
+            "processes": len({f["pid"] for f in fits}),
+            "fits": fits,   # one per calibration fold (or the single final fit); fit_s + worker pid
+        },
     }
-    log_run(paths.root, run_id, cfg, metrics)
-    
+    if cv_folds is not None:
+        metrics["timing"]["cv_folds"] = cv_folds
+    if cache is not None:
+        # hits/misses over this run's CV + calibration folds; saved_s = original fit time of each hit - time to load it
+        metrics["timing"]["preprocess_cache"] = cache.stats(since=cache_before)
+    if comparison is not None:
+        metrics["calibration_comparison"] = comparison
+    if extra:
+        metrics.update(extra)
+    # Every stage up to here, per stage: wall_s, cpu_s, peak_rss_mb (see src.profiling).
+    # log_run's own time cannot be in the record it writes; it is printed below.
+    metrics["timing"]["stages"] = timer.record()
+    with timer.stage("log_run"):
+        log_run(paths.root, run_id, cfg, metrics)
+
+    if cfg.figures == "deferred":
+        t0 = time.perf_counter()
+        render_figures(paths.figures, workers=len(FIGURES))
+        print(f"Rendered {len(FIGURES)} figures after logging in {time.perf_counter() - t0:.1f}s")
+
     print(f"Run {run_id} complete. Saved evaluation artifacts to {paths.root.resolve()}")
     print(f"AUC: {auc:.6f} | PR-AUC: {pr_auc:.6f} | KS: {ks:.6f} | KS_THRESH: {ks_thresh:.6f}")
+    if test_ci:
+        level = f"{100 * test_ci['bootstrap']['level']:.0f}%"
+        dropped = test_ci["bootstrap"]["dropped"]
+        print(f"{level} CI ({cfg.bootstrap_replicates} bootstrap resamples"
+              f"{f', {dropped} single-class dropped' if dropped else ''}): "
+              + " | ".join(f"{name} [{test_ci[key][0]:.4f}, {test_ci[key][1]:.4f}]"
+                           for name, key in (("AUC", "auc_ci"), ("PR-AUC", "pr_auc_ci"), ("KS", "ks_ci"))))
+    op = operating_point
+    print(f"Operating point: reject PD >= {op['threshold']:.4f} | approval {op['approval_rate']:.1%} | "
+          f"default capture {op['default_capture_rate']:.1%} | approved bad rate {op['bad_rate_approved']:.2%} | "
+          f"EL per 1000 approved {op['expected_loss_per_1000']:,.0f}")
+    print(f"CV {timer.wall_s('cv'):.1f}s | train {timer.wall_s('train'):.1f}s "
+          f"on {metrics['timing']['workers']} worker(s)", end="")
+    if cache is not None:
+        c = metrics["timing"]["preprocess_cache"]
+        print(f" | preprocess cache {c['hits']}/{c['calls']} hits, {c['saved_s']:.1f}s saved", end="")
+    print()
+    print(f"Stages: {timer.summary()}")
+
+    return model, fits, metrics
+
+
+def main() -> None:
+    import argparse
+
+    start_time = time.perf_counter()
+
+    parser = argparse.ArgumentParser(description="Train, evaluate and log one run of RunConfig().")
+    parser.add_argument("--profile", choices=[m for m in PROFILE_MODES if m], default=None,
+                        help="profile the run (overrides RunConfig.profile); saved into its run directory")
+    args = parser.parse_args()
+
+    cfg = RunConfig()
+    if args.profile:
+        cfg = replace(cfg, profile=args.profile)
+
+    run_id = dt.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+    timer = StageTimer(cfg.trace_memory)
+    with Profiler(cfg.profile) as profiler:
+        df = load_features([cfg], timer=timer)
+        evaluate_run(cfg, df, run_id, timer=timer)
+    for path in profiler.save(EvalPaths(Path(f"reports/{run_id}_{cfg.version}")).root):
+        print(f"Profile ({cfg.profile}): {path}")
 
     end_time = time.perf_counter()
     execution_time = end_time - start_time
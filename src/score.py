@@ -1,57 +1,263 @@
+# python -m src.score [reports/<run_id>/model.joblib] [--profile sample | cprofile]
+
 """
-Single-applicant scoring from the persisted model.
+Applicant scoring from the persisted model.
 
 Loads a saved model (no retraining) and returns a calibrated PD plus an
-approve/reject decision for one applicant. This is what makes on-demand PD
-scoring real; a CLI / FastAPI / Streamlit front end is a thin wrapper over
-score_applicant.
+approve/reject decision. A Scorer holds the loaded model, so the nightly
+application queue is scored in chunks with one feature-engineering pass and one
+predict_proba per chunk instead of one joblib.load per row. score_applicant is
+the single-applicant convenience path over the same object; a CLI / FastAPI /
+Streamlit front end is a thin wrapper over either.
+
+A model trained with RunConfig.bureau_features reads the per-applicant
+bureau aggregates too: its Scorer loads the cached table (src.features.bureau)
+when it is built and joins it onto every frame it scores by SK_ID_CURR.
+
+Short-lived jobs that only need PDs should use src.quick_score instead: it
+scores from the run's compiled kernel.json and never imports pandas or sklearn.
 """
 
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator, Optional, Union
 
-import joblib
+import numpy as np
 import pandas as pd
 
-from src.features.feature_engineering import add_application_features
+from src.features.bureau import BALANCE_PATH, BUREAU_COLUMNS, BUREAU_PATH, ID_COL, bureau_features, join_bureau_features
+from src.features.feature_engineering import FEATURE_SOURCES, add_application_features
+
+DEFAULT_THRESHOLD = 0.08    # provisional; principled value comes from the EL analysis
+DEFAULT_CHUNKSIZE = 50_000
+
+
+class Scorer:
+    """
+    A loaded model plus the decision threshold.
+
+    Build it once (Scorer.from_path) and reuse it: the model is unpickled a
+    single time, and every scoring call engineers features and runs
+    predict_proba on a whole frame at once.
+    """
+
+    def __init__(self, model, threshold: float = DEFAULT_THRESHOLD, bureau_table: Optional[pd.DataFrame] = None):
+        self.model = model
+        self.threshold = threshold
+        inputs = _model_inputs(model)
+        # Recorded in a kernel; a joblib model's inputs name the bureau columns
+        self.bureau_features = bool(getattr(model, "bureau_features", False)) or bool(set(inputs) & set(BUREAU_COLUMNS))
+        self.bureau_table = None
+        if self.bureau_features:
+            self.bureau_table = bureau_table if bureau_table is not None else _load_bureau_table()
+            inputs = [ID_COL] + [c for c in inputs if c not in BUREAU_COLUMNS]
+        self.raw_columns = _raw_columns(inputs)
+
+    @classmethod
+    def from_path(cls, model_path: Path, threshold: float = DEFAULT_THRESHOLD) -> "Scorer":
+        """
+        Load the persisted model at `model_path`: a model.joblib, or a
+        model_npy/ array directory (src.models.kernel), which is memory-mapped
+        -- processes scoring with it share its pages and never import sklearn.
+        A run directory loads its model_npy/ if it has one, else its model.joblib.
+        """
+        model_path = Path(model_path)
+        if model_path.is_dir():
+            from src.models.kernel import ARRAYS_DIR, SCHEMA_FILE, ScoringKernel
+
+            if not (model_path / SCHEMA_FILE).exists() and (model_path / ARRAYS_DIR).is_dir():
+                model_path = model_path / ARRAYS_DIR     # a run directory
+            if (model_path / SCHEMA_FILE).exists():
+                return cls(ScoringKernel.load_dir(model_path), threshold)
+            if not (model_path / "model.joblib").exists():
+                raise FileNotFoundError(
+                    f"{model_path} is neither a model_npy/ directory nor a run directory with "
+                    f"{ARRAYS_DIR}/ or model.joblib"
+                )
+            model_path = model_path / "model.joblib"
+
+        import joblib   # unpickling pulls in sklearn; deferred until a model is actually loaded
+
+        return cls(joblib.load(model_path), threshold)
+
+    def score_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score every row of a raw application frame.
+
+        Returns a frame on the same index with a `pd` column (calibrated PD)
+        and a `decision` column ('approve' / 'reject' against the threshold).
+        """
+        if len(df):
+            features = add_application_features(df)
+            if self.bureau_table is not None:
+                if ID_COL not in df.columns:
+                    raise ValueError(f"columns are missing: {{{ID_COL!r}}} (needed to join the bureau features)")
+                features = join_bureau_features(features, self.bureau_table)
+            pd_hat = self.model.predict_proba(features)[:, 1]
+        else:   # the estimators reject 0-row input
+            pd_hat = np.empty(0)
+        return pd.DataFrame(
+            {
+                "pd": pd_hat,
+                "decision": np.where(pd_hat >= self.threshold, "reject", "approve"),
+            },
+            index=df.index,
+        )
+
+    def missing_fields(self, record: dict) -> list[str]:
+        """The raw fields the model needs that `record` does not carry (null counts as carried)."""
+        return [c for c in self.raw_columns if c not in record]
+
+    def score_one(self, features: dict) -> tuple[float, str]:
+        """Score one raw-field dict, returning (pd, decision)."""
+        row = self.score_frame(pd.DataFrame([features])).iloc[0]
+        return (float(row["pd"]), str(row["decision"]))
+
+    def iter_batches(
+        self,
+        df_or_path: Union[pd.DataFrame, Path, str],
+        chunksize: int = DEFAULT_CHUNKSIZE,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield scored chunks of `df_or_path` (a raw frame or a CSV path).
+
+        A path is streamed with read_csv(chunksize=...), so a queue larger than
+        memory can be scored and written out chunk by chunk.
+        """
+        if isinstance(df_or_path, pd.DataFrame):
+            chunks = (
+                df_or_path.iloc[start:start + chunksize]
+                for start in range(0, len(df_or_path), chunksize)
+            )
+        else:
+            chunks = pd.read_csv(df_or_path, chunksize=chunksize)
+
+        for chunk in chunks:
+            yield self.score_frame(chunk)
+
+    def score_batch(
+        self,
+        df_or_path: Union[pd.DataFrame, Path, str],
+        chunksize: int = DEFAULT_CHUNKSIZE,
+    ) -> pd.DataFrame:
+        """
+        Score a whole frame or CSV file and return all chunks concatenated
+        (an empty `pd` / `decision` frame when there are no rows).
+        """
+        scored = list(self.iter_batches(df_or_path, chunksize))
+        if not scored:      # an empty frame has no chunks at all
+            return self.score_frame(df_or_path if isinstance(df_or_path, pd.DataFrame) else pd.DataFrame())
+        return pd.concat(scored)
+
+
+def _model_inputs(model) -> list[str]:
+    """
+    The columns model.predict_proba reads: a ScoringKernel's numeric and
+    categorical columns, or the fitted Pipeline's feature_names_in_ (the
+    first calibrated fold's, for a CalibratedClassifierCV).
+    """
+    if hasattr(model, "numeric_cols"):
+        return list(model.numeric_cols) + list(model.categorical_cols)
+    fitted = model.calibrated_classifiers_[0].estimator if hasattr(model, "calibrated_classifiers_") else model
+    return list(fitted.feature_names_in_)
+
+
+def _load_bureau_table() -> pd.DataFrame:
+    try:
+        return bureau_features()
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(
+            f"the model was trained with bureau features (RunConfig.bureau_features), which scoring joins from "
+            f"{BUREAU_PATH} and {BALANCE_PATH}: {exc}. Provide those files, or pass Scorer(bureau_table=...)."
+        ) from exc
+
+
+def _raw_columns(inputs: list[str]) -> list[str]:
+    """Model inputs -> the raw fields they come from (an engineered feature -> its sources)."""
+    raw = {}
+    for col in inputs:
+        raw.update(dict.fromkeys(FEATURE_SOURCES.get(col, [col])))
+    return list(raw)
+
+
+@lru_cache(maxsize=4)
+def _cached_scorer(model_path: str, mtime_ns: int, threshold: float) -> Scorer:
+    # mtime_ns is part of the cache key so a re-persisted model is picked up.
+    return Scorer.from_path(Path(model_path), threshold)
+
+
+def load_scorer(model_path: Path, threshold: float = DEFAULT_THRESHOLD) -> Scorer:
+    """
+    Return a Scorer for `model_path`, loading the model only the first time a
+    given (path, modification time, threshold) is seen in this process.
+    """
+    model_path = Path(model_path).resolve()
+    return _cached_scorer(str(model_path), model_path.stat().st_mtime_ns, threshold)
+
+
+def score_batch(
+    df_or_path: Union[pd.DataFrame, Path, str],
+    model_path: Path,
+    threshold: float = DEFAULT_THRESHOLD,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> pd.DataFrame:
+    """
+    Score a batch of applicants -- a raw frame or a CSV path -- with the model
+    at `model_path`, loaded once. Returns `pd` and `decision` columns aligned to
+    the input rows.
+    """
+    return load_scorer(model_path, threshold).score_batch(df_or_path, chunksize)
 
 
 def score_applicant(
     features: dict,
     model_path: Path,
-    threshold: float = 0.08,    # provisional; principled value comes from the EL analysis
+    threshold: float = DEFAULT_THRESHOLD,
 ) -> tuple[float, str]:
     """
     Score one applicant.
 
     `features` is a raw-field dict (as from an application form / JSON payload);
     it is feature-engineered here, run through the loaded model, and compared
-    against `threshold` to yield (pd, decision).
+    against `threshold` to yield (pd, decision). The model is loaded once per
+    process and reused across calls (see load_scorer).
 
-    Note the manual add_application_features call: a future custom transformer
-    inside the persisted pipeline would let the model go raw-row -> PD on its
-    own and remove this step.
+    Note the manual add_application_features call inside Scorer: a future
+    custom transformer inside the persisted pipeline would let the model go
+    raw-row -> PD on its own and remove this step.
     """
-    model = joblib.load(model_path)
-
-    df = pd.DataFrame([features])
-    df = add_application_features(df)
+    return load_scorer(model_path, threshold).score_one(features)
 
-    pd_hat = float(model.predict_proba(df)[0, 1])
 
-    decision = "reject" if pd_hat >= threshold else "approve"
-
-    return (pd_hat, decision)
+def main() -> None:
+    """
+    Demo: score the first row of the training data and print its PD/decision,
+    then a 1,000-row batch. --profile saves a profile of both (model load
+    included) as score.pstats / score.collapsed next to the model.
+    """
+    import argparse
 
+    from src.data.columnar import read_csv_cached
+    from src.profiling import PROFILE_MODES, Profiler
 
-def main() -> None:
-    """Demo: score the first row of the training data and print its PD/decision."""
     ROOT = Path(__file__).resolve().parent.parent  # repo root (src/ -> ..)
-    df = pd.read_csv(ROOT / "data" / "raw" / "application_train.csv")
+    parser = argparse.ArgumentParser(description="Score the first training rows with a saved model.")
+    parser.add_argument("model_path", type=Path, nargs="?",
+                        default=ROOT / "reports" / "2026-07-25_14-44-10_v3" / "model.joblib")  # your latest run
+    parser.add_argument("--profile", choices=[m for m in PROFILE_MODES if m], default="")
+    args = parser.parse_args()
+    model_path = args.model_path
+
+    df = read_csv_cached(ROOT / "data" / "raw" / "application_train.csv")
     features = df.iloc[0].to_dict()
 
-    model_path = ROOT / "reports" / "2026-07-25_14-44-10_v3" / "model.joblib"  # your latest run
-    pd_hat, decision = score_applicant(features, model_path)
+    with Profiler(args.profile) as profiler:
+        pd_hat, decision = score_applicant(features, model_path)
+        scored = score_batch(df.head(1000), model_path)
     print(f"PD: {pd_hat:.4f} | decision: {decision} | actual TARGET: {features.get('TARGET')}")
+    print(f"Batch: scored {len(scored):,} rows | reject rate {(scored['decision'] == 'reject').mean():.3f}")
+    for path in profiler.save(model_path.parent, name="score"):
+        print(f"Profile ({args.profile}): {path}")
 
 
 if __name__ == "__main__":
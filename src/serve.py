@@ -0,0 +1,323 @@
+# python -m src.serve --model reports/<run_id>/model.joblib [--port 8080]
+
+"""
+Local HTTP scoring service with request micro-batching (standard library only).
+
+A per-request wrapper over score_applicant would pay the DataFrame + sklearn
+dispatch overhead once per applicant. Here the model is loaded once, and
+concurrent requests are gathered into micro-batches: the first queued request
+opens a window of up to `max_wait_ms`, the batch closes early once it holds
+`max_batch_size` applicants, and the whole batch goes through one
+Scorer.score_frame (one add_application_features + one predict_proba) on a
+pool of `workers` threads or processes. Each request then gets its own row back.
+An applicant's result never depends on what else shares its batch: each is
+checked on its own against the model's raw input fields (Scorer.raw_columns)
+and rejected (400) if it lacks any -- JSON null is a missing value, an absent
+key is an error -- and the rest are scored on exactly those columns. If the
+batch fails its applicants are rescored one by one, so a malformed applicant
+fails only its own request (400) and not the others in the batch.
+
+Endpoints (HTTP/1.1, keep-alive):
+    POST /score    body: one raw-field JSON object -> {"pd": float, "decision": str}
+                   or a JSON list of objects        -> [{"pd": ..., "decision": ...}, ...]
+    GET  /health   -> {"status": "ok", "requests": n, "batches": n, "applicants": n, "mean_batch": x}
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.score import DEFAULT_THRESHOLD, Scorer
+
+
+@dataclass
+class ServeConfig:
+    model_path: Path
+    host: str = "127.0.0.1"
+    port: int = 8080
+    threshold: float = DEFAULT_THRESHOLD
+    max_batch_size: int = 256       # close a batch once it holds this many applicants
+    max_wait_ms: float = 2.0        # ...or once its first request has waited this long
+    workers: int = 2                # batches scored concurrently
+    executor: str = "thread"        # "thread" (shared model) or "process" (one model per worker)
+
+
+# -- worker side -----------------------------------------------------------
+# Module-level so the process pool can pickle them; each worker process loads
+# its own Scorer once in the initializer.
+_WORKER_SCORER = None
+
+
+def _init_worker(model_path: Path, threshold: float) -> None:
+    global _WORKER_SCORER
+    _WORKER_SCORER = Scorer.from_path(model_path, threshold)
+
+
+def _score_frame(records: list[dict], scorer: Scorer) -> list[tuple[float, str]]:
+    # Exactly the model's raw columns, whichever keys the batch carries. A
+    # column that is null in every record comes out as object dtype holding
+    # None, which the categorical imputer does not count as missing: NaN it.
+    frame = pd.DataFrame.from_records(records, columns=scorer.raw_columns).fillna(np.nan)
+    scored = scorer.score_frame(frame)
+    return list(zip(scored["pd"].tolist(), scored["decision"].tolist()))
+
+
+def _score_records(records: list[dict], scorer: Scorer = None) -> list:
+    """
+    (pd, decision) per record, or the exception the record failed with. A
+    record missing one of the model's raw fields fails on its own; the rest
+    are scored together, and if that batch fails, each is scored alone.
+    """
+    scorer = scorer or _WORKER_SCORER
+    results: list = [None] * len(records)
+    valid = []
+    for i, rec in enumerate(records):
+        missing = scorer.missing_fields(rec)
+        if missing:
+            results[i] = ValueError(f"missing fields: {missing}")
+        else:
+            valid.append(i)
+
+    try:
+        scored = _score_frame([records[i] for i in valid], scorer)
+    except Exception:
+        scored = []
+        for i in valid:
+            try:
+                scored.extend(_score_frame([records[i]], scorer))
+            except Exception as exc:
+                scored.append(exc)
+    for i, result in zip(valid, scored):
+        results[i] = result
+    return results
+
+
+# -- batching --------------------------------------------------------------
+class MicroBatcher:
+    """
+    Collects (applicant, future) pairs from request handlers and scores them in
+    batches. One collector task forms batches; up to `workers` batches are
+    scored at the same time.
+    """
+
+    def __init__(self, cfg: ServeConfig, executor: Executor, scorer: Scorer = None):
+        self.cfg = cfg
+        self.executor = executor
+        self.scorer = scorer        # thread mode shares one in-process Scorer
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(cfg.workers)
+        self.n_requests = 0
+        self.n_applicants = 0
+        self.n_batches = 0
+        self.in_flight: set[asyncio.Task] = set()    # the loop holds tasks only weakly
+
+    async def submit(self, records: list[dict]) -> list[tuple[float, str]]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for rec in records:
+            fut = loop.create_future()
+            self.queue.put_nowait((rec, fut))
+            futures.append(fut)
+        self.n_requests += 1
+        self.n_applicants += len(records)
+        return list(await asyncio.gather(*futures))
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        max_wait = self.cfg.max_wait_ms / 1000
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + max_wait
+            while len(batch) < self.cfg.max_batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self.slots.acquire()
+            self.n_batches += 1
+            task = asyncio.create_task(self._score(batch))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+
+    async def _score(self, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            records = [rec for rec, _ in batch]
+            results = await loop.run_in_executor(self.executor, _score_records, records, self.scorer)
+            for (_, fut), result in zip(batch, results):
+                if fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+        except Exception as exc:      # the executor itself failed: surface it on every waiting request
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+        finally:
+            self.slots.release()
+
+
+# -- HTTP ------------------------------------------------------------------
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+def _response(status: int, payload, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+async def _handle(batcher: MicroBatcher, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, target, version = request_line.decode().split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode().partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+            except ValueError:      # bad request line / header encoding / Content-Length
+                writer.write(_response(400, {"error": "malformed HTTP request"}, keep_alive=False))
+                await writer.drain()
+                break
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+            if method == "GET" and target == "/health":
+                status, payload = 200, {
+                    "status": "ok",
+                    "requests": batcher.n_requests,
+                    "batches": batcher.n_batches,
+                    "applicants": batcher.n_applicants,
+                    "mean_batch": batcher.n_applicants / max(batcher.n_batches, 1),
+                }
+            elif method == "POST" and target == "/score":
+                try:
+                    data = json.loads(body)
+                except ValueError as exc:
+                    status, payload = 400, {"error": f"invalid JSON: {exc}"}
+                else:
+                    records = data if isinstance(data, list) else [data]
+                    if not all(isinstance(rec, dict) for rec in records):
+                        status, payload = 400, {"error": "expected a JSON object or a list of objects"}
+                    else:
+                        try:
+                            results = await batcher.submit(records)
+                        except (ValueError, TypeError) as exc:     # the applicant's own fields failed to score
+                            status, payload = 400, {"error": f"invalid applicant: {exc}"}
+                        except Exception as exc:
+                            status, payload = 500, {"error": repr(exc)}
+                        else:
+                            out = [{"pd": p, "decision": d} for p, d in results]
+                            status, payload = 200, (out if isinstance(data, list) else out[0])
+            else:
+                status, payload = 404, {"error": f"no route for {method} {target}"}
+
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+def _make_executor(cfg: ServeConfig) -> tuple[Executor, Scorer]:
+    if cfg.executor == "process":
+        pool = ProcessPoolExecutor(
+            max_workers=cfg.workers,
+            initializer=_init_worker,
+            initargs=(cfg.model_path, cfg.threshold),
+        )
+        return pool, None
+    if cfg.executor == "thread":
+        return ThreadPoolExecutor(max_workers=cfg.workers), Scorer.from_path(cfg.model_path, cfg.threshold)
+    raise ValueError(f"unknown executor {cfg.executor!r} (expected 'thread' or 'process')")
+
+
+async def serve(cfg: ServeConfig) -> None:
+    """Load the model, start the batcher and serve until cancelled."""
+    executor, scorer = _make_executor(cfg)
+    batcher = MicroBatcher(cfg, executor, scorer)
+    collector = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(lambda r, w: _handle(batcher, r, w), cfg.host, cfg.port)
+    print(f"Serving {cfg.model_path} on http://{cfg.host}:{cfg.port} "
+          f"(batch<={cfg.max_batch_size}, wait<={cfg.max_wait_ms}ms, {cfg.workers} {cfg.executor} workers)",
+          flush=True)
+    # Stop cleanly on SIGINT/SIGTERM so process-pool workers are shut down with
+    # the server rather than orphaned (add_signal_handler is POSIX-only; on
+    # Windows Ctrl+C still arrives as KeyboardInterrupt).
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        collector.cancel()
+        # Let the batches already handed to the executor finish (each is one
+        # scoring call), so their requests are answered rather than dropped.
+        await asyncio.gather(collector, *batcher.in_flight, return_exceptions=True)
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-batching PD scoring server.")
+    parser.add_argument("--model", type=Path, required=True, help="persisted model.joblib, a model_npy/ directory, or a run directory")
+    parser.add_argument("--host", default=ServeConfig.host)
+    parser.add_argument("--port", type=int, default=ServeConfig.port)
+    parser.add_argument("--threshold", type=float, default=ServeConfig.threshold)
+    parser.add_argument("--max-batch-size", type=int, default=ServeConfig.max_batch_size)
+    parser.add_argument("--max-wait-ms", type=float, default=ServeConfig.max_wait_ms)
+    parser.add_argument("--workers", type=int, default=ServeConfig.workers)
+    parser.add_argument("--executor", choices=["thread", "process"], default=ServeConfig.executor)
+    args = parser.parse_args()
+
+    cfg = ServeConfig(
+        model_path=args.model,
+        host=args.host,
+        port=args.port,
+        threshold=args.threshold,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        workers=args.workers,
+        executor=args.executor,
+    )
+    try:
+        asyncio.run(serve(cfg))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,39 @@
+# python -m src.tracking [--metric metrics.test.auc] [--top 20] [--sha <prefix>] [--where C=0.1 ...] [--rebuild]
+#                        [--timing [wall_s | cpu_s | peak_rss_mb]]
+
 """
 Experiment tracking: record each run and read runs back for comparison.
 
 Each run writes a complete, self-describing run.json (config + metrics + git
-provenance) into its run directory -- the source of truth. load_runs() rebuilds
-a cross-run comparison table from those records on demand, so there is no
-hand-maintained schema to keep in sync.
+provenance) into its run directory -- the source of truth. The cross-run
+comparison view is derived from those records, so there is no hand-maintained
+schema to keep in sync.
+
+Re-reading every run.json per query does not scale to sweeps of thousands of
+runs, so the view is kept in a SQLite index, reports/runs.sqlite: one row per
+run directory, one column per flattened key ('metrics.test.auc',
+'config.C', ...; lists are stored as JSON text), added as new keys appear.
+
+- log_run() upserts its record into the index as it writes run.json,
+- sync_index() brings the index in step with the run.json files on disk,
+  re-reading only those that are new or whose size / mtime changed (and
+  dropping rows whose run directory is gone); rebuild=True starts over,
+- query_runs() / top_runs() filter by git SHA or any config / metric column
+  and order by a metric in SQL, so they cost milliseconds at any run count;
+  load_runs() is the full, synced view,
+- stage_timings() lays out the per-stage wall / CPU time and peak memory
+  each run records (metrics.timing.stages) per run or per git SHA.
+
+The index is a cache: deleting runs.sqlite loses nothing.
 """
 
-import subprocess
+import argparse
 import json
+import sqlite3
+import subprocess
 from pathlib import Path
 from dataclasses import asdict
+from typing import Any, Optional
 
 import pandas as pd
 
@@ -67,31 +90,325 @@ def log_run(
         "metrics": metrics,
         "config": asdict(cfg),
     }
-    with open(run_dir / "run.json", "w") as f:
+    path = Path(run_dir) / "run.json"
+    with open(path, "w") as f:
         json.dump(record, f, indent=2)
 
+    # The index is derived: if it cannot be updated now, the next sync_index() re-reads this run.
+    try:
+        with _connect(path.parent.parent) as con:
+            con.execute("BEGIN IMMEDIATE")
+            _upsert(con, path, record)
+            con.execute("COMMIT")
+    except sqlite3.Error as e:
+        print(f"Run index not updated ({e}); `python -m src.tracking` will pick the run up.")
+
+
+# -- run index ---------------------------------------------------------------
+INDEX_FILE = "runs.sqlite"
+_META = ("_path", "_mtime_ns", "_size")     # run directory name + the run.json stat it was indexed at
+_INDEXED = ("run_id", "git_sha", "metrics.test.auc", "metrics.cv.roc_auc_mean")
+
+
+def _q(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _flatten(record: dict, prefix: str = "") -> dict:
+    # json_normalize's flattening: nested dicts become dotted keys, lists stay whole
+    out = {}
+    for key, value in record.items():
+        if isinstance(value, dict) and value:
+            out.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            out[f"{prefix}{key}"] = value
+    return out
+
+
+def _kind(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (list, dict)):
+        return "json"
+    return "bool" if isinstance(value, bool) else "value"
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return int(value) if isinstance(value, bool) else value
+
+
+class _Connection(sqlite3.Connection):
+    # `with` closes the connection (sqlite3's own context manager only commits)
+    def __exit__(self, *exc):
+        if self.in_transaction:
+            self.execute("ROLLBACK")
+        self.close()
+        return False
+
+
+def _connect(reports_dir: Path) -> sqlite3.Connection:
+    # Autocommit mode with explicit BEGIN IMMEDIATE around writes: parallel
+    # sweep workers serialise on the write lock (waiting up to `timeout`) and
+    # never interleave an ALTER TABLE with another worker's insert.
+    con = sqlite3.connect(Path(reports_dir) / INDEX_FILE, timeout=60, isolation_level=None, factory=_Connection)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute(f"CREATE TABLE IF NOT EXISTS runs ({_q('_path')} TEXT PRIMARY KEY, "
+                f"{_q('_mtime_ns')} INTEGER, {_q('_size')} INTEGER)")
+    con.execute("CREATE TABLE IF NOT EXISTS columns (name TEXT PRIMARY KEY, kind TEXT)")
+    return con
+
+
+def _columns(con: sqlite3.Connection) -> dict:
+    """Indexed column -> kind ('value', 'bool', 'json'; None while only nulls were seen)."""
+    return dict(con.execute("SELECT name, kind FROM columns"))
+
+
+def _upsert(con: sqlite3.Connection, path: Path, record: dict, known: Optional[dict] = None) -> None:
+    """
+    Insert or replace one run.json's row, adding columns for keys not seen
+    before. `known` (_columns(con), updated in place) saves re-reading the
+    column list when many runs are indexed in one transaction.
+    """
+    flat = _flatten(record)
+    known = _columns(con) if known is None else known
+    for name, value in flat.items():
+        if name not in known:
+            con.execute(f"ALTER TABLE runs ADD COLUMN {_q(name)}")
+            con.execute("INSERT INTO columns VALUES (?, ?)", (name, _kind(value)))
+            if name in _INDEXED:
+                con.execute(f"CREATE INDEX IF NOT EXISTS {_q('runs_' + name)} ON runs ({_q(name)})")
+            known[name] = _kind(value)
+        elif known[name] is None and value is not None:
+            con.execute("UPDATE columns SET kind = ? WHERE name = ?", (_kind(value), name))
+            known[name] = _kind(value)
+
+    stat = path.stat()
+    names = list(_META) + list(flat)
+    values = [path.parent.name, stat.st_mtime_ns, stat.st_size] + [_encode(v) for v in flat.values()]
+    con.execute(
+        f"INSERT OR REPLACE INTO runs ({', '.join(map(_q, names))}) VALUES ({', '.join('?' * len(names))})",
+        values,
+    )
+
+
+def sync_index(reports_dir: Path = Path("reports"), rebuild: bool = False) -> dict:
+    """
+    Bring reports_dir/runs.sqlite in step with reports_dir/*/run.json: index
+    new and modified files (by size + mtime), drop rows whose file is gone.
+    Returns the number of runs indexed and the rows added / updated / removed.
+    """
+    reports_dir = Path(reports_dir)
+    if rebuild:
+        (reports_dir / INDEX_FILE).unlink(missing_ok=True)
+    with _connect(reports_dir) as con:
+        on_disk = {p.parent.name: p for p in reports_dir.glob("*/run.json")}
+        indexed = {row[0]: tuple(row[1:]) for row in con.execute(
+            f"SELECT {', '.join(map(_q, _META))} FROM runs")}
+
+        changed = []
+        for name, path in on_disk.items():
+            stat = path.stat()
+            if indexed.get(name) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(path)
+        removed = indexed.keys() - on_disk.keys()
+
+        if changed or removed:
+            con.execute("BEGIN IMMEDIATE")
+            known = _columns(con)
+            for path in changed:
+                _upsert(con, path, json.loads(path.read_text()), known)
+            con.executemany("DELETE FROM runs WHERE _path = ?", [(name,) for name in removed])
+            con.execute("COMMIT")
+
+    updated = sum(p.parent.name in indexed for p in changed)
+    return {"runs": len(on_disk), "added": len(changed) - updated, "updated": updated, "removed": len(removed)}
+
+
+def _filters(kinds: dict, where: Optional[dict], git_sha: Optional[str]) -> tuple[list, list]:
+    """SQL WHERE clauses + parameters for query_runs' `where` / `git_sha` filters."""
+    clauses, params = [], []
+    for key, value in (where or {}).items():
+        col = key if key in kinds else f"config.{key}"
+        if col not in kinds:
+            raise ValueError(f"no indexed run has a {key!r} column")
+        if value is None:
+            clauses.append(f"{_q(col)} IS NULL")
+        else:
+            clauses.append(f"{_q(col)} = ?")
+            params.append(_encode(value))
+    if git_sha:
+        clauses.append(f"{_q('git_sha')} LIKE ?")
+        params.append(git_sha + "%")
+    return clauses, params
+
+
+def query_runs(
+    reports_dir: Path = Path("reports"),
+    where: Optional[dict] = None,
+    git_sha: Optional[str] = None,
+    order_by: str = "metrics.test.auc",
+    ascending: bool = False,
+    limit: Optional[int] = None,
+    columns: Optional[list[str]] = None,
+    refresh: bool = False,
+) -> pd.DataFrame:
+    """
+    Runs from the index as a flattened DataFrame (the columns load_runs()
+    has always returned, or just the indexed ones among `columns`), ordered
+    by `order_by` (missing values last).
+
+    `where` maps columns to required values; a bare RunConfig field name
+    means its config.<field> column ({"C": 0.1, "class_weight": "balanced"}).
+    `git_sha` matches a SHA prefix. log_run() keeps the index current;
+    refresh=True first syncs it with run.json files written or edited by
+    other means.
+    """
+    reports_dir = Path(reports_dir)
+    if not reports_dir.is_dir():
+        return pd.DataFrame()
+    if refresh:
+        sync_index(reports_dir)
+
+    with _connect(reports_dir) as con:
+        kinds = _columns(con)
+        clauses, params = _filters(kinds, where, git_sha)
+        select = "*" if columns is None else ", ".join(_q(c) for c in (*_META, *columns) if c in kinds or c in _META)
+        sql = f"SELECT {select} FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by in kinds:
+            sql += f" ORDER BY {_q(order_by)} IS NULL, {_q(order_by)} {'ASC' if ascending else 'DESC'}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        df = pd.read_sql_query(sql, con, params=params)
+
+    df = df.drop(columns=list(_META))
+    for col in df.columns:
+        if kinds.get(col) == "json":
+            df[col] = df[col].map(json.loads, na_action="ignore")
+        elif kinds.get(col) == "bool":
+            df[col] = df[col].map({0: False, 1: True})
+    return df
+
+
+def top_runs(
+    metric: str = "metrics.test.auc",
+    k: int = 10,
+    ascending: bool = False,
+    reports_dir: Path = Path("reports"),
+    **filters,
+) -> pd.DataFrame:
+    """The k best runs by `metric` (highest first unless ascending); filters as in query_runs."""
+    return query_runs(reports_dir, order_by=metric, ascending=ascending, limit=k, **filters)
+
 
 def load_runs(reports_dir: Path = Path("reports")) -> pd.DataFrame:
     """
-    Load every run.json under reports/ into one DataFrame, with nested keys
+    Every run.json under reports/ as one DataFrame, with nested keys
     flattened to dotted columns (e.g. 'metrics.test.auc'), sorted best-AUC
     first. This is the derived comparison view over the per-run records; it
-    auto-unions keys, so new config fields appear as columns for free.
+    auto-unions keys, so new config fields appear as columns for free. Served
+    from the run index after an incremental sync.
+    """
+    return query_runs(reports_dir, refresh=True)
+
+
+STAGES_PREFIX = "metrics.timing.stages."     # per-stage records written by src.profiling.StageTimer
+
+
+def stage_timings(
+    reports_dir: Path = Path("reports"),
+    field: str = "wall_s",
+    where: Optional[dict] = None,
+    git_sha: Optional[str] = None,
+    limit: Optional[int] = None,
+    by_sha: bool = False,
+) -> pd.DataFrame:
+    """
+    Each stage's `field` (wall_s, cpu_s, peak_rss_mb, ...) as one column per
+    stage, in the order the index first saw them (pipeline order): one row
+    per run that recorded stages, newest run.json first, or with by_sha the
+    median over each git SHA's runs (plus their count), most recent SHA
+    first -- a stage that got slower from one commit to the next stands out.
+    Filters as in query_runs.
     """
-    records = [json.load(open(p)) for p in reports_dir.glob("*/run.json")]
-    if not records:
+    reports_dir = Path(reports_dir)
+    if not reports_dir.is_dir():
         return pd.DataFrame()
-    return pd.json_normalize(records).sort_values("metrics.test.auc", ascending=False)
+    with _connect(reports_dir) as con:
+        kinds = _columns(con)
+        names = [n for n in kinds if n.startswith(STAGES_PREFIX) and n.endswith("." + field)]
+        if not names:
+            return pd.DataFrame()
+        clauses, params = _filters(kinds, where, git_sha)
+        clauses.append("(" + " OR ".join(f"{_q(n)} IS NOT NULL" for n in names) + ")")
+        sql = (f"SELECT {', '.join(map(_q, ['run_id', 'git_sha', *names]))} FROM runs "
+               f"WHERE {' AND '.join(clauses)} ORDER BY {_q('_mtime_ns')} DESC")
+        if limit is not None and not by_sha:
+            sql += f" LIMIT {int(limit)}"
+        df = pd.read_sql_query(sql, con, params=params)
+    stages = {n: n[len(STAGES_PREFIX):-len(field) - 1] for n in names}
+    df = df.rename(columns=stages)
+    if not by_sha:
+        return df
+    order = df.drop_duplicates("git_sha")["git_sha"]
+    out = df.groupby("git_sha")[list(stages.values())].median()
+    out.insert(0, "runs", df.groupby("git_sha").size())
+    return out.loc[order].reset_index()
+
+
+def _parse_where(items: list[str]) -> dict:
+    where = {}
+    for item in items:
+        key, _, text = item.partition("=")
+        try:
+            where[key] = json.loads(text)
+        except json.JSONDecodeError:
+            where[key] = text
+    return where
 
 
 def main() -> None:
     """Print a compact cross-run comparison table (`python -m src.tracking`)."""
-    df = load_runs()
+    parser = argparse.ArgumentParser(description="Cross-run comparison from the run index.")
+    parser.add_argument("--reports", type=Path, default=Path("reports"))
+    parser.add_argument("--metric", default="metrics.test.auc", help="column to rank runs by")
+    parser.add_argument("--top", type=int, default=None, help="show only the best N runs")
+    parser.add_argument("--ascending", action="store_true", help="lower is better (e.g. Brier, timings)")
+    parser.add_argument("--sha", default=None, help="only runs whose git SHA starts with this")
+    parser.add_argument("--where", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="column (or RunConfig field) filters, values parsed as JSON: C=0.1 class_weight=balanced")
+    parser.add_argument("--rebuild", action="store_true", help="re-index every run.json from scratch")
+    parser.add_argument("--timing", nargs="?", const="wall_s", default=None, metavar="FIELD",
+                        help="per-stage timings instead (wall_s, cpu_s or peak_rss_mb): per run, then per git SHA")
+    args = parser.parse_args()
+
+    stats = sync_index(args.reports, rebuild=args.rebuild)
+    if args.timing:
+        kwargs = dict(field=args.timing, where=_parse_where(args.where), git_sha=args.sha)
+        per_run = stage_timings(args.reports, limit=args.top, **kwargs)
+        per_sha = stage_timings(args.reports, by_sha=True, **kwargs)
+        for df in (per_run, per_sha):
+            if "git_sha" in df:
+                df["git_sha"] = df["git_sha"].str[:12]
+        print(f"{args.timing} per stage, newest run first")
+        print(per_run.to_string(index=False, float_format="{:.2f}".format))
+        print(f"\nMedian {args.timing} per stage by git SHA, most recent first")
+        print(per_sha.to_string(index=False, float_format="{:.2f}".format))
+        return
     cols = ["run_id", "git_sha", "git_dirty",
-            "metrics.test.auc", "metrics.cv.roc_auc_mean",
-            "config.class_weight", "config.calibration"]
+            "metrics.test.auc", "metrics.test.auc_se", "metrics.cv.roc_auc_mean",
+            "config.class_weight", "config.calibration", "config.C"]
+    if args.metric not in cols:
+        cols.insert(3, args.metric)
+    df = query_runs(args.reports, where=_parse_where(args.where), git_sha=args.sha,
+                    order_by=args.metric, ascending=args.ascending, limit=args.top, columns=cols)
     cols = [c for c in cols if c in df.columns]   # tolerate missing cols on empty/early runs
     print(df[cols].to_string(index=False))
+    print(f"{len(df)} of {stats['runs']} runs | index: +{stats['added']} new, "
+          f"{stats['updated']} updated, -{stats['removed']} removed")
 
 
 if __name__ == "__main__":